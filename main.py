@@ -1,48 +1,132 @@
 """Cloud Run Function entry point for the Idea Refiner pipeline."""
 
+import os
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
 
-import logging
-import time
-
 import functions_framework
-from flask import Request, jsonify
+from flask import Request, Response, jsonify
 
-from agents.idea_refiner.config import MAX_RETRIES, get_idea_prompt
-from agents.idea_refiner.output.display import display_and_save
-from agents.idea_refiner.pipeline.run_round import run_round
-from agents.idea_refiner.pipeline.state import init_state
+from agents.idea_refiner.config import load_env
+from agents.idea_refiner.observability.logs import configure_logging
+from agents.idea_refiner.observability.metrics import CONTENT_TYPE, render_metrics
+from agents.idea_refiner.outbox.store import get_outbox
+from agents.idea_refiner.pool.store import get_pool
+from agents.idea_refiner.server.bot import handle_update, secret_ok
+from agents.idea_refiner.server.idempotency import IdempotencyTimeout
+from agents.idea_refiner.server.jobs import get_executor
+from agents.idea_refiner.server.ondemand import RateLimited, get_on_demand
+from agents.idea_refiner.server.run import run_idempotent
+from agents.idea_refiner.server.stream import HEADERS, MIMETYPES, run_with_events, stream_format
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)-8s | %(message)s",
-    datefmt="%H:%M:%S",
-)
+load_env()
+configure_logging()
 
 
 @functions_framework.http
 def idea_refiner(request: Request):
     """HTTP handler that runs the idea generation pipeline.
 
-    Returns JSON with the winning idea, evaluations, and timing.
+    Returns JSON with the winning idea, evaluations, token usage, and timing.
+    ``?stream=sse`` / ``?stream=ndjson`` (or the matching Accept header) streams
+    progress events instead, ending with the same payload as a ``result`` event.
+    ``/outbox`` returns delivery queue depth and lag instead, ``/pool`` the
+    pre-generated pool's size, hit rate and staleness, and ``/metrics`` this
+    instance's Prometheus metrics.
+
+    Runs are idempotent per ``Idempotency-Key`` header (or ``?key=``), defaulting to
+    today's date plus ``?theme=``: repeats get the stored result and concurrent
+    repeats wait for the run in progress.
+
+    ``POST /jobs`` queues a run and returns its id at once; ``GET /jobs/<id>``
+    returns its status, progress and, once done, the same result payload.
+
+    ``/idea?theme=`` and the ``POST /telegram`` bot webhook (``/idea <theme>``) serve
+    on-demand ideas: rate-limited per user, cached briefly, and coalesced so identical
+    concurrent requests share one run. ``/ondemand`` reports how well that works.
+    """
+    path = request.path.rstrip("/")
+    if path == "/metrics":
+        return Response(render_metrics(), content_type=CONTENT_TYPE)
+    if path == "/outbox":
+        outbox = get_outbox()
+        return jsonify(outbox.stats() if outbox else {"enabled": False})
+    if path == "/pool":
+        pool = get_pool()
+        return jsonify(pool.stats() if pool else {"enabled": False})
+    if path == "/ondemand":
+        return jsonify(get_on_demand().stats())
+    if path == "/idea":
+        return _idea(request)
+    if path == "/telegram":
+        return _telegram(request)
+    if path == "/jobs" or path.startswith("/jobs/"):
+        return _jobs(request, path.removeprefix("/jobs").strip("/"))
+    theme = request.args.get("theme")
+    key = request.headers.get("Idempotency-Key") or request.args.get("key")
+    fmt = stream_format(request.args.get("stream"), request.headers.get("Accept"))
+    if fmt:
+        stream = run_with_events(lambda: run_idempotent(theme, key)[0], fmt)
+        return Response(stream, mimetype=MIMETYPES[fmt], headers=HEADERS)
+    try:
+        result, replayed = run_idempotent(theme, key)
+    except IdempotencyTimeout as e:
+        return jsonify({"error": str(e)}), 409
+    response = jsonify(result)
+    response.headers["Idempotent-Replayed"] = "true" if replayed else "false"
+    return response
+
+
+def _jobs(request: Request, job_id: str):
+    executor = get_executor()
+    if request.method == "POST" and not job_id:
+        body = request.get_json(silent=True) or {}
+        job = executor.submit(body.get("theme") or request.args.get("theme"))
+        return jsonify({"id": job["id"], "status": job["status"], "url": f"/jobs/{job['id']}"}), 202
+    if request.method != "GET":
+        return jsonify({"error": "method not allowed"}), 405
+    if not job_id:
+        return jsonify({"jobs": executor.store.recent()})
+    job = executor.store.get(job_id)
+    if job is None:
+        return jsonify({"error": "job not found"}), 404
+    return jsonify(job)
+
+
+def _client_address(request: Request) -> str:
+    """The caller's address, as seen by the last of ``TRUSTED_PROXY_HOPS`` proxies we trust.
+
+    Client-chosen values (``X-User-Id``, ``?user=``, the left part of ``X-Forwarded-For``)
+    are never used, so the per-user limit can't be dodged by changing them.
     """
-    start = time.time()
-    theme, system_prompt, user_prompt = get_idea_prompt()
-    state = init_state(theme)
-
-    for rnd in range(1, MAX_RETRIES + 2):
-        if run_round(rnd, state, system_prompt, user_prompt):
-            break
-
-    winning_idea = display_and_save(theme, state)
-
-    return jsonify({
-        "theme": theme,
-        "winning_idea": winning_idea,
-        "winner_label": state["winner_label"],
-        "evaluations": state.get("all_evals", []),
-        "elapsed_seconds": round(time.time() - start, 1),
-    })
+    hops = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+    forwarded = [a.strip() for a in request.headers.get("X-Forwarded-For", "").split(",")]
+    forwarded = [a for a in forwarded if a]
+    if hops > 0 and len(forwarded) >= hops:
+        return forwarded[-hops]
+    return request.remote_addr or "unknown"
+
+
+def _idea(request: Request):
+    try:
+        rendered, source = get_on_demand().request(
+            request.args.get("theme"), f"ip:{_client_address(request)}",
+        )
+    except RateLimited as e:
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = str(int(e.retry_after_s) + 1)
+        return response, 429
+    response = jsonify(rendered["result"])
+    response.headers["X-Idea-Source"] = source
+    return response
+
+
+def _telegram(request: Request):
+    if request.method != "POST":
+        return jsonify({"error": "method not allowed"}), 405
+    if not secret_ok(request.headers.get("X-Telegram-Bot-Api-Secret-Token")):
+        return jsonify({"error": "forbidden"}), 403
+    handled = handle_update(request.get_json(silent=True) or {}, get_on_demand())
+    return jsonify({"ok": True, "handled": handled})
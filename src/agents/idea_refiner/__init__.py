@@ -1,3 +1,10 @@
-from agents.idea_refiner.main import main
-
 __all__ = ["main"]
+
+
+def __getattr__(name: str):
+    # Resolved lazily so importing a subpackage doesn't load the whole pipeline.
+    if name == "main":
+        from agents.idea_refiner.main import main
+
+        return main
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,3 @@
+from agents.idea_refiner.archive.cli import main
+
+main()
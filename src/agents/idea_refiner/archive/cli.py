@@ -0,0 +1,54 @@
+import argparse
+from pathlib import Path
+
+from agents.idea_refiner.archive.queries import acceptance_rates, latency_percentiles, top_ideas
+from agents.idea_refiner.archive.writer import archive_path, open_archive
+
+
+def _print_table(rows: list[dict]) -> None:
+    if not rows:
+        print("(no data)")
+        return
+    cols = list(rows[0])
+    cells = [[_fmt(r[c]) for c in cols] for r in rows]
+    widths = [max(len(c), *(len(row[i]) for row in cells)) for i, c in enumerate(cols)]
+    print("  ".join(c.ljust(w) for c, w in zip(cols, widths)))
+    print("  ".join("─" * w for w in widths))
+    for row in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+
+def _fmt(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return "" if value is None else str(value)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="idea-refiner-archive", description="Query the local run archive.",
+    )
+    parser.add_argument("--db", type=Path, default=archive_path(), help="default: $RUN_ARCHIVE")
+    parser.add_argument("--since", metavar="YYYY-MM-DD")
+    sub = parser.add_subparsers(dest="command", required=True)
+    top = sub.add_parser("top", help="best-scoring ideas")
+    top.add_argument("--limit", type=int, default=10)
+    top.add_argument("--theme")
+    acc = sub.add_parser("acceptance", help="acceptance rates")
+    acc.add_argument("--by", choices=["theme", "model", "date"], default="theme")
+    lat = sub.add_parser("latency", help="LLM call latency percentiles")
+    lat.add_argument("--by", choices=["model", "provider"], default="model")
+    args = parser.parse_args(argv)
+    if args.db is None:
+        parser.error("no archive path: pass --db or set RUN_ARCHIVE")
+
+    conn = open_archive(args.db)
+    if args.command == "top":
+        rows = top_ideas(conn, args.limit, args.theme, args.since)
+        _print_table([
+            {k: r[k] for k in ("run_date", "theme", "model", "title", "total")} for r in rows
+        ])
+    elif args.command == "acceptance":
+        _print_table(acceptance_rates(conn, args.by, args.since))
+    else:
+        _print_table(latency_percentiles(conn, args.by, since=args.since))
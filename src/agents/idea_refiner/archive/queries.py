@@ -0,0 +1,107 @@
+import sqlite3
+
+_GROUPS = {"theme": "r.theme", "date": "r.run_date", "model": "e.model"}
+
+
+def percentile(sorted_values: list[float], pct: float) -> float | None:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def _since(clause: str, since: str | None, params: list) -> str:
+    if since:
+        params.append(since)
+        return f"{clause} r.run_date >= ?"
+    return ""
+
+
+def top_ideas(
+    conn: sqlite3.Connection, limit: int = 10, theme: str | None = None, since: str | None = None,
+) -> list[dict]:
+    params: list = []
+    where = _since("WHERE", since, params)
+    if theme:
+        params.append(theme)
+        where += (" AND" if where else "WHERE") + " r.theme = ?"
+    params.append(limit)
+    rows = conn.execute(
+        f"""
+        SELECT r.run_date, r.theme, e.model, i.title, e.acquisition, e.demand, e.build, e.total,
+               r.run_id, e.round, e.label
+        FROM evaluations e
+        JOIN runs r USING (run_id)
+        LEFT JOIN ideas i ON i.run_id = e.run_id AND i.round = e.round AND i.label = e.label
+        {where}
+        ORDER BY e.total DESC, r.started_at DESC
+        LIMIT ?
+        """,
+        params,
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def acceptance_rates(
+    conn: sqlite3.Connection, by: str = "theme", since: str | None = None,
+) -> list[dict]:
+    """Accepted runs / all runs (theme, date) or judged ideas that won an accept (model)."""
+    if by not in _GROUPS:
+        raise ValueError(f"by must be one of {sorted(_GROUPS)}")
+    params: list = []
+    where = _since("WHERE", since, params)
+    if by == "model":
+        sql = f"""
+            SELECT e.model AS key, COUNT(*) AS n,
+                   SUM(rd.verdict = 'accept' AND l.won) AS accepted,
+                   AVG(e.total) AS avg_total
+            FROM evaluations e
+            JOIN runs r USING (run_id)
+            JOIN rounds rd ON rd.run_id = e.run_id AND rd.round = e.round
+            JOIN lanes l ON l.run_id = e.run_id AND l.label = e.label
+            {where}
+            GROUP BY e.model ORDER BY accepted * 1.0 / n DESC
+        """
+    else:
+        sql = f"""
+            SELECT {_GROUPS[by]} AS key, COUNT(*) AS n, SUM(r.accepted) AS accepted,
+                   AVG(r.rounds) AS avg_rounds
+            FROM runs r
+            {where}
+            GROUP BY key ORDER BY accepted * 1.0 / n DESC, n DESC
+        """
+    rows = [dict(r) for r in conn.execute(sql, params).fetchall()]
+    for row in rows:
+        row["rate"] = round((row["accepted"] or 0) / row["n"], 3)
+    return rows
+
+
+def latency_percentiles(
+    conn: sqlite3.Connection,
+    by: str = "model",
+    percentiles: tuple[float, ...] = (50, 90, 99),
+    since: str | None = None,
+) -> list[dict]:
+    if by not in ("model", "provider"):
+        raise ValueError("by must be 'model' or 'provider'")
+    params: list = []
+    where = _since("AND", since, params)
+    rows = conn.execute(
+        f"""
+        SELECT c.{by} AS key, c.latency_s
+        FROM llm_calls c JOIN runs r USING (run_id)
+        WHERE c.latency_s IS NOT NULL {where}
+        ORDER BY key, c.latency_s
+        """,
+        params,
+    ).fetchall()
+    grouped: dict[str, list[float]] = {}
+    for row in rows:
+        grouped.setdefault(row["key"], []).append(row["latency_s"])
+    return [
+        {"key": key, "n": len(values), **{f"p{p:g}": percentile(values, p) for p in percentiles}}
+        for key, values in grouped.items()
+    ]
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from agents.idea_refiner.generation.models import lane_name
+from agents.idea_refiner.novelty.minhash import idea_title
+
+
+def _total(ev: dict) -> int:
+    return ev.get("acquisition_score", 0) + ev.get("demand_score", 0) + ev.get("build_score", 0)
+
+
+def build_run_record(theme: str | None, state: dict, elapsed: float) -> dict:
+    """Flatten a finished run into per-table row tuples, ready for executemany."""
+    run_id = state["run_id"]
+    history = state.get("history", [])
+    meter = state.get("meter") or {}
+    accepted = bool(history) and history[-1].get("verdict") == "accept"
+    winner = state.get("winner_label")
+    run = (
+        run_id, state["start"], datetime.fromtimestamp(state["start"]).strftime("%Y-%m-%d"),
+        theme, state.get("rounds") or len(history), int(accepted), winner,
+        lane_name(state, winner) if winner else None, state.get("winning_idea"), round(elapsed, 2),
+        meter.get("llm_calls", 0), meter.get("prompt_tokens", 0),
+        meter.get("completion_tokens", 0), meter.get("total_tokens", 0),
+        meter.get("rate_limit_wait_s", 0.0),
+    )
+    rounds, ideas, evaluations = [], [], []
+    for rec in history:
+        rnd = rec["round"]
+        rounds.append((
+            run_id, rnd, rec.get("verdict"), int(rec.get("gate_override", False)),
+            rec.get("judge_latency_s"),
+        ))
+        for label, lane in rec.get("lanes", {}).items():
+            text = lane.get("idea") or ""
+            ideas.append((
+                run_id, rnd, label, lane["model"], lane.get("attempt"),
+                int(lane.get("kept", False)), int(lane.get("ok", True)), lane.get("latency_s"),
+                idea_title(text), text,
+            ))
+        feedback = rec.get("feedback") or {}
+        for ev in rec.get("evaluations", []):
+            label = ev["idea_label"]
+            # The model that wrote this round's idea; a promoted lane changes model mid-run.
+            lane = rec.get("lanes", {}).get(label) or {}
+            evaluations.append((
+                run_id, rnd, label, lane.get("model") or lane_name(state, label),
+                ev.get("acquisition_score"),
+                ev.get("demand_score"), ev.get("build_score", 0), _total(ev),
+                ev.get("explanation"), feedback.get(label),
+            ))
+    lanes = [
+        (run_id, label, lane_name(state, label), attempts, int(label == winner))
+        for label, attempts in state.get("attempts", {}).items()
+    ]
+    calls = [
+        (
+            run_id, c["provider"], c.get("model"), c.get("status"), c.get("started_at"),
+            c.get("latency_s"), c.get("wait_s"), c.get("prompt_tokens"),
+            c.get("completion_tokens"), c.get("total_tokens"),
+        )
+        for c in state.get("calls", [])
+    ]
+    return {
+        "runs": [run], "rounds": rounds, "lanes": lanes, "ideas": ideas,
+        "evaluations": evaluations, "llm_calls": calls,
+    }
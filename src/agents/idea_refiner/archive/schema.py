@@ -0,0 +1,88 @@
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id            TEXT PRIMARY KEY,
+    started_at        REAL NOT NULL,
+    run_date          TEXT NOT NULL,
+    theme             TEXT,
+    rounds            INTEGER NOT NULL,
+    accepted          INTEGER NOT NULL,
+    winner_label      TEXT,
+    winner_model      TEXT,
+    winning_idea      TEXT,
+    elapsed_s         REAL,
+    llm_calls         INTEGER,
+    prompt_tokens     INTEGER,
+    completion_tokens INTEGER,
+    total_tokens      INTEGER,
+    rate_limit_wait_s REAL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_date  ON runs (run_date);
+CREATE INDEX IF NOT EXISTS idx_runs_theme ON runs (theme);
+
+CREATE TABLE IF NOT EXISTS rounds (
+    run_id          TEXT NOT NULL REFERENCES runs (run_id),
+    round           INTEGER NOT NULL,
+    verdict         TEXT,
+    gate_override   INTEGER NOT NULL DEFAULT 0,
+    judge_latency_s REAL,
+    PRIMARY KEY (run_id, round)
+);
+
+CREATE TABLE IF NOT EXISTS lanes (
+    run_id   TEXT NOT NULL REFERENCES runs (run_id),
+    label    TEXT NOT NULL,
+    model    TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    won      INTEGER NOT NULL,
+    PRIMARY KEY (run_id, label)
+);
+CREATE INDEX IF NOT EXISTS idx_lanes_model ON lanes (model);
+
+CREATE TABLE IF NOT EXISTS ideas (
+    idea_id   INTEGER PRIMARY KEY,
+    run_id    TEXT NOT NULL REFERENCES runs (run_id),
+    round     INTEGER NOT NULL,
+    label     TEXT NOT NULL,
+    model     TEXT NOT NULL,
+    attempt   INTEGER,
+    kept      INTEGER NOT NULL DEFAULT 0,
+    ok        INTEGER NOT NULL,
+    latency_s REAL,
+    title     TEXT,
+    text      TEXT,
+    UNIQUE (run_id, round, label)
+);
+CREATE INDEX IF NOT EXISTS idx_ideas_model ON ideas (model);
+
+CREATE TABLE IF NOT EXISTS evaluations (
+    run_id      TEXT NOT NULL REFERENCES runs (run_id),
+    round       INTEGER NOT NULL,
+    label       TEXT NOT NULL,
+    model       TEXT,
+    acquisition INTEGER,
+    demand      INTEGER,
+    build       INTEGER,
+    total       INTEGER,
+    explanation TEXT,
+    feedback    TEXT,
+    PRIMARY KEY (run_id, round, label)
+);
+CREATE INDEX IF NOT EXISTS idx_evaluations_model ON evaluations (model);
+CREATE INDEX IF NOT EXISTS idx_evaluations_total ON evaluations (total);
+
+CREATE TABLE IF NOT EXISTS llm_calls (
+    call_id           INTEGER PRIMARY KEY,
+    run_id            TEXT NOT NULL REFERENCES runs (run_id),
+    provider          TEXT NOT NULL,
+    model             TEXT,
+    status            INTEGER,
+    started_at        REAL,
+    latency_s         REAL,
+    wait_s            REAL,
+    prompt_tokens     INTEGER,
+    completion_tokens INTEGER,
+    total_tokens      INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_llm_calls_run   ON llm_calls (run_id);
+CREATE INDEX IF NOT EXISTS idx_llm_calls_model ON llm_calls (model);
+"""
@@ -0,0 +1,110 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+from pathlib import Path
+
+from agents.idea_refiner.archive.schema import SCHEMA
+from agents.idea_refiner.storage.db import connect
+
+log = logging.getLogger(__name__)
+
+_INSERTS = {
+    "runs": "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "rounds": "INSERT OR REPLACE INTO rounds VALUES (?, ?, ?, ?, ?)",
+    "lanes": "INSERT OR REPLACE INTO lanes VALUES (?, ?, ?, ?, ?)",
+    "ideas": (
+        "INSERT OR REPLACE INTO ideas (run_id, round, label, model, attempt, kept, ok, "
+        "latency_s, title, text) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    ),
+    "evaluations": "INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "llm_calls": (
+        "INSERT INTO llm_calls (run_id, provider, model, status, started_at, latency_s, wait_s, "
+        "prompt_tokens, completion_tokens, total_tokens) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    ),
+}
+
+MAX_BATCH = 64
+
+
+def open_archive(path: str | Path):
+    conn = connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class ArchiveWriter:
+    """Persists run records on a background thread, batching many runs per transaction."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = path
+        self._queue: queue.Queue = queue.Queue()
+        self._conn = open_archive(path)
+        self._thread = threading.Thread(target=self._loop, name="archive-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: dict) -> None:
+        self._queue.put(record)
+
+    def flush(self) -> None:
+        """Block until everything submitted so far is committed."""
+        self._queue.join()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        self._conn.close()
+
+    def _write(self, batch: list[dict]) -> None:
+        with self._conn:
+            for table, sql in _INSERTS.items():
+                rows = [row for record in batch for row in record[table]]
+                if rows:
+                    self._conn.executemany(sql, rows)
+
+    def _loop(self) -> None:
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            taken, batch = 1, []
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= MAX_BATCH:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+            stop = item is None
+            try:
+                if batch:
+                    self._write(batch)
+            except Exception as exc:  # noqa: BLE001
+                log.error("   ⚠️ Archive write of %d run(s) failed: %s", len(batch), exc)
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+
+
+_writer: ArchiveWriter | None = None
+_lock = threading.Lock()
+
+
+def archive_path() -> Path | None:
+    value = os.getenv("RUN_ARCHIVE")
+    return Path(value) if value else None
+
+
+def get_writer() -> ArchiveWriter | None:
+    """Process-wide writer for ``RUN_ARCHIVE`` (disabled when unset)."""
+    global _writer
+    path = archive_path()
+    if path is None:
+        return None
+    with _lock:
+        if _writer is None:
+            _writer = ArchiveWriter(path)
+            atexit.register(_writer.close)
+    return _writer
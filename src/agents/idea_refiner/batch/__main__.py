@@ -0,0 +1,3 @@
+from agents.idea_refiner.batch.cli import main
+
+main()
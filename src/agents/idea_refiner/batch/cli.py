@@ -0,0 +1,38 @@
+import argparse
+from pathlib import Path
+
+from agents.idea_refiner.batch.runner import DEFAULT_CONCURRENCY, run_batch
+from agents.idea_refiner.config import RANDOM_THEMES, load_env
+from agents.idea_refiner.observability.logs import configure_logging
+
+
+def _provider_limit(value: str) -> tuple[str, int]:
+    provider, _, limit = value.partition("=")
+    if not provider or not limit.isdigit():
+        raise argparse.ArgumentTypeError("expected PROVIDER=N, e.g. openai=2")
+    return provider, int(limit)
+
+
+def main(argv: list[str] | None = None) -> dict:
+    load_env()
+    parser = argparse.ArgumentParser(
+        prog="idea-refiner-batch",
+        description="Pre-generate ideas for many themes, streaming results to JSONL.",
+    )
+    parser.add_argument("--out", type=Path, default=Path("ideas.jsonl"))
+    parser.add_argument(
+        "--themes", nargs="+", metavar="THEME",
+        help="themes to run (default: every theme in RANDOM_THEMES)",
+    )
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument(
+        "--provider-limit", type=_provider_limit, action="append", default=[],
+        metavar="PROVIDER=N", help="max in-flight requests per provider (openai, gemini)",
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    return run_batch(
+        args.themes or RANDOM_THEMES, args.out,
+        concurrency=args.concurrency, provider_limits=dict(args.provider_limit),
+    )
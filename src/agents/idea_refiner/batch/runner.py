@@ -0,0 +1,98 @@
+import logging
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from agents.idea_refiner.batch.jsonl import append_record, completed_themes, open_for_append
+from agents.idea_refiner.generation.transport import set_provider_limit
+from agents.idea_refiner.pipeline.run import run_theme
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 4
+
+
+def iter_runs(
+    fn: Callable, items: Iterable, concurrency: int,
+) -> Iterator[tuple[object, object, Exception | None]]:
+    """Yield ``(item, result, error)`` as each ``fn(item)`` finishes.
+
+    At most ``concurrency`` items are in flight at once, so nothing but the
+    running work is held in memory regardless of how many items there are.
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as pool:
+        pending: dict[Future, object] = {}
+        while True:
+            for item in items:
+                pending[pool.submit(fn, item)] = item
+                if len(pending) >= concurrency:
+                    break
+            if not pending:
+                return
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                item = pending.pop(fut)
+                error = fut.exception()
+                yield item, None if error else fut.result(), error
+
+
+def _throughput(stats: dict, elapsed: float) -> None:
+    stats["elapsed_seconds"] = round(elapsed, 1)
+    stats["runs_per_min"] = round(stats["completed"] / elapsed * 60, 2) if elapsed else 0.0
+    stats["tokens_per_s"] = round(stats["total_tokens"] / elapsed, 1) if elapsed else 0.0
+
+
+def run_batch(
+    themes: list[str],
+    output: Path,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    provider_limits: dict[str, int] | None = None,
+) -> dict:
+    """Run one independent pipeline per theme, streaming results to a JSONL file.
+
+    Themes that already have a successful record in ``output`` are skipped.
+    """
+    themes = list(dict.fromkeys(themes))
+    done = completed_themes(output)
+    todo = [t for t in themes if t not in done]
+    for provider, limit in (provider_limits or {}).items():
+        set_provider_limit(provider, limit)
+
+    stats = {
+        "total": len(themes), "skipped": len(themes) - len(todo),
+        "completed": 0, "failed": 0, "total_tokens": 0, "rate_limit_wait_s": 0.0,
+    }
+    log.info(
+        "📦 Batch: %d theme(s), %d already done, concurrency %d, provider limits %s",
+        len(themes), stats["skipped"], concurrency, provider_limits or "none",
+    )
+    start = time.time()
+    with open_for_append(output) as f:
+        for theme, result, error in iter_runs(run_theme, todo, concurrency):
+            if error:
+                stats["failed"] += 1
+                append_record(f, {"theme": theme, "error": str(error)})
+                log.error("   ❌ %s — %s", theme, error)
+            else:
+                stats["completed"] += 1
+                stats["total_tokens"] += result["usage"].get("total_tokens", 0)
+                stats["rate_limit_wait_s"] += result["usage"].get("rate_limit_wait_s", 0.0)
+                append_record(f, result)
+            _throughput(stats, time.time() - start)
+            log.info(
+                "   [%d/%d] %s — %s | %.2f runs/min, %.1f tokens/s",
+                stats["completed"] + stats["failed"], len(todo), theme,
+                "failed" if error else f"{result['rounds']} round(s)",
+                stats["runs_per_min"], stats["tokens_per_s"],
+            )
+    _throughput(stats, time.time() - start)
+    stats["rate_limit_wait_s"] = round(stats["rate_limit_wait_s"], 1)
+    log.info(
+        "📦 Batch done: %d completed, %d failed, %d skipped in %.1fs "
+        "(%.2f runs/min, %.1f tokens/s, %.1fs waiting on rate limits)",
+        stats["completed"], stats["failed"], stats["skipped"], stats["elapsed_seconds"],
+        stats["runs_per_min"], stats["tokens_per_s"], stats["rate_limit_wait_s"],
+    )
+    return stats
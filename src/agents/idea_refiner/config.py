@@ -1,5 +1,6 @@
-import random
-from datetime import datetime
+import os
+from datetime import date, datetime
+from pathlib import Path
 
 MAX_RETRIES = 2
 
@@ -109,7 +110,7 @@ IDEA_USER_TEMPLATE = """Generate ONE micro-SaaS or micro-product idea I can buil
 
 JUDGE_SYSTEM = """You are a sharp, experienced business consultant who evaluates startup and micro-SaaS ideas.
 
-You will be shown business ideas labeled as Idea A and Idea B.
+You will be shown business ideas labeled as Idea A, Idea B, and so on.
 
 Your job is to evaluate each idea based on THREE criteria (most important first):
 
@@ -168,9 +169,7 @@ Respond ONLY with valid JSON in this exact format (no markdown fences, no extra
 If verdict is "reject_all", set "winner" to null and "winning_idea" to null, and provide specific feedback for ALL ideas in rejection_feedback."""
 
 
-def get_idea_prompt() -> tuple[str | None, str, str]:
-    day_of_year = datetime.now().timetuple().tm_yday
-    theme = random.choice(RANDOM_THEMES) if day_of_year % 2 == 0 else None
+def build_idea_prompt(theme: str | None) -> tuple[str, str]:
     section = (
         f"TODAY'S FOCUS: {theme}\n"
         "(Use this as inspiration — your idea should serve this audience "
@@ -179,4 +178,33 @@ def get_idea_prompt() -> tuple[str | None, str, str]:
         if theme
         else ""
     )
-    return theme, IDEA_SYSTEM_PROMPT, IDEA_USER_TEMPLATE.format(theme_section=section).strip()
+    return IDEA_SYSTEM_PROMPT, IDEA_USER_TEMPLATE.format(theme_section=section).strip()
+
+
+def get_idea_prompt(day: date | None = None) -> tuple[str | None, str, str]:
+    """Theme and prompts for ``day`` (today by default): themed on even days of the year."""
+    day_of_year = (day or datetime.now()).timetuple().tm_yday
+    theme = None
+    if day_of_year % 2 == 0:
+        from agents.idea_refiner.scheduling.scheduler import pick_theme
+
+        theme = pick_theme(day)
+    return theme, *build_idea_prompt(theme)
+
+
+_env_loaded = False
+
+
+def load_env() -> None:
+    """Load ``.env`` into the environment, once; entry points call this before anything else."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _env_loaded = True
+
+
+def data_path(filename: str) -> Path:
+    """Path of a local store file under ``IDEA_REFINER_DATA_DIR`` (default ``.idea_refiner``)."""
+    return Path(os.getenv("IDEA_REFINER_DATA_DIR", ".idea_refiner")) / filename
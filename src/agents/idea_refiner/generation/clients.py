@@ -1,28 +1,50 @@
 import os
+import threading
+from typing import TYPE_CHECKING
 
-from dotenv import load_dotenv
-from openai import OpenAI
+if TYPE_CHECKING:
+    from openai import DefaultHttpxClient, OpenAI
 
-load_dotenv()
+# The OpenAI SDK (and httpx) are imported on first client creation, not at startup.
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
 
 _clients: dict = {}
+_lock = threading.Lock()
+
+
+def _http_client(provider: str) -> "DefaultHttpxClient":
+    from openai import DefaultHttpxClient
+
+    from agents.idea_refiner.generation.transport import ProviderTransport
+
+    return DefaultHttpxClient(transport=ProviderTransport(provider))
 
 
-def _openai_client() -> OpenAI:
-    return OpenAI()
+def _openai_client() -> "OpenAI":
+    from openai import OpenAI
+
+    return OpenAI(
+        base_url=os.getenv("OPENAI_BASE_URL") or None, http_client=_http_client("openai"),
+    )
+
 
+def _gemini_client() -> "OpenAI":
+    from openai import OpenAI
 
-def _gemini_client() -> OpenAI:
     return OpenAI(
         api_key=os.getenv("GOOGLE_API_KEY"),
-        base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+        base_url=os.getenv("GEMINI_BASE_URL") or GEMINI_BASE_URL,
+        http_client=_http_client("gemini"),
     )
 
 
 _factories = {"openai": _openai_client, "gemini": _gemini_client}
 
 
-def get_client(name: str) -> OpenAI:
+def get_client(name: str) -> "OpenAI":
     if name not in _clients:
-        _clients[name] = _factories[name]()
+        with _lock:
+            if name not in _clients:
+                _clients[name] = _factories[name]()
     return _clients[name]
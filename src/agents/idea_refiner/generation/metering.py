@@ -0,0 +1,69 @@
+import threading
+from contextvars import ContextVar
+
+_meter: ContextVar[dict | None] = ContextVar("run_meter", default=None)
+_calls: ContextVar[list | None] = ContextVar("run_calls", default=None)
+_lock = threading.Lock()
+
+
+def start_meter() -> dict:
+    """Attach a fresh usage meter to the current context (one per pipeline run)."""
+    meter = {
+        "llm_calls": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+        "rate_limit_wait_s": 0.0,
+        "throttled": 0,
+    }
+    _meter.set(meter)
+    return meter
+
+
+def start_call_log() -> list:
+    """Attach a fresh per-call log to the current context (one per pipeline run)."""
+    calls: list = []
+    _calls.set(calls)
+    return calls
+
+
+def current_meter() -> dict | None:
+    return _meter.get()
+
+
+def record_call(usage: dict, call: dict | None = None) -> None:
+    prompt = usage.get("prompt_tokens") or 0
+    completion = usage.get("completion_tokens") or 0
+    total = usage.get("total_tokens") or prompt + completion
+    calls = _calls.get()
+    if calls is not None and call is not None:
+        calls.append({
+            **call, "prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": total,
+        })
+    meter = _meter.get()
+    if meter is None:
+        return
+    with _lock:
+        meter["llm_calls"] += 1
+        meter["prompt_tokens"] += prompt
+        meter["completion_tokens"] += completion
+        meter["total_tokens"] += total
+
+
+def record_wait(seconds: float, throttled: bool = False) -> None:
+    meter = _meter.get()
+    if meter is None or not (seconds or throttled):
+        return
+    with _lock:
+        meter["rate_limit_wait_s"] = round(meter["rate_limit_wait_s"] + seconds, 3)
+        meter["throttled"] += throttled
+
+
+def absorb_meter(meter: dict | None, other: dict) -> None:
+    """Add ``other``'s counts to ``meter`` (usage gathered in a side context, e.g. a draft)."""
+    if meter is None:
+        return
+    with _lock:
+        for key, value in other.items():
+            meter[key] = meter.get(key, 0) + value
+        meter["rate_limit_wait_s"] = round(meter.get("rate_limit_wait_s", 0.0), 3)
@@ -1,3 +1,5 @@
+from string import ascii_uppercase
+
 from agents.idea_refiner.generation.gpt52 import generate_gpt52
 from agents.idea_refiner.generation.gemini import generate_gemini
 
@@ -11,3 +13,27 @@ MODELS = [
 
 def get_model(label: str) -> dict:
     return MODELS[LABELS.index(label)]
+
+
+def lane_labels(count: int) -> list[str]:
+    return list(ascii_uppercase[:count])
+
+
+def default_lanes() -> dict[str, dict]:
+    """One lane per model, as labelled in ``LABELS``."""
+    return dict(zip(LABELS, MODELS))
+
+
+def run_lanes(state: dict) -> dict[str, dict]:
+    return state.get("lanes") or default_lanes()
+
+
+def lane_name(state: dict, label: str) -> str:
+    model = run_lanes(state).get(label)
+    return model["name"] if model else label
+
+
+def find_model(query: str) -> dict | None:
+    """The model whose name contains ``query`` (case-insensitive), e.g. ``gemini``."""
+    query = query.strip().lower()
+    return next((m for m in MODELS if query and query in m["name"].lower()), None)
@@ -7,6 +7,28 @@ _FEEDBACK_TEMPLATE = (
     "and ensuring there is real market demand."
 )
 
+_NOVELTY_TEMPLATE = (
+    "Your idea is too similar to one that was already suggested before: \"{title}\".\n\n"
+    "Please generate a COMPLETELY DIFFERENT idea — a different product for a different "
+    "problem, not a rename or variation of that one."
+)
+
+_SELF_CRITIQUE_TEMPLATE = (
+    "Assume a demanding judge will reject the idea above — most ideas are rejected. "
+    "Critique it honestly first: where would customer acquisition get expensive, how weak "
+    "is the evidence that people will pay, what makes it hard to build? Then generate a "
+    "COMPLETELY DIFFERENT and BETTER idea that avoids those weaknesses. "
+    "Reply with the new idea only, in the same format."
+)
+
+_REFINE_TEMPLATE = (
+    "The judge has now reviewed your first idea and rejected it. Here is the feedback:\n\n"
+    "{feedback}\n\n"
+    "Revise the alternative you just drafted so it fully addresses this feedback. Keep what "
+    "already works; if the feedback rules the alternative out too, replace it with something "
+    "genuinely new. Reply with the final idea only, in the same format."
+)
+
 
 def build_initial_messages(system_prompt: str, user_prompt: str) -> list[dict]:
     return [
@@ -17,3 +39,15 @@ def build_initial_messages(system_prompt: str, user_prompt: str) -> list[dict]:
 
 def build_feedback_message(feedback: str) -> dict:
     return {"role": "user", "content": _FEEDBACK_TEMPLATE.format(feedback=feedback)}
+
+
+def build_novelty_message(title: str) -> dict:
+    return {"role": "user", "content": _NOVELTY_TEMPLATE.format(title=title)}
+
+
+def build_self_critique_message() -> dict:
+    return {"role": "user", "content": _SELF_CRITIQUE_TEMPLATE}
+
+
+def build_refine_message(feedback: str) -> dict:
+    return {"role": "user", "content": _REFINE_TEMPLATE.format(feedback=feedback)}
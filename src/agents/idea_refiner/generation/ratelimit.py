@@ -0,0 +1,145 @@
+import json
+import os
+import re
+import threading
+import time
+
+DEFAULT_COMPLETION_ESTIMATE = 4000
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``per_minute / 60`` per second.
+
+    ``reserve`` always succeeds and may drive the bucket negative; the caller then
+    sleeps for the returned delay. Reservations are therefore served in arrival
+    order instead of every waiter racing for the next refill.
+    """
+
+    def __init__(self, per_minute: float, capacity: float | None = None) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            self._refill()
+            self._level -= min(amount, self.capacity)
+            return 0.0 if self._level >= 0 else -self._level / self.rate
+
+    def adjust(self, delta: float) -> None:
+        """Give back (positive) or take away (negative) tokens after the fact."""
+        with self._lock:
+            self._refill()
+            self._level = min(self.capacity, self._level + delta)
+
+    def clamp(self, remaining: float) -> None:
+        """Never believe we have more budget than the provider says is left."""
+        with self._lock:
+            self._refill()
+            self._level = min(self._level, remaining)
+
+
+def parse_duration(value: str) -> float | None:
+    """Parse provider reset/retry values such as ``"2"``, ``"1.5s"``, ``"6m0s"`` or ``"20ms"``."""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * _UNIT_SECONDS[unit] for n, unit in parts)
+
+
+def estimate_tokens(body: bytes) -> int:
+    """Rough prompt + completion estimate for a chat-completions request body."""
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        return DEFAULT_COMPLETION_ESTIMATE
+    chars = sum(len(str(m.get("content") or "")) for m in payload.get("messages", []))
+    completion = (
+        payload.get("max_completion_tokens")
+        or payload.get("max_tokens")
+        or DEFAULT_COMPLETION_ESTIMATE
+    )
+    return chars // 4 + completion
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute admission for one provider."""
+
+    def __init__(self, rpm: float | None = None, tpm: float | None = None) -> None:
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self._paused_until = 0.0
+
+    def _delay(self, estimated_tokens: int) -> float:
+        delay = max(0.0, self._paused_until - time.monotonic())
+        if self.requests:
+            delay = max(delay, self.requests.reserve(1))
+        if self.tokens:
+            delay = max(delay, self.tokens.reserve(estimated_tokens))
+        return delay
+
+    def acquire(self, estimated_tokens: int) -> float:
+        """Block until the call may go out; returns the seconds waited."""
+        delay = self._delay(estimated_tokens)
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    def settle(self, estimated_tokens: int, actual_tokens: int | None) -> None:
+        if self.tokens and actual_tokens:
+            self.tokens.adjust(estimated_tokens - actual_tokens)
+
+    def observe(self, status_code: int, headers) -> None:
+        """Self-correct from the provider's rate-limit headers."""
+        for bucket, name in (
+            (self.requests, "x-ratelimit-remaining-requests"),
+            (self.tokens, "x-ratelimit-remaining-tokens"),
+        ):
+            if bucket and headers.get(name, "").isdigit():
+                bucket.clamp(int(headers[name]))
+        if status_code != 429:
+            return
+        retry_after = None
+        if headers.get("retry-after-ms"):
+            retry_after = parse_duration(headers["retry-after-ms"] + "ms")
+        for name in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+            if retry_after is None and headers.get(name):
+                retry_after = parse_duration(headers[name])
+        self._paused_until = max(self._paused_until, time.monotonic() + (retry_after or 1.0))
+
+
+_limiters: dict[str, RateLimiter | None] = {}
+_lock = threading.Lock()
+
+
+def _env_limit(name: str) -> float | None:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+def set_rate_limits(provider: str, rpm: float | None, tpm: float | None) -> None:
+    with _lock:
+        _limiters[provider] = RateLimiter(rpm, tpm) if rpm or tpm else None
+
+
+def get_limiter(provider: str) -> RateLimiter | None:
+    """Shared limiter for ``provider``, configured from ``<PROVIDER>_RPM`` / ``<PROVIDER>_TPM``."""
+    if provider not in _limiters:
+        prefix = provider.upper()
+        set_rate_limits(provider, _env_limit(f"{prefix}_RPM"), _env_limit(f"{prefix}_TPM"))
+    return _limiters[provider]
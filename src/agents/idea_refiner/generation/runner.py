@@ -2,6 +2,11 @@ import asyncio
 import logging
 import time
 
+from agents.idea_refiner.observability.logs import log_context
+from agents.idea_refiner.observability.metrics import GENERATION_FAILURES
+from agents.idea_refiner.observability.profiling import profiled, sample_loop_lag
+from agents.idea_refiner.observability.tracing import span
+
 log = logging.getLogger(__name__)
 
 
@@ -9,18 +14,31 @@ async def _run_one(
     label: str, model: dict, messages: list[dict],
 ) -> tuple[str, str | None, float]:
     start = time.time()
-    try:
-        result = await asyncio.to_thread(model["generate"], messages)
-        return label, result, time.time() - start
-    except Exception as e:
-        log.error("   [%s] %s — error: %s", label, model["name"], e)
-        return label, None, time.time() - start
+    with log_context(lane=label, model=model["name"]), \
+            span("generate", lane=label, model=model["name"]) as s:
+        try:
+            result = await asyncio.to_thread(
+                profiled(model["generate"], "generate_calls"), messages
+            )
+            s.set(ok=bool(result))
+            if not result:
+                GENERATION_FAILURES.labels(model["name"], "empty").inc()
+            return label, result, time.time() - start
+        except Exception as e:
+            log.error("   [%s] %s — error: %s", label, model["name"], e)
+            GENERATION_FAILURES.labels(model["name"], "error").inc()
+            s.set(ok=False, error=str(e))
+            return label, None, time.time() - start
 
 
 def generate_parallel(
     tasks: list[tuple],
 ) -> list[tuple[str, str | None, float]]:
     async def _run_all() -> list[tuple[str, str | None, float]]:
-        return await asyncio.gather(*(_run_one(*t) for t in tasks))
+        lag = asyncio.create_task(sample_loop_lag())
+        try:
+            return await asyncio.gather(*(_run_one(*t) for t in tasks))
+        finally:
+            lag.cancel()
 
     return asyncio.run(_run_all())
@@ -0,0 +1,103 @@
+import json
+import threading
+import time
+from contextlib import nullcontext
+
+import httpx
+
+from agents.idea_refiner.generation.metering import record_call, record_wait
+from agents.idea_refiner.generation.ratelimit import estimate_tokens, get_limiter
+from agents.idea_refiner.observability.logs import log_context, next_call_id
+from agents.idea_refiner.observability.metrics import LLM_CALLS, LLM_LATENCY, LLM_TOKENS
+from agents.idea_refiner.observability.tracing import current_span, span
+
+_slots: dict[str, threading.BoundedSemaphore] = {}
+
+
+def set_provider_limit(provider: str, limit: int | None) -> None:
+    """Cap in-flight HTTP requests to one provider across all threads (None = unlimited)."""
+    if limit:
+        _slots[provider] = threading.BoundedSemaphore(limit)
+    else:
+        _slots.pop(provider, None)
+
+
+def _usage(response: httpx.Response) -> dict:
+    if not response.headers.get("content-type", "").startswith("application/json"):
+        return {}
+    try:
+        body = json.loads(response.content)
+    except ValueError:
+        return {}
+    return (body.get("usage") if isinstance(body, dict) else None) or {}
+
+
+def _request_model(body: bytes) -> str | None:
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        return None
+    return payload.get("model") if isinstance(payload, dict) else None
+
+
+class ProviderTransport(httpx.BaseTransport):
+    """httpx transport shared by every call to one provider.
+
+    Waits for the provider's rate limiter, holds its concurrency slot for the
+    whole request (body included), and feeds the reported token usage and
+    rate-limit headers back into the limiter and the current run's meter.
+    """
+
+    def __init__(self, provider: str, inner: httpx.BaseTransport | None = None) -> None:
+        self.provider = provider
+        if inner is None:
+            from openai import DEFAULT_CONNECTION_LIMITS
+
+            inner = httpx.HTTPTransport(limits=DEFAULT_CONNECTION_LIMITS)
+        self._inner = inner
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        call_id = next_call_id()
+        with log_context(call_id=call_id), \
+                span("llm.call", provider=self.provider, call_id=call_id):
+            return self._handle(request)
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        body = request.read()
+        limiter = get_limiter(self.provider)
+        estimate = estimate_tokens(body) if limiter else 0
+        waited = limiter.acquire(estimate) if limiter else 0.0
+        started_at = time.time()
+        t0 = time.perf_counter()
+        with _slots.get(self.provider) or nullcontext():
+            response = self._inner.handle_request(request)
+            response.read()
+        latency = time.perf_counter() - t0
+        usage = _usage(response)
+        if limiter:
+            limiter.observe(response.status_code, response.headers)
+            limiter.settle(estimate, usage.get("total_tokens"))
+        record_wait(waited, throttled=response.status_code == 429)
+        model = _request_model(body)
+        LLM_CALLS.labels(self.provider, response.status_code).inc()
+        LLM_LATENCY.labels(self.provider, model).observe(latency)
+        for kind in ("prompt", "completion"):
+            if usage.get(f"{kind}_tokens"):
+                LLM_TOKENS.labels(self.provider, kind).observe(usage[f"{kind}_tokens"])
+        record_call(usage, {
+            "provider": self.provider,
+            "model": model,
+            "status": response.status_code,
+            "started_at": started_at,
+            "latency_s": round(latency, 3),
+            "wait_s": round(waited, 3),
+        })
+        current_span().set(
+            model=model, status=response.status_code, wait_s=round(waited, 3),
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+        )
+        return response
+
+    def close(self) -> None:
+        self._inner.close()
@@ -0,0 +1,87 @@
+import re
+from functools import lru_cache
+
+# (heading in IDEA_SYSTEM_PROMPT's answer format, Idea field, short label for the judge)
+SECTIONS = (
+    ("Product Name", "name", "Name"),
+    ("One-Line Pitch", "pitch", "Pitch"),
+    ("Target Customer", "customer", "Customer"),
+    ("The Problem", "problem", "Problem"),
+    ("How It Works", "how_it_works", "How"),
+    ("Pricing", "pricing", "Pricing"),
+    ("Ad Strategy", "ad_strategy", "Ads"),
+    ("Path to $100/month", "path_to_100", "Path to $100/mo"),
+    ("Week 1 Build", "week1", "Week 1"),
+    ("Week 2 Build", "week2", "Week 2"),
+    ("Why This Is Fun", "fun", "Fun"),
+)
+FIELDS = tuple(field for _, field, _ in SECTIONS)
+
+_FIELD_BY_HEADING = {heading.lower(): field for heading, field, _ in SECTIONS}
+# "**Heading:**" (or "**Heading**:"), optionally as a markdown header, at a line start.
+_HEADING = re.compile(
+    r"^[ \t]*(?:#+[ \t]*)?\*\*(?P<label>[^*\n]{1,40}?)(?::\*\*|\*\*:)[ \t]*", re.MULTILINE,
+)
+_EMPHASIS = re.compile(r"\*\*|__")
+
+
+class Idea:
+    """One generated idea split into the sections of the answer format.
+
+    Parsed once per text (see ``idea_of``) and shared by every stage, so treat it
+    as read-only. ``raw`` keeps the original markdown.
+    """
+
+    __slots__ = (*FIELDS, "raw")
+
+    def __init__(self, raw: str, **sections: str) -> None:
+        self.raw = raw
+        for field in FIELDS:
+            setattr(self, field, sections.get(field, ""))
+
+    @property
+    def title(self) -> str:
+        title = (self.name.splitlines() or [""])[0] or self.raw
+        return title.strip().strip("*").strip()[:80]
+
+    def missing(self) -> list[str]:
+        """Headings of the answer format this idea left out or left empty."""
+        return [heading for heading, field, _ in SECTIONS if not getattr(self, field)]
+
+    def canonical(self) -> str:
+        """Condensed plain form: short labels, no markdown, one line per section.
+
+        Falls back to the raw text when the idea doesn't follow the format at all.
+        """
+        lines = []
+        for _, field, label in SECTIONS:
+            value = getattr(self, field)
+            if value:
+                lines.append(f"{label}: {' '.join(_EMPHASIS.sub('', value).split())}")
+        return "\n".join(lines) if lines else self.raw.strip()
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in FIELDS}
+
+
+def parse_idea(text: str) -> Idea:
+    """Split ``text`` on the known section headings in one pass; unknown headings stay in
+    the section before them."""
+    sections: dict[str, str] = {}
+    field, start = None, 0
+    for m in _HEADING.finditer(text):
+        next_field = _FIELD_BY_HEADING.get(m.group("label").strip().lower())
+        if next_field is None:
+            continue
+        if field is not None:
+            sections.setdefault(field, text[start:m.start()].strip())
+        field, start = next_field, m.end()
+    if field is not None:
+        sections.setdefault(field, text[start:].strip())
+    return Idea(text, **sections)
+
+
+@lru_cache(maxsize=512)
+def idea_of(text: str) -> Idea:
+    """The shared parsed ``Idea`` for ``text`` (parsed on first use)."""
+    return parse_idea(text)
@@ -1,17 +1,28 @@
 import json
+import os
 import random
 
 from agents.idea_refiner.generation.clients import get_client
 from agents.idea_refiner.config import JUDGE_SYSTEM
-from agents.idea_refiner.generation.models import LABELS
+from agents.idea_refiner.generation.models import lane_labels
+from agents.idea_refiner.idea import idea_of
+
+
+def judge_sees_canonical() -> bool:
+    return os.getenv("JUDGE_IDEA_FORMAT", "full").strip().lower() == "canonical"
+
+
+def _judge_view(text: str) -> str:
+    """The idea as generated, or condensed when ``JUDGE_IDEA_FORMAT=canonical``."""
+    return idea_of(text).canonical() if judge_sees_canonical() else text
 
 
 def _shuffle_ideas(ideas: dict) -> tuple[dict, str]:
     order = list(ideas.keys())
     random.shuffle(order)
-    shuffle_map = {LABELS[i]: orig for i, orig in enumerate(order)}
+    shuffle_map = dict(zip(lane_labels(len(order)), order))
     ideas_text = "".join(
-        f"\n{'='*60}\nIdea {p}:\n{'='*60}\n{ideas[o]}\n"
+        f"\n{'='*60}\nIdea {p}:\n{'='*60}\n{_judge_view(ideas[o])}\n"
         for p, o in shuffle_map.items()
     )
     return shuffle_map, ideas_text
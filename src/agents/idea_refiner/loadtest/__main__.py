@@ -0,0 +1,3 @@
+from agents.idea_refiner.loadtest.cli import main
+
+main()
@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import time
+
+from agents.idea_refiner.config import load_env
+from agents.idea_refiner.loadtest.fake_llm import FakeLLM
+from agents.idea_refiner.loadtest.traffic import run_load, serve_app
+from agents.idea_refiner.observability.logs import configure_logging
+
+
+def _add_fake_llm_args(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("fake LLM")
+    group.add_argument("--latency", type=float, default=0.0, help="seconds per call")
+    group.add_argument("--jitter", type=float, default=0.0, help="± seconds around --latency")
+    group.add_argument("--error-rate", type=float, default=0.0, help="share of 500s")
+    group.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of 429s")
+    group.add_argument("--reject-rate", type=float, default=0.0, help="share of judge rejections")
+    group.add_argument("--retry-after", type=float, default=1.0, help="retry-after on 429s")
+    group.add_argument("--seed", type=int)
+
+
+def _fake_llm(args: argparse.Namespace, port: int = 0) -> FakeLLM:
+    return FakeLLM(
+        port=port, latency_s=args.latency, jitter_s=args.jitter, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, reject_rate=args.reject_rate,
+        retry_after_s=args.retry_after, seed=args.seed,
+    ).start()
+
+
+def point_at(fake: FakeLLM) -> None:
+    """Route both providers to ``fake`` and keep runs free of real deliveries."""
+    os.environ["OPENAI_BASE_URL"] = fake.url
+    os.environ["GEMINI_BASE_URL"] = fake.url
+    os.environ.setdefault("OPENAI_API_KEY", "fake")
+    os.environ.setdefault("GOOGLE_API_KEY", "fake")
+    os.environ["OUTPUT_SINKS"] = os.getenv("LOADTEST_SINKS", "")
+    # Every request should be a real run, not a replay of today's result.
+    os.environ["IDEMPOTENCY_BACKEND"] = "off"
+
+
+def main(argv: list[str] | None = None) -> dict | None:
+    load_env()
+    parser = argparse.ArgumentParser(
+        prog="idea-refiner-loadtest",
+        description="Load-test the HTTP handler against a local fake LLM.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("fake-llm", help="serve the OpenAI-compatible stand-in")
+    serve.add_argument("--port", type=int, default=8090)
+    _add_fake_llm_args(serve)
+
+    run = sub.add_parser("run", help="drive the app and report throughput and resources")
+    run.add_argument("--requests", type=int, default=20)
+    run.add_argument("--concurrency", type=int, default=4)
+    run.add_argument("--method", choices=["GET", "POST"], default="GET")
+    run.add_argument("--path", default="/", help="request path, e.g. /?stream=ndjson")
+    run.add_argument("--url", help="drive an already running app instead of serving one here")
+    run.add_argument("--source", default="main.py", help="functions_framework source file")
+    run.add_argument("--timeout", type=float, default=600.0)
+    _add_fake_llm_args(run)
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    if args.command == "fake-llm":
+        fake = _fake_llm(args, args.port)
+        print(f"🧪 Fake LLM on {fake.url} — set OPENAI_BASE_URL and GEMINI_BASE_URL to it")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            fake.stop()
+        return None
+
+    if args.url:
+        report = run_load(
+            args.url.rstrip("/") + args.path, args.requests, args.concurrency,
+            args.method, args.timeout,
+        )
+    else:
+        fake = _fake_llm(args)
+        point_at(fake)
+        server = serve_app(args.source)
+        try:
+            report = run_load(
+                f"http://127.0.0.1:{server.server_port}{args.path}", args.requests,
+                args.concurrency, args.method, args.timeout, in_process=True,
+            )
+        finally:
+            server.shutdown()
+            fake.stop()
+        report["llm_calls"] = dict(fake.statuses)
+    print(json.dumps(report, indent=2))
+    return report
@@ -0,0 +1,237 @@
+"""A local OpenAI-compatible chat-completions stand-in with scriptable latency and failures."""
+
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_IDEA_LABEL = re.compile(r"^Idea ([A-Z]+):$", re.MULTILINE)
+JUDGE_MARKER = "Evaluate these business ideas"
+
+IDEA_TEMPLATE = """\
+**Product Name:** LoadTest {n}
+
+**One-Line Pitch:** Synthetic idea #{n} served by the fake LLM.
+
+**Target Customer:** Anyone running a load test.
+
+**The Problem:** Real model calls are slow and cost money.
+
+**How It Works:** The stand-in answers instantly, or as slowly as scripted.
+
+**Pricing:** $4.99/month
+
+**Ad Strategy:** None.
+
+**Path to $100/month:** 21 customers x $4.99.
+
+**Week 1 Build:** Nothing.
+
+**Week 2 Build:** Nothing.
+
+**Why This Is Fun:** Numbers go up."""
+
+
+class FakeLLM(ThreadingHTTPServer):
+    """Answers ``POST .../chat/completions`` like OpenAI or Gemini's compatible endpoint.
+
+    Generation requests get a unique synthetic idea; judge requests (recognised by the
+    judge's user prompt) get a verdict over the labels they contain. Latency, errors,
+    429s and judge rejections are drawn per request from the configured rates, and
+    ``fail_next`` forces specific failures for deterministic tests.
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_s: float = 0.0,
+        jitter_s: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        reject_rate: float = 0.0,
+        retry_after_s: float = 1.0,
+        chunk_delay_s: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        super().__init__((host, port), _Handler)
+        self.latency_s = latency_s
+        self.jitter_s = jitter_s
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.reject_rate = reject_rate
+        self.retry_after_s = retry_after_s
+        self.chunk_delay_s = chunk_delay_s
+        self.statuses: Counter = Counter()
+        self._random = random.Random(seed)
+        self._ideas = itertools.count(1)
+        self._failures: list[int] = []
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/v1"
+
+    @property
+    def requests(self) -> int:
+        return sum(self.statuses.values())
+
+    def fail_next(self, status: int, times: int = 1) -> None:
+        with self._lock:
+            self._failures.extend([status] * times)
+
+    def start(self) -> "FakeLLM":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def _draw(self) -> tuple[int, float, float]:
+        """(status, latency, judge-reject roll) for the next request."""
+        with self._lock:
+            if self._failures:
+                status = self._failures.pop(0)
+            else:
+                roll = self._random.random()
+                if roll < self.rate_limit_rate:
+                    status = 429
+                elif roll < self.rate_limit_rate + self.error_rate:
+                    status = 500
+                else:
+                    status = 200
+            latency = max(self.latency_s + self._random.uniform(-1, 1) * self.jitter_s, 0.0)
+            return status, latency, self._random.random()
+
+    def _record(self, status: int) -> None:
+        with self._lock:
+            self.statuses[status] += 1
+
+    def next_idea(self) -> str:
+        return IDEA_TEMPLATE.format(n=next(self._ideas))
+
+
+def judge_verdict(user_prompt: str, reject: bool) -> str:
+    labels = _IDEA_LABEL.findall(user_prompt) or ["A"]
+    evaluations = [
+        {
+            "idea_label": label,
+            "acquisition_score": 7 if reject else 9,
+            "demand_score": 7 if reject else 9,
+            "build_score": 9,
+            "explanation": "Synthetic verdict from the fake LLM.",
+        }
+        for label in labels
+    ]
+    return json.dumps({
+        "evaluations": evaluations,
+        "verdict": "reject_all" if reject else "accept",
+        "winner": None if reject else labels[0],
+        "winning_idea": None,
+        "rejection_feedback": (
+            {label: "Synthetic rejection — try again." for label in labels} if reject else {}
+        ),
+    })
+
+
+def _usage(messages: list[dict], content: str) -> dict:
+    prompt = sum(len(str(m.get("content", ""))) for m in messages) // 4
+    completion = len(content) // 4
+    return {
+        "prompt_tokens": prompt,
+        "completion_tokens": completion,
+        "total_tokens": prompt + completion,
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeLLM
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._json(404, {"error": {"message": f"no route {self.path}"}})
+        status, latency, reject_roll = self.server._draw()
+        time.sleep(latency)
+        if status == 429:
+            return self._json(
+                429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                {"retry-after": f"{self.server.retry_after_s:g}"},
+            )
+        if status != 200:
+            return self._json(status, {"error": {"message": "Scripted failure"}})
+        messages = body.get("messages", [])
+        user = next((m["content"] for m in messages if m.get("role") == "user"), "")
+        if str(user).startswith(JUDGE_MARKER):
+            content = judge_verdict(user, reject_roll < self.server.reject_rate)
+        else:
+            content = self.server.next_idea()
+        model = body.get("model", "fake")
+        if body.get("stream"):
+            return self._stream(model, content)
+        self._json(200, {
+            "id": f"chatcmpl-{time.time_ns()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": _usage(messages, content),
+        })
+
+    def _json(self, status: int, payload: dict, headers: dict | None = None) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+        self.server._record(status)
+
+    def _stream(self, model: str, content: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            delta = {"content": word if i == 0 else " " + word}
+            if i == 0:
+                delta["role"] = "assistant"
+            self._chunk(model, delta, None)
+            if self.server.chunk_delay_s:
+                time.sleep(self.server.chunk_delay_s)
+        self._chunk(model, {}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.server._record(200)
+
+    def _chunk(self, model: str, delta: dict, finish_reason: str | None) -> None:
+        chunk = {
+            "id": "chatcmpl-stream",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        self.wfile.flush()
+
+    def log_message(self, format, *args) -> None:
+        pass
@@ -0,0 +1,136 @@
+import http.client
+import logging
+import resource
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from pathlib import Path
+from typing import Self
+
+from agents.idea_refiner.archive.queries import percentile
+from agents.idea_refiner.batch.runner import iter_runs
+
+log = logging.getLogger(__name__)
+
+SAMPLE_S = 0.05
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _app_threads() -> int:
+    """Threads in this process, not counting the load generator's own."""
+    return sum(
+        not t.name.startswith(("batch", "thread-sampler")) for t in threading.enumerate()
+    )
+
+
+class ThreadSampler:
+    """Track the peak thread count of this process while a load test runs."""
+
+    def __init__(self) -> None:
+        self.peak = _app_threads()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="thread-sampler", daemon=True)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(SAMPLE_S):
+            self.peak = max(self.peak, _app_threads())
+
+    def __enter__(self) -> Self:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def serve_app(source: str | Path = "main.py", target: str = "idea_refiner", port: int = 0):
+    """Serve the functions_framework app in this process; returns the running server.
+
+    In-process serving lets the report include the app's own peak RSS and thread count.
+    """
+    import functions_framework
+    from werkzeug.serving import make_server
+
+    app = functions_framework.create_app(target=target, source=str(source))
+    server = make_server("127.0.0.1", port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="app-server", daemon=True).start()
+    return server
+
+
+def _request(url: str, method: str, timeout: float) -> tuple[int | None, float, str | None]:
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(
+            urllib.request.Request(url, method=method, data=b"" if method == "POST" else None),
+            timeout=timeout,
+        ) as response:
+            response.read()
+            return response.status, time.perf_counter() - t0, None
+    except urllib.error.HTTPError as e:
+        return e.code, time.perf_counter() - t0, f"HTTP {e.code}"
+    except (OSError, http.client.HTTPException) as e:
+        return None, time.perf_counter() - t0, f"{type(e).__name__}: {e}"
+
+
+def run_load(
+    url: str,
+    requests: int,
+    concurrency: int,
+    method: str = "GET",
+    timeout: float = 600.0,
+    in_process: bool = False,
+) -> dict:
+    """Fire ``requests`` calls at ``url`` with at most ``concurrency`` in flight.
+
+    Reports throughput, latency percentiles, status counts and error rate; with
+    ``in_process`` (the app runs in this process) also peak RSS and thread count.
+    """
+    log.info("🔥 Load test: %d requests at concurrency %d → %s", requests, concurrency, url)
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    errors: Counter = Counter()
+    start = time.perf_counter()
+    with ThreadSampler() as threads:
+        for _, (status, latency, error), exc in iter_runs(
+            lambda _: _request(url, method, timeout), range(requests), concurrency,
+        ):
+            if exc is not None:
+                status, latency, error = None, 0.0, str(exc)
+            statuses[str(status or "error")] += 1
+            latencies.append(latency)
+            if error:
+                errors[error] += 1
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    failed = sum(errors.values())
+    report = {
+        "requests": requests,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 3) if elapsed else 0.0,
+        "ok": requests - failed,
+        "error_rate": round(failed / requests, 4) if requests else 0.0,
+        "statuses": dict(statuses),
+        "errors": dict(errors.most_common(5)),
+        "latency_s": {
+            f"p{p}": round(percentile(latencies, p), 3) if latencies else None
+            for p in (50, 90, 99)
+        } | {"max": round(latencies[-1], 3) if latencies else None},
+    }
+    if in_process:
+        report["peak_rss_mb"] = _peak_rss_mb()
+        report["peak_threads"] = threads.peak
+    log.info(
+        "🔥 %.2f req/s | p50 %.2fs p99 %.2fs | errors %.1f%%",
+        report["throughput_rps"], report["latency_s"]["p50"] or 0,
+        report["latency_s"]["p99"] or 0, report["error_rate"] * 100,
+    )
+    return report
@@ -1,24 +1,27 @@
-import logging
+import argparse
+import sys
+from pathlib import Path
 
-from agents.idea_refiner.config import MAX_RETRIES, get_idea_prompt
+from agents.idea_refiner.config import get_idea_prompt, load_env
+from agents.idea_refiner.observability.logs import configure_logging
+from agents.idea_refiner.observability.profiling import profile_dir, profile_run
 from agents.idea_refiner.output.display import display_and_save
-from agents.idea_refiner.pipeline.state import init_state
-from agents.idea_refiner.pipeline.run_round import run_round
+from agents.idea_refiner.pipeline.run import run_pipeline
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)-8s | %(message)s",
-    datefmt="%H:%M:%S",
-)
 
-
-def main() -> str:
-    theme, system_prompt, user_prompt = get_idea_prompt()
-    state = init_state(theme)
-    for rnd in range(1, MAX_RETRIES + 2):
-        if run_round(rnd, state, system_prompt, user_prompt):
-            break
-    return display_and_save(theme, state)
+def main(argv: list[str] | None = None) -> str:
+    load_env()
+    parser = argparse.ArgumentParser(prog="idea-refiner", description="Generate today's idea.")
+    parser.add_argument(
+        "--profile", type=Path, metavar="DIR", default=profile_dir(),
+        help="write per-stage CPU/memory profiles under DIR (default: $PROFILE_DIR)",
+    )
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    configure_logging()
+    with profile_run(args.profile):
+        theme, system_prompt, user_prompt = get_idea_prompt()
+        state = run_pipeline(theme, system_prompt, user_prompt)
+        return display_and_save(theme, state)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,3 @@
+from agents.idea_refiner.novelty.cli import main
+
+main()
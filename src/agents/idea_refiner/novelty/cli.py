@@ -0,0 +1,42 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from agents.idea_refiner.novelty.index import DEFAULT_THRESHOLD, NoveltyIndex
+from agents.idea_refiner.novelty.store import index_path, iter_jsonl_ideas
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="idea-refiner-novelty",
+        description="Build or query the near-duplicate index of past ideas.",
+    )
+    parser.add_argument("--index", type=Path, default=index_path(), help="default: $NOVELTY_INDEX")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="bulk-add ideas from an existing archive")
+    build.add_argument("--from-jsonl", type=Path, required=True, help="batch output file")
+    check = sub.add_parser("check", help="check an idea (read from stdin) against the index")
+    check.add_argument("file", nargs="?", type=Path)
+    args = parser.parse_args(argv)
+    if args.index is None:
+        parser.error("no index path: pass --index or set NOVELTY_INDEX")
+
+    index = NoveltyIndex.load(args.index, args.threshold)
+    if args.command == "build":
+        t0 = time.perf_counter()
+        added = index.build(iter_jsonl_ideas(args.from_jsonl))
+        index.sync(args.index)
+        print(f"🧬 Indexed {added} idea(s) in {time.perf_counter() - t0:.2f}s "
+              f"({len(index)} total) → {args.index}")
+        return
+    text = args.file.read_text() if args.file else sys.stdin.read()
+    t0 = time.perf_counter()
+    match = index.check(text)
+    took_ms = (time.perf_counter() - t0) * 1000
+    if match:
+        title, sim = match["title"], match["similarity"]
+        print(f"🧬 Too similar to \"{title}\" ({sim:.2f}) [{took_ms:.2f}ms]")
+    else:
+        print(f"✅ Novel among {len(index)} past idea(s) [{took_ms:.2f}ms]")
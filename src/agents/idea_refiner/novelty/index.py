@@ -0,0 +1,198 @@
+import fcntl
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+from array import array
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from agents.idea_refiner.novelty.minhash import (
+    NUM_PERM,
+    idea_title,
+    shingles,
+    signature,
+    similarity,
+)
+
+log = logging.getLogger(__name__)
+
+BANDS = 32
+DEFAULT_THRESHOLD = 0.4
+
+_HEADER = struct.Struct("<4sI")
+_MAGIC = b"NOV1"
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """Exclusive lock shared by every process that syncs the index at ``path``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.with_name(path.name + ".lock").open("a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _file_version(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class NoveltyIndex:
+    """Near-duplicate lookup over past ideas (MinHash signatures + LSH banding).
+
+    All signatures live in one flat ``array('Q')`` (``NUM_PERM`` uint64 per idea);
+    each band maps the hash of its slice to the ids of ideas sharing it.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, bands: int = BANDS) -> None:
+        if NUM_PERM % bands:
+            raise ValueError(f"bands ({bands}) must divide NUM_PERM ({NUM_PERM})")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self._sigs = array("Q")
+        self._titles: list[str] = []
+        self._buckets: list[dict[int, list[int]]] = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+        # Serialises whole saves, so a later snapshot is never overwritten by an earlier one.
+        self._save_lock = threading.Lock()
+        # Ideas added since the last save, for merging into a file other processes also write.
+        self._pending: list[tuple[array, str]] = []
+        self.version: tuple[int, int] | None = None
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def _band_keys(self, sig) -> list[int]:
+        r = self.rows
+        return [hash(tuple(sig[i * r : (i + 1) * r])) for i in range(self.bands)]
+
+    def _insert(self, sig, title: str) -> None:
+        idx = len(self._titles)
+        self._sigs.extend(sig)
+        self._titles.append(title)
+        for band, key in zip(self._buckets, self._band_keys(sig)):
+            band.setdefault(key, []).append(idx)
+
+    def add(self, text: str, title: str | None = None) -> None:
+        if not shingles(text):
+            return
+        sig = signature(text)
+        title = title or idea_title(text)
+        with self._lock:
+            self._insert(sig, title)
+            self._pending.append((sig, title))
+            self.dirty = True
+
+    def build(self, items: Iterable[tuple[str, str | None]]) -> int:
+        """Bulk-add ``(text, title)`` pairs; returns how many were indexed."""
+        sigs = [(signature(t), title or idea_title(t)) for t, title in items if shingles(t)]
+        with self._lock:
+            for sig, title in sigs:
+                self._insert(sig, title)
+            self._pending.extend(sigs)
+            self.dirty = self.dirty or bool(sigs)
+        return len(sigs)
+
+    def query_signature(self, sig) -> dict | None:
+        with self._lock:
+            candidates = set()
+            for band, key in zip(self._buckets, self._band_keys(sig)):
+                candidates.update(band.get(key, ()))
+            best, best_sim = None, 0.0
+            for idx in candidates:
+                sim = similarity(sig, self._sigs[idx * NUM_PERM : (idx + 1) * NUM_PERM])
+                if sim > best_sim:
+                    best, best_sim = idx, sim
+            if best is None or best_sim < self.threshold:
+                return None
+            return {"title": self._titles[best], "similarity": round(best_sim, 3)}
+
+    def check(self, text: str) -> dict | None:
+        """Closest past idea at or above the threshold, or None if ``text`` is novel."""
+        if not shingles(text):
+            return None
+        return self.query_signature(signature(text))
+
+    def save(self, path: Path) -> None:
+        """Atomically replace ``path`` with the current index (safe to call concurrently)."""
+        with self._save_lock:
+            with self._lock:
+                meta = json.dumps({"num_perm": NUM_PERM, "titles": self._titles}).encode()
+                blob = _HEADER.pack(_MAGIC, len(meta)) + meta + self._sigs.tobytes()
+                pending, self._pending = self._pending, []
+                self.dirty = False
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(blob)
+                os.replace(tmp, path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                with self._lock:
+                    self._pending[:0] = pending
+                    self.dirty = True
+                raise
+            self.version = _file_version(path)
+
+    def sync(self, path: Path) -> None:
+        """Merge this index's unsaved ideas into ``path`` and adopt the merged index.
+
+        Runs under a file lock, so processes sharing one file (e.g. work-queue workers)
+        neither overwrite each other's ideas nor miss them for long.
+        """
+        with self._save_lock, _file_lock(path):
+            merged = NoveltyIndex.load(path, self.threshold, self.bands)
+            with self._lock:
+                pending = list(self._pending)
+            for sig, title in pending:
+                merged._insert(sig, title)
+            merged.save(path)
+            with self._lock:
+                # Ideas added while merging stay pending (and searchable) for the next sync.
+                added = self._pending[len(pending):]
+                self._sigs, self._titles, self._buckets = (
+                    merged._sigs, merged._titles, merged._buckets,
+                )
+                for sig, title in added:
+                    self._insert(sig, title)
+                self._pending = added
+                self.dirty = bool(added)
+                self.version = merged.version
+
+    def stale(self, path: Path) -> bool:
+        """True when ``path`` was rewritten since this index last loaded or saved it."""
+        return _file_version(path) != self.version
+
+    @classmethod
+    def load(
+        cls, path: Path, threshold: float = DEFAULT_THRESHOLD, bands: int = BANDS,
+    ) -> "NoveltyIndex":
+        index = cls(threshold, bands)
+        index.version = _file_version(path)
+        if index.version is None:
+            return index
+        data = path.read_bytes()
+        magic, meta_len = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a novelty index")
+        meta = json.loads(data[_HEADER.size : _HEADER.size + meta_len])
+        if meta["num_perm"] != NUM_PERM:
+            raise ValueError(f"{path} was built with num_perm={meta['num_perm']}")
+        sigs = array("Q")
+        sigs.frombytes(data[_HEADER.size + meta_len :])
+        for i, title in enumerate(meta["titles"]):
+            index._insert(sigs[i * NUM_PERM : (i + 1) * NUM_PERM], title)
+        return index
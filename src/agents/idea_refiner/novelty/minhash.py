@@ -0,0 +1,58 @@
+import re
+import zlib
+from array import array
+
+from agents.idea_refiner.idea import idea_of
+
+NUM_PERM = 64
+SHINGLE_SIZE = 2
+
+_BIN_BITS = 6  # 2**6 == NUM_PERM bins
+_VALUE_BITS = 64 - _BIN_BITS
+_VALUE_MASK = (1 << _VALUE_BITS) - 1
+_MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+_EMPTY = _VALUE_MASK + 1
+
+_SECTION_LABEL = re.compile(r"\*\*[^*\n]{1,40}:\*\*")
+_WORD = re.compile(r"[a-z0-9$]+")
+
+
+def idea_title(text: str) -> str:
+    return idea_of(text).title
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[int]:
+    """64-bit hashed word n-grams, ignoring the section labels every idea shares."""
+    words = _WORD.findall(_SECTION_LABEL.sub(" ", text).lower())
+    grams = (
+        [" ".join(words[i : i + size]) for i in range(len(words) - size + 1)]
+        if len(words) >= size
+        else [" ".join(words)] if words else []
+    )
+    return {(zlib.crc32(g.encode()) * _GOLDEN) & _MASK64 for g in grams}
+
+
+def signature(text: str) -> array:
+    """One-permutation MinHash: each shingle is hashed once and binned by its top bits.
+
+    Empty bins borrow from the next non-empty bin (rotation densification), so the
+    signature behaves like a ``NUM_PERM``-permutation MinHash at O(shingles) cost.
+    """
+    bins = [_EMPTY] * NUM_PERM
+    for h in shingles(text):
+        b, v = h >> _VALUE_BITS, h & _VALUE_MASK
+        bins[b] = min(bins[b], v)
+    filled = [i for i, v in enumerate(bins) if v != _EMPTY]
+    if not filled:
+        return array("Q", bins)
+    for i in range(NUM_PERM):
+        if bins[i] == _EMPTY:
+            offset = next(((j - i) % NUM_PERM for j in filled if j > i), filled[0] + NUM_PERM - i)
+            bins[i] = bins[(i + offset) % NUM_PERM] | (offset << _VALUE_BITS)
+    return array("Q", bins)
+
+
+def similarity(sig_a, sig_b) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
@@ -0,0 +1,51 @@
+import json
+import logging
+import os
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+from agents.idea_refiner.novelty.index import DEFAULT_THRESHOLD, NoveltyIndex
+
+log = logging.getLogger(__name__)
+
+_index: NoveltyIndex | None = None
+_lock = threading.Lock()
+
+
+def index_path() -> Path | None:
+    value = os.getenv("NOVELTY_INDEX")
+    return Path(value) if value else None
+
+
+def get_index() -> NoveltyIndex | None:
+    """Process-wide index from ``NOVELTY_INDEX`` (disabled when unset)."""
+    global _index
+    path = index_path()
+    if path is None:
+        return None
+    with _lock:
+        if _index is None:
+            threshold = float(os.getenv("NOVELTY_THRESHOLD", DEFAULT_THRESHOLD))
+            _index = NoveltyIndex.load(path, threshold)
+            log.info("   🧬 Novelty index loaded: %d past idea(s)", len(_index))
+    return _index
+
+
+def save_index() -> None:
+    """Merge this process's new ideas into ``NOVELTY_INDEX``, picking up other processes' too."""
+    path = index_path()
+    if _index is not None and path is not None and (_index.dirty or _index.stale(path)):
+        _index.sync(path)
+
+
+def iter_jsonl_ideas(path: Path) -> Iterator[tuple[str, None]]:
+    """Winning ideas from a batch JSONL archive, for bulk builds."""
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("winning_idea"):
+                yield record["winning_idea"], None
@@ -0,0 +1,111 @@
+import atexit
+import copy
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+TEXT_FORMAT = "%(asctime)s | %(levelname)-8s | %(message)s"
+CONTEXT_FIELDS = ("run_id", "round", "lane", "model", "call_id")
+
+_context: ContextVar[dict | None] = ContextVar("log_context", default=None)
+_call_ids = itertools.count(1)
+_listener: logging.handlers.QueueListener | None = None
+_plain = logging.Formatter()
+
+
+@contextmanager
+def log_context(**fields) -> Iterator[None]:
+    """Stamp every record logged inside the block (and tasks/threads it spawns) with ``fields``."""
+    token = _context.set({**(_context.get() or {}), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def next_call_id() -> int:
+    return next(_call_ids)
+
+
+class ContextFilter(logging.Filter):
+    """Copy the current run/round/lane/model/call id onto the record, in the logging thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in (_context.get() or {}).items():
+            setattr(record, key, value)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage().strip(),
+        }
+        for key in CONTEXT_FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Merge args and render tracebacks in the caller; encoding and I/O happen on the listener."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _plain.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(fmt: str = TEXT_FORMAT, stream=None) -> None:
+    """Set up root logging for an entry point.
+
+    ``LOG_FORMAT=json`` routes records through a queue to a background thread that
+    writes one JSON object per line, tagged with the run/round/lane/model/call ids;
+    the default keeps the human-readable text output.
+    """
+    global _listener
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, _QueueHandler):
+            root.removeHandler(handler)
+    flush_logging()
+    if os.getenv("LOG_FORMAT", "text").lower() != "json":
+        logging.basicConfig(level=logging.INFO, format=fmt, datefmt="%H:%M:%S", stream=stream)
+        return
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    sink = logging.StreamHandler(stream or sys.stdout)
+    sink.setFormatter(JsonFormatter())
+    handler = _QueueHandler(records)
+    handler.addFilter(ContextFilter())
+    logging.basicConfig(level=logging.INFO, handlers=[handler], force=True)
+    _listener = logging.handlers.QueueListener(records, sink)
+    _listener.start()
+    atexit.unregister(flush_logging)
+    atexit.register(flush_logging)
+
+
+def flush_logging() -> None:
+    """Write out everything still queued (called at exit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
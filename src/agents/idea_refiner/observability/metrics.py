@@ -0,0 +1,217 @@
+import bisect
+import math
+import threading
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 90, 120, 180, 300)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+
+class _Shards:
+    """Per-thread counter arrays, summed at scrape time.
+
+    Each thread only ever writes its own array, so the hot path takes no lock;
+    the registry lock is taken once per thread per series and when scraping.
+    Arrays of finished threads are folded into ``_retired`` whenever a new thread
+    registers and at scrape time, so short-lived threads don't pile up even when
+    nothing scrapes.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._local = threading.local()
+        self._live: list[tuple[threading.Thread, list[float]]] = []
+        self._retired = [0.0] * size
+        self._lock = threading.Lock()
+
+    def mine(self) -> list[float]:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = [0.0] * self._size
+            with self._lock:
+                self._fold_dead()
+                self._live.append((threading.current_thread(), values))
+            return values
+
+    def _fold_dead(self) -> None:
+        """Move finished threads' counts into ``_retired`` (caller holds the lock)."""
+        live = []
+        for thread, values in self._live:
+            if thread.is_alive():
+                live.append((thread, values))
+            else:
+                self._retired = [a + b for a, b in zip(self._retired, values)]
+        self._live = live
+
+    def totals(self) -> list[float]:
+        with self._lock:
+            self._fold_dead()
+            arrays = [self._retired, *(values for _, values in self._live)]
+        return [sum(column) for column in zip(*arrays)]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.doc = doc
+        self.labelnames = labels
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: object):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _label_str(self, key: tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("_shards",)
+
+    def __init__(self) -> None:
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._shards.mine()[0] += amount
+
+    def value(self) -> float:
+        return self._shards.totals()[0]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _render_child(self, key, child) -> list[str]:
+        return [f"{self.name}{self._label_str(key)} {_number(child.value())}"]
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_shards")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self._bounds = bounds
+        # One slot per bucket, then +Inf, then sum.
+        self._shards = _Shards(len(bounds) + 2)
+
+    def observe(self, value: float) -> None:
+        values = self._shards.mine()
+        values[bisect.bisect_left(self._bounds, value)] += 1
+        values[-1] += value
+
+    def snapshot(self) -> tuple[list[float], float]:
+        totals = self._shards.totals()
+        return totals[:-1], totals[-1]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, doc: str, labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _render_child(self, key, child) -> list[str]:
+        counts, total = child.snapshot()
+        lines, running = [], 0.0
+        for bound, count in zip((*self.buckets, math.inf), counts):
+            running += count
+            le = "+Inf" if bound == math.inf else _number(bound)
+            labels = self._label_str(key, f'le="{le}"')
+            lines.append(f"{self.name}_bucket{labels} {_number(running)}")
+        lines.append(f"{self.name}_sum{self._label_str(key)} {_number(total)}")
+        lines.append(f"{self.name}_count{self._label_str(key)} {_number(running)}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+REGISTRY: dict[str, _Metric] = {}
+
+
+def register(metric: _Metric) -> _Metric:
+    REGISTRY[metric.name] = metric
+    return metric
+
+
+def render_metrics() -> str:
+    """Every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY.values():
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+LLM_LATENCY = register(Histogram(
+    "idea_refiner_llm_latency_seconds", "LLM HTTP call latency.", ("provider", "model"),
+))
+LLM_TOKENS = register(Histogram(
+    "idea_refiner_llm_tokens", "Tokens per LLM call.", ("provider", "kind"), TOKEN_BUCKETS,
+))
+LLM_CALLS = register(Counter(
+    "idea_refiner_llm_calls_total", "LLM HTTP calls by response status.", ("provider", "status"),
+))
+RUN_ROUNDS = register(Histogram(
+    "idea_refiner_run_rounds", "Rounds each pipeline run took.", (), (1, 2, 3, 4, 5),
+))
+JUDGE_VERDICTS = register(Counter(
+    "idea_refiner_judge_verdicts_total", "Judge verdicts after the quality gate.", ("verdict",),
+))
+GATE_OVERRIDES = register(Counter(
+    "idea_refiner_quality_gate_overrides_total",
+    "Judge accepts the quality gate turned into rejections.", ("judge_verdict",),
+))
+GENERATION_FAILURES = register(Counter(
+    "idea_refiner_generation_failures_total", "Lane generations that produced no idea.",
+    ("model", "reason"),
+))
+LANE_DECISIONS = register(Counter(
+    "idea_refiner_lane_decisions_total", "Retirement-policy decisions on rejected lanes.",
+    ("policy", "decision"),
+))
+TELEGRAM_DELIVERIES = register(Counter(
+    "idea_refiner_telegram_deliveries_total", "Telegram deliveries by outcome.", ("outcome",),
+))
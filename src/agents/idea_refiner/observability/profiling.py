@@ -0,0 +1,282 @@
+import asyncio
+import cProfile
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+STAGES = ("generate", "generate_calls", "judge", "quality_gate", "render", "deliver")
+SAMPLE_S = 0.01
+LOOP_LAG_S = 0.05
+TOP_ALLOCATIONS = 10
+
+_active: ContextVar["RunProfile | None"] = ContextVar("run_profile", default=None)
+_OFF = nullcontext()
+
+# tracemalloc is process-wide: profiled runs share it, and only the last one out stops it
+# (and only if a profile started it).
+_tracemalloc_users = 0
+_tracemalloc_ours = False
+_tracemalloc_lock = threading.Lock()
+
+
+def _acquire_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_ours
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(16)
+            _tracemalloc_ours = True
+        _tracemalloc_users += 1
+
+
+def _release_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_ours
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_ours:
+            tracemalloc.stop()
+            _tracemalloc_ours = False
+
+
+class _StageStats:
+    __slots__ = ("calls", "cpu_s", "profiles", "wall_s")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.profiles: list[cProfile.Profile] = []
+
+
+class RunProfile:
+    """CPU profiles per stage, stack samples, memory snapshots and loop lag for one run.
+
+    Only one cProfile can be active per process at a time, so a stage that overlaps
+    another profiled stage (e.g. concurrent lane calls) gets timings and stack samples
+    only; the ``profiled`` column of the summary says how many calls have a CPU profile.
+    """
+
+    def __init__(self, out_dir: Path) -> None:
+        self.out_dir = out_dir
+        self.stages: dict[str, _StageStats] = {}
+        self.stacks: Counter = Counter()
+        self.memory: list[dict] = []
+        self.loop_lag: list[float] = []
+        self._thread_stage: dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+
+    def start(self) -> "RunProfile":
+        _acquire_tracemalloc()
+        self._snapshot = tracemalloc.take_snapshot()
+        self._sampler.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._sampler.join()
+        _release_tracemalloc()
+
+    def _stats(self, name: str) -> _StageStats:
+        with self._lock:
+            return self.stages.setdefault(name, _StageStats())
+
+    @contextmanager
+    def stage(self, name: str, cpu: bool = True) -> Iterator[None]:
+        stats = self._stats(name)
+        thread_id = threading.get_ident()
+        outer = self._thread_stage.get(thread_id)
+        self._thread_stage[thread_id] = name
+        profile = cProfile.Profile() if cpu else None
+        try:
+            if profile is not None:
+                profile.enable()
+        except ValueError:
+            profile = None
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            with self._lock:
+                stats.calls += 1
+                stats.wall_s += time.perf_counter() - wall
+                stats.cpu_s += time.thread_time() - cpu
+                if profile is not None:
+                    stats.profiles.append(profile)
+            if outer is None:
+                self._thread_stage.pop(thread_id, None)
+            else:
+                self._thread_stage[thread_id] = outer
+
+    def _sample(self) -> None:
+        """Collapsed stacks of every thread that is inside a stage, every ``SAMPLE_S``."""
+        own = threading.get_ident()
+        while not self._stop.wait(SAMPLE_S):
+            frames = sys._current_frames()
+            for thread_id, stage in list(self._thread_stage.items()):
+                frame = frames.get(thread_id)
+                if frame is None or thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_qualname} ({Path(code.co_filename).name})")
+                    frame = frame.f_back
+                self.stacks[";".join([stage, *reversed(stack)])] += 1
+
+    def snapshot(self, label: str) -> None:
+        """Allocation growth since the previous snapshot (taken between rounds).
+
+        Skipped when tracing was turned off underneath the run (e.g. by other code).
+        """
+        if not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        snap = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+        top = snap.compare_to(self._snapshot, "lineno")[:TOP_ALLOCATIONS] if self._snapshot else []
+        self._snapshot = snap
+        self.memory.append({
+            "label": label,
+            "current_mb": round(current / 2**20, 2),
+            "peak_mb": round(peak / 2**20, 2),
+            "top": [str(stat) for stat in top],
+        })
+
+    def write(self) -> list[dict]:
+        """Write pstats, collapsed stacks and the summary; returns the summary rows."""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        rows = []
+        for name, stats in self.stages.items():
+            top = None
+            if stats.profiles:
+                merged = pstats.Stats(stats.profiles[0])
+                for profile in stats.profiles[1:]:
+                    merged.add(profile)
+                merged.dump_stats(self.out_dir / f"{name}.pstats")
+                top = _top_function(merged)
+            rows.append({
+                "stage": name, "calls": stats.calls, "profiled": len(stats.profiles),
+                "wall_s": round(stats.wall_s, 3),
+                "cpu_s": round(stats.cpu_s, 3), "top_function": top,
+            })
+        rows.sort(key=lambda r: STAGES.index(r["stage"]) if r["stage"] in STAGES else len(STAGES))
+        with (self.out_dir / "stacks.collapsed").open("w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        (self.out_dir / "summary.txt").write_text(self.summary(rows))
+        return rows
+
+    def summary(self, rows: list[dict]) -> str:
+        lines = [
+            f"{'stage':<16}{'calls':>6}{'profiled':>9}{'wall_s':>10}{'cpu_s':>10}  top function"
+        ]
+        for r in rows:
+            lines.append(
+                f"{r['stage']:<16}{r['calls']:>6}{r['profiled']:>9}"
+                f"{r['wall_s']:>10.3f}{r['cpu_s']:>10.3f}"
+                f"  {r['top_function'] or ''}"
+            )
+        if self.loop_lag:
+            lag = sorted(self.loop_lag)
+            lines.append(
+                f"\nevent-loop lag: {len(lag)} samples, "
+                f"mean {sum(lag) / len(lag) * 1000:.1f}ms, max {lag[-1] * 1000:.1f}ms"
+            )
+        for m in self.memory:
+            lines.append(f"\nmemory after {m['label']}: {m['current_mb']} MB (peak {m['peak_mb']})")
+            lines.extend(f"  {line}" for line in m["top"])
+        return "\n".join(lines) + "\n"
+
+
+def _top_function(stats: pstats.Stats) -> str | None:
+    """Function with the most own time, outside the profiler itself."""
+    own = [
+        (tt, func) for func, (_, _, tt, _, _) in stats.stats.items()
+        if "_lsprof" not in func[0] and "disable" not in func[2]
+    ]
+    if not own:
+        return None
+    _, (filename, line, name) = max(own)
+    return f"{name} ({Path(filename).name}:{line})"
+
+
+def profile_dir() -> Path | None:
+    value = os.getenv("PROFILE_DIR")
+    return Path(value) if value else None
+
+
+@contextmanager
+def profile_run(out_dir: str | Path | None) -> Iterator[RunProfile | None]:
+    """Profile everything in the block into a fresh directory under ``out_dir`` (None: off)."""
+    if out_dir is None:
+        yield None
+        return
+    name = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+    profile = RunProfile(Path(out_dir) / name).start()
+    token = _active.set(profile)
+    try:
+        yield profile
+    finally:
+        _active.reset(token)
+        profile.stop()
+        rows = profile.write()
+        log.info("🔬 Profile written to %s\n%s", profile.out_dir, profile.summary(rows))
+
+
+def stage(name: str, cpu: bool = True):
+    """Profile the block as pipeline stage ``name`` when a run is being profiled.
+
+    ``cpu=False`` records timings and stack samples without holding the cProfile slot.
+    """
+    profile = _active.get()
+    return _OFF if profile is None else profile.stage(name, cpu)
+
+
+def memory_snapshot(label: str) -> None:
+    profile = _active.get()
+    if profile is not None:
+        profile.snapshot(label)
+
+
+def profiled(fn: Callable, stage_name: str) -> Callable:
+    """Wrap ``fn`` so that, run on a worker thread, it is profiled as part of ``stage_name``."""
+    profile = _active.get()
+    if profile is None:
+        return fn
+
+    def run(*args, **kwargs):
+        with profile.stage(stage_name):
+            return fn(*args, **kwargs)
+
+    return run
+
+
+async def sample_loop_lag(interval: float = LOOP_LAG_S) -> None:
+    """Record how late the event loop wakes up from ``sleep(interval)`` until cancelled."""
+    profile = _active.get()
+    if profile is None:
+        return
+    loop = asyncio.get_running_loop()
+    while True:
+        t0 = loop.time()
+        await asyncio.sleep(interval)
+        profile.loop_lag.append(max(loop.time() - t0 - interval, 0.0))
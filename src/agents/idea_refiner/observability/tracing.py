@@ -0,0 +1,269 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from agents.idea_refiner.config import data_path
+
+log = logging.getLogger(__name__)
+
+SERVICE_NAME = "idea-refiner"
+DEFAULT_OTLP_ENDPOINT = "http://localhost:4318"
+BATCH_SIZE = 64
+FLUSH_S = 2.0
+
+_current: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+_processor: "SpanProcessor | None" = None
+_configured = False
+_lock = threading.Lock()
+
+
+class Span:
+    __slots__ = (
+        "attributes", "end_ns", "error", "name", "parent_id", "span_id", "start_ns", "trace_id",
+    )
+
+    def __init__(self, name: str, parent: "Span | None", attributes: dict) -> None:
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes = attributes
+        self.error: str | None = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update({k: v for k, v in attributes.items() if v is not None})
+
+    @property
+    def duration_s(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_s": round(self.duration_s, 6),
+            "attributes": self.attributes,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    def set(self, **attributes) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+Exporter = Callable[[list[Span]], None]
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span | _NoopSpan]:
+    """Time a block as a child of the current span; a no-op unless tracing is configured.
+
+    The current span lives in a ContextVar, so spans opened in asyncio tasks and in
+    ``asyncio.to_thread`` workers nest under the span that started them.
+    """
+    processor = get_processor()
+    if processor is None:
+        yield _NOOP
+        return
+    s = Span(name, _current.get(), {k: v for k, v in attributes.items() if v is not None})
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        s.end_ns = time.time_ns()
+        processor.on_end(s)
+
+
+def current_span() -> Span | _NoopSpan:
+    return _current.get() or _NOOP
+
+
+class JsonFileExporter:
+    """Append one JSON object per finished span to a local file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def __call__(self, spans: list[Span]) -> None:
+        with self.path.open("a", encoding="utf-8") as f:
+            for s in spans:
+                f.write(json.dumps(s.to_dict(), default=str) + "\n")
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(spans: list[Span], service_name: str = SERVICE_NAME) -> dict:
+    """OTLP/HTTP JSON body (``ExportTraceServiceRequest``) for a batch of spans."""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [
+            {"key": "service.name", "value": {"stringValue": service_name}},
+        ]},
+        "scopeSpans": [{
+            "scope": {"name": "agents.idea_refiner"},
+            "spans": [
+                {
+                    "traceId": s.trace_id,
+                    "spanId": s.span_id,
+                    **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                    "name": s.name,
+                    "kind": 1,
+                    "startTimeUnixNano": str(s.start_ns),
+                    "endTimeUnixNano": str(s.end_ns),
+                    "attributes": [
+                        {"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()
+                    ],
+                    "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+                }
+                for s in spans
+            ],
+        }],
+    }]}
+
+
+class OtlpExporter:
+    """POST spans to an OTLP/HTTP collector's ``/v1/traces`` as JSON."""
+
+    def __init__(self, endpoint: str, timeout: float = 10.0) -> None:
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.timeout = timeout
+
+    def __call__(self, spans: list[Span]) -> None:
+        import urllib.request
+
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(otlp_payload(spans)).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class SpanProcessor:
+    """Batch finished spans and export them from a background thread."""
+
+    def __init__(self, exporter: Exporter, batch_size: int = BATCH_SIZE) -> None:
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._flushed = threading.Condition()
+        self._pending = 0
+        self._thread = threading.Thread(target=self._loop, name="span-export", daemon=True)
+        self._thread.start()
+
+    def on_end(self, s: Span) -> None:
+        with self._flushed:
+            self._pending += 1
+        self._queue.put(s)
+
+    def _loop(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = []
+            try:
+                item = self._queue.get(timeout=FLUSH_S)
+                while item is not None:
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    item = self._queue.get_nowait()
+                stopping = item is None
+            except queue.Empty:
+                pass
+            if batch:
+                self._export(batch)
+
+    def _export(self, batch: list[Span]) -> None:
+        try:
+            self.exporter(batch)
+        except Exception as e:  # noqa: BLE001
+            log.warning("⚠️  Span export failed (%d spans dropped): %s", len(batch), e)
+        with self._flushed:
+            self._pending -= len(batch)
+            self._flushed.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every finished span has been handed to the exporter."""
+        with self._flushed:
+            return self._flushed.wait_for(lambda: self._pending == 0, timeout)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        self.flush(timeout)
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+def _json_exporter() -> Exporter:
+    return JsonFileExporter(os.getenv("TRACE_FILE") or data_path("traces.jsonl"))
+
+
+def _otlp_exporter() -> Exporter:
+    return OtlpExporter(os.getenv("OTLP_ENDPOINT", DEFAULT_OTLP_ENDPOINT))
+
+
+EXPORTERS: dict[str, Callable[[], Exporter]] = {
+    "json": _json_exporter,
+    "otlp": _otlp_exporter,
+}
+
+
+def register_exporter(name: str, factory: Callable[[], Exporter]) -> None:
+    EXPORTERS[name] = factory
+
+
+def get_processor() -> SpanProcessor | None:
+    """Process-wide span processor for ``TRACE_EXPORTER`` (tracing is off when unset)."""
+    global _processor, _configured
+    if _configured:
+        return _processor
+    with _lock:
+        if not _configured:
+            name = os.getenv("TRACE_EXPORTER", "").strip().lower()
+            if name and name not in EXPORTERS:
+                log.warning("⚠️  Unknown trace exporter %r — tracing disabled", name)
+            elif name:
+                _processor = SpanProcessor(EXPORTERS[name]())
+                atexit.register(_processor.shutdown)
+            _configured = True
+    return _processor
+
+
+def set_processor(processor: SpanProcessor | None) -> None:
+    """Install (or with None, reset to ``TRACE_EXPORTER``) the process-wide processor."""
+    global _processor, _configured
+    with _lock:
+        _processor = processor
+        _configured = processor is not None
@@ -0,0 +1,3 @@
+from agents.idea_refiner.outbox.cli import main
+
+main()
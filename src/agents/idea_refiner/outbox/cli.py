@@ -0,0 +1,33 @@
+import argparse
+import json
+from pathlib import Path
+
+from agents.idea_refiner.config import load_env
+from agents.idea_refiner.observability.logs import configure_logging
+from agents.idea_refiner.outbox.store import Outbox, outbox_path
+from agents.idea_refiner.outbox.worker import OutboxWorker
+from agents.idea_refiner.output.telegram import deliver_payload
+
+
+def main(argv: list[str] | None = None) -> None:
+    load_env()
+    parser = argparse.ArgumentParser(
+        prog="idea-refiner-outbox", description="Inspect and drain the delivery outbox.",
+    )
+    parser.add_argument("--db", type=Path, default=outbox_path(), help="default: $TELEGRAM_OUTBOX")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="queue depth and delivery lag")
+    sub.add_parser("drain", help="deliver every entry that is due now")
+    args = parser.parse_args(argv)
+    if args.db is None:
+        parser.error("no outbox path: pass --db or set TELEGRAM_OUTBOX")
+
+    outbox = Outbox(args.db)
+    if args.command == "drain":
+        configure_logging("%(message)s")
+        worker = OutboxWorker(outbox, deliver_payload)
+        delivered = 0
+        while outbox.next_due_in() == 0:
+            delivered += worker.run_once()
+        print(f"delivered {delivered}")
+    print(json.dumps(outbox.stats(), indent=2))
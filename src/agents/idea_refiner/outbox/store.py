@@ -0,0 +1,164 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from agents.idea_refiner.storage.db import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    run_id        TEXT PRIMARY KEY,
+    payload       TEXT NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'pending',
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    next_attempt  REAL NOT NULL,
+    created_at    REAL NOT NULL,
+    delivered_at  REAL,
+    last_error    TEXT,
+    sent          INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt);
+"""
+
+# Columns added after the first release, migrated onto existing outboxes.
+_ADDED_COLUMNS = {"sent": "INTEGER NOT NULL DEFAULT 0"}
+
+LEASE_S = 120.0
+LAG_WINDOW = 100
+
+_outbox: "Outbox | None" = None
+_lock = threading.Lock()
+
+
+class Outbox:
+    """Durable queue of finished results awaiting delivery, one entry per run id."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+            have = {r["name"] for r in self._conn.execute("PRAGMA table_info(outbox)")}
+            for column, kind in _ADDED_COLUMNS.items():
+                if column not in have:
+                    self._conn.execute(f"ALTER TABLE outbox ADD COLUMN {column} {kind}")
+
+    def enqueue(self, run_id: str, payload: dict) -> bool:
+        """Commit a result for delivery; False when this run id is already queued."""
+        now = time.time()
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO outbox (run_id, payload, next_attempt, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (run_id, json.dumps(payload), now, now),
+            )
+        return cur.rowcount > 0
+
+    def claim_due(self, limit: int = 10) -> list[dict]:
+        """Lease due entries so a concurrent worker does not deliver them twice.
+
+        Each entry's ``sent`` is how many of its messages earlier attempts already delivered.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT run_id, payload, attempts, next_attempt, sent FROM outbox "
+                "WHERE status = 'pending' AND next_attempt <= ? ORDER BY next_attempt LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            claimed = []
+            for r in rows:
+                cur = self._conn.execute(
+                    "UPDATE outbox SET next_attempt = ? WHERE run_id = ? AND next_attempt = ?",
+                    (now + LEASE_S, r["run_id"], r["next_attempt"]),
+                )
+                if cur.rowcount:
+                    claimed.append({
+                        "run_id": r["run_id"],
+                        "payload": json.loads(r["payload"]),
+                        "attempts": r["attempts"],
+                        "sent": r["sent"],
+                    })
+        return claimed
+
+    def mark_delivered(self, run_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'delivered', attempts = attempts + 1, "
+                "delivered_at = ?, last_error = NULL WHERE run_id = ?",
+                (time.time(), run_id),
+            )
+
+    def mark_failed(
+        self, run_id: str, error: str, retry_in: float | None, sent: int | None = None,
+    ) -> None:
+        """Schedule another attempt in ``retry_in`` seconds, or give up when None.
+
+        ``sent`` records how many messages are delivered so far, so the retry resumes there.
+        """
+        with self._lock, self._conn:
+            if retry_in is None:
+                self._conn.execute(
+                    "UPDATE outbox SET status = 'dead', attempts = attempts + 1, last_error = ?, "
+                    "sent = COALESCE(?, sent) WHERE run_id = ?",
+                    (error, sent, run_id),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE outbox SET attempts = attempts + 1, next_attempt = ?, last_error = ?, "
+                    "sent = COALESCE(?, sent) WHERE run_id = ?",
+                    (time.time() + retry_in, error, sent, run_id),
+                )
+
+    def next_due_in(self) -> float | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt) FROM outbox WHERE status = 'pending'"
+            ).fetchone()
+        return None if row[0] is None else max(row[0] - time.time(), 0.0)
+
+    def stats(self) -> dict:
+        """Queue depth and delivery lag, for the /outbox endpoint and the CLI."""
+        now = time.time()
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+            ).fetchall())
+            oldest = self._conn.execute(
+                "SELECT MIN(created_at) FROM outbox WHERE status = 'pending'"
+            ).fetchone()[0]
+            lags = [r[0] for r in self._conn.execute(
+                "SELECT delivered_at - created_at FROM outbox WHERE status = 'delivered' "
+                "ORDER BY delivered_at DESC LIMIT ?",
+                (LAG_WINDOW,),
+            ).fetchall()]
+        return {
+            "depth": counts.get("pending", 0),
+            "delivered": counts.get("delivered", 0),
+            "dead": counts.get("dead", 0),
+            "oldest_pending_age_s": round(now - oldest, 2) if oldest else 0.0,
+            "last_delivery_lag_s": round(lags[0], 3) if lags else None,
+            "avg_delivery_lag_s": round(sum(lags) / len(lags), 3) if lags else None,
+        }
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def outbox_path() -> Path | None:
+    value = os.getenv("TELEGRAM_OUTBOX")
+    return Path(value) if value else None
+
+
+def get_outbox() -> Outbox | None:
+    """Process-wide outbox from ``TELEGRAM_OUTBOX`` (inline delivery when unset)."""
+    global _outbox
+    path = outbox_path()
+    if path is None:
+        return None
+    with _lock:
+        if _outbox is None:
+            _outbox = Outbox(path)
+    return _outbox
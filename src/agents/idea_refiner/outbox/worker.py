@@ -0,0 +1,125 @@
+import atexit
+import logging
+import os
+import random
+import threading
+import time
+from collections.abc import Callable
+
+from agents.idea_refiner.outbox.store import Outbox
+
+log = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 8
+BASE_BACKOFF_S = 5.0
+MAX_BACKOFF_S = 3600.0
+POLL_S = 30.0
+
+_worker: "OutboxWorker | None" = None
+_lock = threading.Lock()
+
+
+def backoff(attempts: int) -> float:
+    """Seconds before retry number ``attempts`` (1-based), with ±10% jitter."""
+    delay = min(BASE_BACKOFF_S * 2 ** (attempts - 1), MAX_BACKOFF_S)
+    return delay * random.uniform(0.9, 1.1)
+
+
+class OutboxWorker:
+    """Background thread that delivers due outbox entries, retrying with exponential backoff.
+
+    ``deliver(payload, start)`` sends the payload's messages from index ``start`` on and
+    reports ``sent``, the number delivered in total, so a retry never repeats a message.
+    """
+
+    def __init__(self, outbox: Outbox, deliver: Callable[[dict, int], dict]) -> None:
+        self.outbox = outbox
+        self._deliver = deliver
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._busy = False
+        self._thread = threading.Thread(target=self._loop, name="outbox-worker", daemon=True)
+
+    def start(self) -> "OutboxWorker":
+        self._thread.start()
+        return self
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def run_once(self) -> int:
+        """Deliver everything currently due; returns how many were delivered."""
+        delivered = 0
+        for item in self.outbox.claim_due():
+            sent = item["sent"]
+            try:
+                report = self._deliver(item["payload"], sent)
+                error = None if report.get("ok") else report.get("error") or "delivery failed"
+                sent = report.get("sent", sent)
+            except Exception as exc:  # noqa: BLE001
+                error = str(exc)
+            if error is None:
+                self.outbox.mark_delivered(item["run_id"])
+                delivered += 1
+                continue
+            attempts = item["attempts"] + 1
+            retry_in = backoff(attempts) if attempts < MAX_ATTEMPTS else None
+            self.outbox.mark_failed(item["run_id"], error, retry_in, sent)
+            if retry_in is None:
+                log.error("   📭 Outbox gave up on run %s: %s", item["run_id"], error)
+            else:
+                log.warning(
+                    "   📭 Outbox delivery of run %s failed (%s), retry in %.0fs",
+                    item["run_id"], error, retry_in,
+                )
+        return delivered
+
+    def _loop(self) -> None:
+        while not self._stopping.is_set():
+            self._busy = True
+            try:
+                self.run_once()
+            except Exception:
+                log.exception("   📭 Outbox worker error")
+            finally:
+                self._busy = False
+            due = self.outbox.next_due_in()
+            self._wake.wait(POLL_S if due is None else min(due, POLL_S))
+            self._wake.clear()
+
+    def drain(self, timeout: float) -> bool:
+        """Wait until nothing is due right now (or ``timeout``); True when drained."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            due = self.outbox.next_due_in()
+            if not self._busy and (due is None or due > 0):
+                return True
+            self.notify()
+            time.sleep(0.05)
+        return False
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopping.is_set()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+
+
+def _drain_at_exit(worker: OutboxWorker) -> None:
+    if worker.stopped:
+        return
+    worker.drain(float(os.getenv("OUTBOX_DRAIN_S", "10")))
+    worker.stop()
+
+
+def start_worker(outbox: Outbox, deliver: Callable[[dict, int], dict]) -> OutboxWorker:
+    """Process-wide worker, started on first use and given a bounded drain at exit."""
+    global _worker
+    with _lock:
+        if _worker is None:
+            _worker = OutboxWorker(outbox, deliver).start()
+            atexit.register(_drain_at_exit, _worker)
+    return _worker
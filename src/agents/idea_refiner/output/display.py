@@ -2,8 +2,10 @@ import logging
 import time
 from datetime import datetime
 
-from agents.idea_refiner.output.console import print_results
-from agents.idea_refiner.output.telegram import send_telegram_summary
+from agents.idea_refiner.observability.profiling import stage
+from agents.idea_refiner.observability.tracing import span
+from agents.idea_refiner.output.render import render_result
+from agents.idea_refiner.output.sinks import deliver_to_sinks
 
 log = logging.getLogger(__name__)
 
@@ -15,6 +17,9 @@ def display_and_save(theme: str | None, state: dict) -> str:
     total_elapsed = time.time() - state["start"]
     today = datetime.now().strftime("%Y-%m-%d")
     log.info("⏱️  Total time: %.1fs", total_elapsed)
-    print_results(theme, state, total_elapsed, today)
-    send_telegram_summary(theme, state, total_elapsed, today)
+    with stage("render"):
+        rendered = render_result(theme, state, total_elapsed, today)
+    with span("deliver", run_id=state.get("run_id")) as s, stage("deliver"):
+        state["sinks"] = deliver_to_sinks(rendered)
+        s.set(failed=sum(not r["ok"] for r in state["sinks"].values()))
     return state["winning_idea"]
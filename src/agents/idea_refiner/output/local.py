@@ -0,0 +1,68 @@
+import json
+import os
+from pathlib import Path
+
+from agents.idea_refiner.batch.jsonl import append_record, open_for_append
+from agents.idea_refiner.storage.db import connect
+
+_RESULTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    run_id        TEXT PRIMARY KEY,
+    run_date      TEXT NOT NULL,
+    theme         TEXT,
+    winner_model  TEXT,
+    title         TEXT,
+    total         INTEGER,
+    winning_idea  TEXT,
+    result        TEXT NOT NULL
+)
+"""
+
+
+def _setting(name: str) -> Path:
+    value = os.getenv(name)
+    if not value:
+        raise RuntimeError(f"{name} is not set")
+    return Path(value)
+
+
+def jsonl_sink(rendered: dict) -> None:
+    """Append the result payload to ``RESULTS_JSONL``."""
+    with open_for_append(_setting("RESULTS_JSONL")) as f:
+        append_record(f, rendered["result"])
+
+
+def sqlite_sink(rendered: dict) -> None:
+    """Upsert the result into the ``results`` table of ``RESULTS_DB``."""
+    winner = rendered["winner_ev"] or {}
+    conn = connect(_setting("RESULTS_DB"))
+    try:
+        with conn:
+            conn.execute(_RESULTS_SCHEMA)
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    rendered["run_id"] or rendered["today"], rendered["today"],
+                    rendered["theme"], rendered["winner_name"], rendered["title"],
+                    winner.get("total"), rendered["winning_idea"],
+                    json.dumps(rendered["result"], ensure_ascii=False),
+                ),
+            )
+    finally:
+        conn.close()
+
+
+def markdown_sink(rendered: dict) -> None:
+    """Append a dated entry to the Markdown digest at ``DIGEST_MARKDOWN``."""
+    winner = rendered["winner_ev"]
+    score = f" ({winner['total']}/30)" if winner else ""
+    entry = (
+        f"## {rendered['today']} — {rendered['title'] or 'Untitled'}\n\n"
+        f"*Theme:* {rendered['theme'] or 'Open'} · "
+        f"*Winner:* {rendered['winner_name'] or 'N/A'}{score}\n\n"
+        f"{rendered['winning_idea'].strip()}\n\n---\n\n"
+    )
+    path = _setting("DIGEST_MARKDOWN")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        f.write(entry)
@@ -0,0 +1,43 @@
+import html
+import re
+
+from agents.idea_refiner.generation.models import lane_name, run_lanes
+from agents.idea_refiner.idea import idea_of
+from agents.idea_refiner.pipeline.run import build_result
+
+
+def md_to_html(text: str) -> str:
+    text = html.escape(text, quote=False)
+    text = re.sub(r"\*\*(.+?)\*\*", r"<b>\1</b>", text)
+    text = re.sub(r"(?<!\w)_(.+?)_(?!\w)", r"<i>\1</i>", text)
+    return text
+
+
+def eval_total(ev: dict) -> int:
+    return ev["acquisition_score"] + ev["demand_score"] + ev.get("build_score", 0)
+
+
+def render_result(theme: str | None, state: dict, total_elapsed: float, today: str) -> dict:
+    """Everything the output sinks show, computed once per run and shared by all of them."""
+    winner_label = state.get("winner_label")
+    ranked = [
+        {**ev, "model": lane_name(state, ev["idea_label"]), "total": eval_total(ev)}
+        for ev in sorted(state.get("all_evals", []), key=eval_total, reverse=True)
+    ]
+    winning_idea = state.get("winning_idea") or ""
+    idea = idea_of(winning_idea) if winning_idea else None
+    return {
+        "theme": theme,
+        "today": today,
+        "total_elapsed": total_elapsed,
+        "run_id": state.get("run_id"),
+        "winner_label": winner_label,
+        "winner_name": lane_name(state, winner_label) if winner_label in run_lanes(state) else None,
+        "winner_ev": next((e for e in ranked if e["idea_label"] == winner_label), None),
+        "ranked": ranked,
+        "title": idea.title if idea else None,
+        "idea": idea.to_dict() if idea else None,
+        "winning_idea": winning_idea,
+        "idea_html": md_to_html(winning_idea),
+        "result": build_result(theme, state),
+    }
@@ -0,0 +1,85 @@
+import contextvars
+import logging
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from agents.idea_refiner.observability.tracing import span
+from agents.idea_refiner.output.console import console_sink
+from agents.idea_refiner.output.local import jsonl_sink, markdown_sink, sqlite_sink
+from agents.idea_refiner.output.telegram import telegram_sink
+from agents.idea_refiner.output.webhook import webhook_sink
+
+log = logging.getLogger(__name__)
+
+Sink = Callable[[dict], None]
+
+DEFAULT_SINKS = "console,telegram"
+DEFAULT_TIMEOUT_S = 15.0
+
+SINKS: dict[str, Sink] = {
+    "console": console_sink,
+    "telegram": telegram_sink,
+    "webhook": webhook_sink,
+    "jsonl": jsonl_sink,
+    "sqlite": sqlite_sink,
+    "markdown": markdown_sink,
+}
+
+
+def register_sink(name: str, sink: Sink) -> None:
+    SINKS[name] = sink
+
+
+def enabled_sinks() -> list[str]:
+    """Sink names from ``OUTPUT_SINKS`` (comma-separated), skipping unknown ones."""
+    names = [n.strip() for n in os.getenv("OUTPUT_SINKS", DEFAULT_SINKS).split(",") if n.strip()]
+    for name in names:
+        if name not in SINKS:
+            log.warning("⚠️  Unknown output sink %r — skipping", name)
+    return [n for n in names if n in SINKS]
+
+
+def _timed(name: str, rendered: dict) -> dict:
+    start = time.monotonic()
+    with span("sink", sink=name) as s:
+        try:
+            SINKS[name](rendered)
+            error = None
+        except Exception as exc:  # noqa: BLE001
+            error = str(exc) or type(exc).__name__
+        s.set(ok=error is None, error=error)
+    return {"ok": error is None, "latency_s": round(time.monotonic() - start, 3), "error": error}
+
+
+def deliver_to_sinks(
+    rendered: dict, names: list[str] | None = None, timeout: float | None = None,
+) -> dict[str, dict]:
+    """Run every sink concurrently and report per-sink success and latency.
+
+    A sink still running after ``timeout`` is reported as timed out and left behind.
+    """
+    names = enabled_sinks() if names is None else names
+    if not names:
+        return {}
+    timeout = float(os.getenv("SINK_TIMEOUT_S", DEFAULT_TIMEOUT_S)) if timeout is None else timeout
+    pool = ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="sink")
+    futures = {
+        name: pool.submit(contextvars.copy_context().run, _timed, name, rendered)
+        for name in names
+    }
+    deadline = time.monotonic() + timeout
+    report = {}
+    for name, future in futures.items():
+        try:
+            report[name] = future.result(timeout=max(deadline - time.monotonic(), 0))
+        except TimeoutError:
+            report[name] = {"ok": False, "latency_s": timeout, "error": "timed out"}
+    pool.shutdown(wait=False)
+    for name, r in report.items():
+        if r["ok"]:
+            log.info("   📤 %s sink — ok (%.2fs)", name, r["latency_s"])
+        else:
+            log.warning("   ⚠️ %s sink — failed after %.2fs: %s", name, r["latency_s"], r["error"])
+    return report
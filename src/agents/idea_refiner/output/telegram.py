@@ -1,90 +1,161 @@
-import asyncio
+import html
 import logging
 import os
 import re
 
-from telegram import Bot
-from telegram.constants import ParseMode
-
-from agents.idea_refiner.generation.models import LABELS, MODELS
+from agents.idea_refiner.outbox.store import get_outbox
+from agents.idea_refiner.observability.metrics import TELEGRAM_DELIVERIES
+from agents.idea_refiner.outbox.worker import start_worker
+from agents.idea_refiner.output.render import md_to_html, render_result
+from agents.idea_refiner.output.telegram_client import get_telegram_client
 
 log = logging.getLogger(__name__)
 
 TELEGRAM_MSG_LIMIT = 4096
+BROADCAST_CONCURRENCY = 8
 
+_TAG = re.compile(r"<(/?)([a-z]+)[^>]*>")
+_BREAKS = ("\n\n", "\n", " ")
 
-def _md_to_html(text: str) -> str:
-    text = re.sub(r"\*\*(.+?)\*\*", r"<b>\1</b>", text)
-    text = re.sub(r"(?<!\w)_(.+?)_(?!\w)", r"<i>\1</i>", text)
-    return text
 
+def _inside_markup(text: str, i: int) -> bool:
+    return text.rfind("<", 0, i) > text.rfind(">", 0, i) or (
+        text.rfind("&", 0, i) > text.rfind(";", 0, i)
+    )
 
-def _build_messages(theme: str | None, state: dict, total_elapsed: float, today: str) -> list[str]:
-    winner_label = state.get("winner_label")
-    winner_name = "N/A"
-    if winner_label in LABELS:
-        winner_name = MODELS[LABELS.index(winner_label)]["name"]
 
+def _find_cut(text: str, budget: int) -> int:
+    for sep in _BREAKS:
+        i = text.rfind(sep, 0, budget)
+        if i >= budget // 2 and not _inside_markup(text, i):
+            return i + len(sep)
+    cut = budget
+    while cut > 0 and _inside_markup(text, cut):
+        cut -= 1
+    return cut or budget
+
+
+def _open_tags(stack: list[tuple[str, str]], piece: str) -> list[tuple[str, str]]:
+    stack = list(stack)
+    for m in _TAG.finditer(piece):
+        closing, name = m.group(1), m.group(2)
+        if not closing:
+            stack.append((name, m.group(0)))
+            continue
+        for i in range(len(stack) - 1, -1, -1):
+            if stack[i][0] == name:
+                del stack[i]
+                break
+    return stack
+
+
+def split_html(text: str, limit: int = TELEGRAM_MSG_LIMIT) -> list[str]:
+    """Split Telegram HTML into as few messages as fit, on paragraph, line or word breaks.
+
+    A break never falls inside a tag or entity; tags still open at a break are closed
+    and reopened in the next message, so every message parses on its own.
+    """
+    chunks: list[str] = []
+    stack: list[tuple[str, str]] = []
+    rest = text
+    while rest:
+        prefix = "".join(tag for _, tag in stack)
+        if len(prefix) + len(rest) <= limit:
+            chunks.append(prefix + rest)
+            break
+        budget = limit - len(prefix)
+        while True:
+            piece = rest[: _find_cut(rest, budget)].rstrip("\n ")
+            stack_after = _open_tags(stack, piece)
+            closers = "".join(f"</{name}>" for name, _ in reversed(stack_after))
+            over = len(prefix) + len(piece) + len(closers) - limit
+            if over <= 0:
+                break
+            budget -= over
+        rest = rest[len(piece):].lstrip("\n ")
+        chunks.append(prefix + piece + closers)
+        stack = stack_after
+    return chunks
+
+
+def _escape(text: str) -> str:
+    return html.escape(text, quote=False)
+
+
+def build_messages(rendered: dict) -> list[str]:
+    winner_name = _escape(rendered["winner_name"] or "N/A")
     header = (
-        f"<b>Daily Idea Run — {today}</b>\n"
-        f"Theme: {theme or 'Open (no theme)'}\n"
+        f"<b>Daily Idea Run — {rendered['today']}</b>\n"
+        f"Theme: {_escape(rendered['theme'] or 'Open (no theme)')}\n"
         f"Winner: <b>{winner_name}</b>\n"
-        f"Elapsed: {total_elapsed:.1f}s\n"
+        f"Elapsed: {rendered['total_elapsed']:.1f}s\n"
     )
 
     scoreboard = "\n<b>Judge's Scoreboard</b>\n"
-    for ev in sorted(
-        state.get("all_evals", []),
-        key=lambda e: e["acquisition_score"] + e["demand_score"] + e.get("build_score", 0),
-        reverse=True,
-    ):
-        label = ev["idea_label"]
-        name = MODELS[LABELS.index(label)]["name"] if label in LABELS else label
+    for ev in rendered["ranked"]:
         acq, dem, bld = ev["acquisition_score"], ev["demand_score"], ev.get("build_score", 0)
-        trophy = " 🏆" if label == winner_label else ""
-        scoreboard += f"  {name}{trophy}: {acq}+{dem}+{bld} = <b>{acq + dem + bld}/30</b>\n"
+        trophy = " 🏆" if ev["idea_label"] == rendered["winner_label"] else ""
+        scoreboard += (
+            f"  {_escape(ev['model'])}{trophy}: {acq}+{dem}+{bld} = <b>{ev['total']}/30</b>\n"
+        )
 
-    winner_ev = next(
-        (e for e in state.get("all_evals", []) if e["idea_label"] == winner_label), None
-    )
     judge_note = ""
-    if winner_ev:
-        judge_note = f"\n<b>Judge on the winner:</b>\n<i>{winner_ev['explanation']}</i>\n"
+    if rendered["winner_ev"]:
+        explanation = md_to_html(rendered["winner_ev"]["explanation"])
+        judge_note = f"\n<b>Judge on the winner:</b>\n<i>{explanation}</i>\n"
 
     summary = header + scoreboard + judge_note
+    idea_section = f"\n<b>🏆 Winning Idea — {winner_name}</b>\n\n{rendered['idea_html']}"
+    return split_html(summary + idea_section)
 
-    winning_idea_raw = state.get("winning_idea") or ""
-    idea_section = f"\n<b>🏆 Winning Idea — {winner_name}</b>\n\n{_md_to_html(winning_idea_raw)}"
 
-    full = summary + idea_section
-    if len(full) <= TELEGRAM_MSG_LIMIT:
-        return [full]
-
-    msgs = [summary]
-    for i in range(0, len(idea_section), TELEGRAM_MSG_LIMIT):
-        msgs.append(idea_section[i : i + TELEGRAM_MSG_LIMIT])
-    return msgs
+def deliver_payload(payload: dict, start: int = 0) -> dict:
+    """Send the payload's messages from ``start`` on; ``sent`` in the report counts from 0."""
+    token = os.getenv("TELEGRAM_BOT_TOKEN")
+    if not token:
+        return {"ok": False, "error": "TELEGRAM_BOT_TOKEN is not set"}
+    report = get_telegram_client(token).send(payload["chat_id"], payload["messages"][start:])
+    return {**report, "sent": start + report["sent"]}
 
 
-def send_telegram_summary(theme: str | None, state: dict, total_elapsed: float, today: str) -> None:
-    token = os.getenv("TELEGRAM_BOT_TOKEN")
+def telegram_sink(rendered: dict) -> None:
+    """Output sink: queue the summary in the outbox when enabled, otherwise send it now."""
     chat_id = os.getenv("TELEGRAM_CHAT_ID")
-    if not token or not chat_id:
+    if not os.getenv("TELEGRAM_BOT_TOKEN") or not chat_id:
+        return
+    payload = {"chat_id": chat_id, "messages": build_messages(rendered)}
+    outbox = get_outbox()
+    if outbox is not None and rendered["run_id"]:
+        if outbox.enqueue(rendered["run_id"], payload):
+            TELEGRAM_DELIVERIES.labels("queued").inc()
+            log.info("   📮 Telegram summary queued for delivery (run %s)", rendered["run_id"])
+        start_worker(outbox, deliver_payload).notify()
         return
+    report = deliver_payload(payload)
+    if not report["ok"]:
+        raise RuntimeError(report["error"])
+
 
-    messages = _build_messages(theme, state, total_elapsed, today)
-
-    async def _send() -> None:
-        bot = Bot(token=token)
-        for msg in messages:
-            await bot.send_message(
-                chat_id=chat_id,
-                text=msg,
-                parse_mode=ParseMode.HTML,
-            )
-
-    try:
-        asyncio.run(_send())
-        log.info("   📬 Telegram notification sent (%d message(s))", len(messages))
-    except Exception as exc:
-        log.warning("   ⚠️ Telegram notification failed: %s", exc)
+def broadcast_summary(
+    chat_ids: list[str], theme: str | None, state: dict, total_elapsed: float, today: str,
+) -> dict:
+    """Send one run's summary to many chats concurrently, within Telegram's global rate."""
+    token = os.getenv("TELEGRAM_BOT_TOKEN")
+    if not token or not chat_ids:
+        return {"delivered": 0, "failed": len(chat_ids)}
+
+    messages = build_messages(render_result(theme, state, total_elapsed, today))
+    results = get_telegram_client(token).broadcast(chat_ids, messages, BROADCAST_CONCURRENCY)
+    for r in results:
+        if not r["ok"]:
+            log.warning("   ⚠️ Telegram delivery to %s failed: %s", r["chat_id"], r["error"])
+    delivered = sum(r["ok"] for r in results)
+    log.info(
+        "   📬 Theme %s delivered to %d/%d chat(s) (%d message(s) each)",
+        theme or "OPEN", delivered, len(chat_ids), len(messages),
+    )
+    return {
+        "delivered": delivered,
+        "failed": len(chat_ids) - delivered,
+        "latency_s": max(r["latency_s"] for r in results),
+    }
@@ -0,0 +1,156 @@
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+import warnings
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from agents.idea_refiner.generation.ratelimit import TokenBucket
+from agents.idea_refiner.observability.metrics import TELEGRAM_DELIVERIES
+
+if TYPE_CHECKING:
+    from telegram.error import RetryAfter
+
+# python-telegram-bot is imported when the first client is created, not at startup.
+
+log = logging.getLogger(__name__)
+
+TELEGRAM_MSGS_PER_SECOND = 30  # Bot API guidance for messages across different chats
+POOL_SIZE = 16
+MAX_SEND_ATTEMPTS = 4
+BACKOFF_S = 0.5
+
+_clients: dict[tuple[str, str | None], "TelegramClient"] = {}
+_lock = threading.Lock()
+
+
+def _retry_after(exc: "RetryAfter") -> float:
+    from telegram.warnings import PTBDeprecationWarning
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", PTBDeprecationWarning)  # int → timedelta migration
+        delay = exc.retry_after
+    return delay.total_seconds() if isinstance(delay, timedelta) else float(delay)
+
+
+class TelegramClient:
+    """One long-lived Bot session on its own event loop, shared by every delivery.
+
+    Sends pass through a global token bucket, wait out ``RetryAfter`` and back off on
+    network errors; malformed messages (``BadRequest``) are not retried.
+    """
+
+    def __init__(self, token: str, base_url: str | None = None) -> None:
+        from telegram import Bot
+        from telegram.request import HTTPXRequest
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="telegram-client", daemon=True,
+        )
+        self._thread.start()
+        kwargs = {"base_url": f"{base_url.rstrip('/')}/bot"} if base_url else {}
+        self._bot = Bot(
+            token=token,
+            request=HTTPXRequest(connection_pool_size=POOL_SIZE, pool_timeout=30),
+            **kwargs,
+        )
+        self._bucket = TokenBucket(
+            per_minute=TELEGRAM_MSGS_PER_SECOND * 60, capacity=TELEGRAM_MSGS_PER_SECOND,
+        )
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _send_one(self, chat_id: str, text: str) -> int:
+        from telegram.constants import ParseMode
+        from telegram.error import BadRequest, NetworkError, RetryAfter
+
+        for attempt in range(1, MAX_SEND_ATTEMPTS + 1):
+            await asyncio.sleep(self._bucket.reserve(1))
+            try:
+                await self._bot.send_message(chat_id=chat_id, text=text, parse_mode=ParseMode.HTML)
+                return attempt
+            except RetryAfter as exc:
+                if attempt == MAX_SEND_ATTEMPTS:
+                    raise
+                delay = _retry_after(exc)
+                log.warning("   ⏳ Telegram asked to retry after %.0fs (chat %s)", delay, chat_id)
+            except BadRequest:
+                raise
+            except NetworkError as exc:
+                if attempt == MAX_SEND_ATTEMPTS:
+                    raise
+                delay = BACKOFF_S * 2 ** (attempt - 1)
+                log.warning("   ⏳ Telegram send to %s failed (%s), retrying", chat_id, exc)
+            await asyncio.sleep(delay)
+        return MAX_SEND_ATTEMPTS
+
+    async def _deliver(self, chat_id: str, messages: list[str]) -> dict:
+        start = time.monotonic()
+        sent, attempts, error = 0, 0, None
+        try:
+            for msg in messages:
+                attempts += await self._send_one(chat_id, msg)
+                sent += 1
+        except Exception as exc:
+            error = str(exc)
+        if error is not None:
+            TELEGRAM_DELIVERIES.labels("failed").inc()
+        else:
+            TELEGRAM_DELIVERIES.labels("retried" if attempts > len(messages) else "ok").inc()
+        return {
+            "chat_id": chat_id,
+            "ok": error is None,
+            "messages": len(messages),
+            "sent": sent,
+            "attempts": attempts,
+            "latency_s": round(time.monotonic() - start, 3),
+            "error": error,
+        }
+
+    def send(self, chat_id: str, messages: list[str]) -> dict:
+        return self._run(self._deliver(str(chat_id), messages))
+
+    def broadcast(self, chat_ids: list[str], messages: list[str], concurrency: int) -> list[dict]:
+        async def _all() -> list[dict]:
+            sem = asyncio.Semaphore(concurrency)
+
+            async def _one(chat_id: str) -> dict:
+                async with sem:
+                    return await self._deliver(str(chat_id), messages)
+
+            return await asyncio.gather(*(_one(c) for c in chat_ids))
+
+        return self._run(_all())
+
+    def close(self) -> None:
+        if not self._loop.is_running():
+            return
+        try:
+            self._run(self._bot.shutdown())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+
+def get_telegram_client(token: str) -> TelegramClient:
+    """Process-wide client per token (and ``TELEGRAM_API_URL``, for a local Bot API)."""
+    key = (token, os.getenv("TELEGRAM_API_URL"))
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = TelegramClient(*key)
+            atexit.register(client.close)
+    return client
+
+
+def close_telegram_clients() -> None:
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
@@ -0,0 +1,12 @@
+import os
+
+
+def webhook_sink(rendered: dict) -> None:
+    """POST the result payload as JSON to ``WEBHOOK_URL``."""
+    import httpx
+
+    url = os.getenv("WEBHOOK_URL")
+    if not url:
+        raise RuntimeError("WEBHOOK_URL is not set")
+    response = httpx.post(url, json=rendered["result"], timeout=10.0)
+    response.raise_for_status()
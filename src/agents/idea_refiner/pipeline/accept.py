@@ -1,13 +1,17 @@
 import logging
 
-from agents.idea_refiner.generation.models import LABELS, MODELS
+from agents.idea_refiner.generation.models import lane_name
+from agents.idea_refiner.judging.judge import judge_sees_canonical
+from agents.idea_refiner.pipeline.events import emit
 
 log = logging.getLogger(__name__)
 
 
 def accept(verdict: dict, state: dict) -> None:
     state["winner_label"] = verdict["winner"]
-    state["winning_idea"] = verdict.get("winning_idea") or state["ideas"][verdict["winner"]]
+    # A judge shown the condensed view echoes that back; keep the idea as generated.
+    echoed = None if judge_sees_canonical() else verdict.get("winning_idea")
+    state["winning_idea"] = echoed or state["ideas"][verdict["winner"]]
     state["all_evals"] = verdict.get("evaluations", [])
     state["winner_ev"] = next(
         (e for e in state["all_evals"] if e["idea_label"] == state["winner_label"]), None
@@ -15,5 +19,7 @@ def accept(verdict: dict, state: dict) -> None:
     log.info(
         "🏆 Winner: Idea %s (%s)",
         state["winner_label"],
-        MODELS[LABELS.index(state["winner_label"])]["name"],
+        lane_name(state, state["winner_label"]),
     )
+    emit("winner", label=state["winner_label"], model=lane_name(state, state["winner_label"]),
+         fallback=False)
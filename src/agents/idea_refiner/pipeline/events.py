@@ -0,0 +1,33 @@
+from collections.abc import Callable
+from contextvars import ContextVar, Token
+
+from agents.idea_refiner.generation.models import lane_name
+
+Listener = Callable[[str, dict], None]
+
+_listener: ContextVar[Listener | None] = ContextVar("pipeline_events", default=None)
+
+
+def listen(listener: Listener | None) -> Token:
+    """Receive this context's progress events (round started, lane generated, verdict, ...)."""
+    return _listener.set(listener)
+
+
+def emit(event: str, **data) -> None:
+    listener = _listener.get()
+    if listener is not None:
+        listener(event, data)
+
+
+def score_rows(state: dict, evaluations: list[dict]) -> list[dict]:
+    return [
+        {
+            "label": ev["idea_label"],
+            "model": lane_name(state, ev["idea_label"]),
+            "acquisition": ev["acquisition_score"],
+            "demand": ev["demand_score"],
+            "build": ev.get("build_score", 0),
+            "total": ev["acquisition_score"] + ev["demand_score"] + ev.get("build_score", 0),
+        }
+        for ev in evaluations
+    ]
@@ -2,20 +2,38 @@ import logging
 import time
 
 from agents.idea_refiner.config import MAX_RETRIES
-from agents.idea_refiner.generation.models import LABELS, MODELS
+from agents.idea_refiner.generation.models import lane_name, run_lanes
 from agents.idea_refiner.generation.prompt import build_initial_messages
 from agents.idea_refiner.generation.runner import generate_parallel
+from agents.idea_refiner.idea import idea_of
+from agents.idea_refiner.observability.profiling import stage
+from agents.idea_refiner.pipeline.events import emit
+from agents.idea_refiner.pipeline.novelty_step import send_back_repeats
+from agents.idea_refiner.pipeline.speculate import take_draft
+from agents.idea_refiner.pipeline.state import round_record
 
 log = logging.getLogger(__name__)
 
 
 def generate_needed(state: dict, system_prompt: str, user_prompt: str) -> None:
-    tasks = []
-    for label, model in zip(LABELS, MODELS):
+    lanes = round_record(state)["lanes"]
+    tasks, drafted = [], []
+    for label, model in run_lanes(state).items():
         if not state["needs_gen"][label]:
             log.info("   [%s] %s — keeping previous idea", label, model["name"])
+            if label in state["ideas"]:
+                lanes[label] = {
+                    "model": model["name"], "attempt": state["attempts"][label],
+                    "latency_s": None, "ok": True, "kept": True,
+                }
             continue
         state["attempts"][label] += 1
+        draft = take_draft(state, label)
+        if draft:
+            state["messages"][label] = draft["messages"]
+            if draft["idea"]:
+                drafted.append((label, draft["idea"], draft["latency_s"]))
+                continue
         retry_note = " (with feedback)" if state["attempts"][label] > 1 else ""
         log.info(
             "   [%s] %s — queuing (attempt %d/%d)%s",
@@ -26,17 +44,45 @@ def generate_needed(state: dict, system_prompt: str, user_prompt: str) -> None:
         if not state["messages"][label]:
             state["messages"][label] = build_initial_messages(system_prompt, user_prompt)
         tasks.append((label, model, state["messages"][label]))
-    if not tasks:
+    if not tasks and not drafted:
         return
-    log.info("   ⏳ Generating %d idea(s) in parallel...", len(tasks))
     t0 = time.time()
-    for label, idea, elapsed in generate_parallel(tasks):
-        model_name = MODELS[LABELS.index(label)]["name"]
+    results = []
+    if tasks:
+        log.info("   ⏳ Generating %d idea(s) in parallel...", len(tasks))
+        # The lane calls themselves are profiled as "generate_calls" on their threads.
+        with stage("generate", cpu=False):
+            results = generate_parallel(tasks)
+    speculative = {label for label, _, _ in drafted}
+    for label, idea, elapsed in drafted + results:
+        model_name = lane_name(state, label)
+        lanes[label] = {
+            "model": model_name, "attempt": state["attempts"][label],
+            "latency_s": round(elapsed, 2), "ok": bool(idea), "kept": False,
+            "speculative": label in speculative,
+        }
         if idea:
             state["ideas"][label] = idea
             state["messages"][label].append({"role": "assistant", "content": idea})
             log.info("   [%s] %s — ✅ (%.1fs)", label, model_name, elapsed)
+            missing = idea_of(idea).missing()
+            if missing:
+                lanes[label]["missing_sections"] = missing
+                log.warning(
+                    "   [%s] %s — idea is missing: %s", label, model_name, ", ".join(missing),
+                )
         else:
             state["ideas"][label] = f"[Error: generation failed for {model_name}]"
             log.warning("   [%s] %s — ⚠️  failed", label, model_name)
+    generated = [label for label, _, _ in drafted] + [t[0] for t in tasks]
+    send_back_repeats(state, generated)
+    for label in lanes:
+        lanes[label]["idea"] = state["ideas"].get(label)
+    for label in generated:
+        lane = lanes[label]
+        emit(
+            "lane_generated", round=round_record(state)["round"], label=label,
+            model=lane["model"], attempt=lane["attempt"], ok=lane["ok"],
+            latency_s=lane["latency_s"],
+        )
     log.info("   ⏱️  All done in %.1fs", time.time() - t0)
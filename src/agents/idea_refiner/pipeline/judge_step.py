@@ -3,7 +3,14 @@ import time
 
 from agents.idea_refiner.judging.judge import judge_ideas
 from agents.idea_refiner.judging.quality_gate import enforce_quality_gate
-from agents.idea_refiner.generation.models import LABELS, MODELS
+from agents.idea_refiner.generation.models import lane_name
+from agents.idea_refiner.observability.logs import log_context
+from agents.idea_refiner.observability.metrics import GATE_OVERRIDES, JUDGE_VERDICTS
+from agents.idea_refiner.observability.profiling import stage
+from agents.idea_refiner.observability.tracing import span
+from agents.idea_refiner.pipeline.events import emit, score_rows
+from agents.idea_refiner.pipeline.novelty_step import remember_judged
+from agents.idea_refiner.pipeline.state import round_record
 
 log = logging.getLogger(__name__)
 
@@ -11,21 +18,48 @@ log = logging.getLogger(__name__)
 def judge_and_log(state: dict) -> dict | None:
     log.info("\n⚖️  Sending to judge (Gemini 3.1 Pro Preview)...")
     log.info("   Note: judge sees shuffled labels — no model names, no ordering bias")
+    record = round_record(state)
     t0 = time.time()
     try:
-        verdict = judge_ideas(state["ideas"])
+        with log_context(lane="judge", model="gemini-3.1-pro-preview"), \
+                span("judge", model="gemini-3.1-pro-preview", ideas=len(state["ideas"])) as s, \
+                stage("judge"):
+            verdict = judge_ideas(state["ideas"])
+            s.set(verdict=verdict["verdict"])
     except Exception as e:
         log.error("❌ Judge failed after %.1fs: %s", time.time() - t0, e)
+        JUDGE_VERDICTS.labels("error").inc()
+        record.update({"verdict": None, "judge_latency_s": round(time.time() - t0, 2)})
         return None
+    record["judge_latency_s"] = round(time.time() - t0, 2)
     log.info("   ⏱️  %.1fs | Verdict: %s", time.time() - t0, verdict["verdict"].upper())
+    remember_judged(state)
     for ev in verdict.get("evaluations", []):
         log.info(
             "   [%s] %s — acq:%d dem:%d bld:%d — %s",
             ev["idea_label"],
-            MODELS[LABELS.index(ev["idea_label"])]["name"],
+            lane_name(state, ev["idea_label"]),
             ev["acquisition_score"],
             ev["demand_score"],
             ev.get("build_score", 0),
             ev["explanation"],
         )
-    return enforce_quality_gate(verdict)
+    judge_verdict = verdict["verdict"]
+    with span("quality_gate", judge_verdict=judge_verdict) as s, stage("quality_gate"):
+        verdict = enforce_quality_gate(verdict)
+        s.set(verdict=verdict["verdict"], override=judge_verdict != verdict["verdict"])
+    JUDGE_VERDICTS.labels(verdict["verdict"]).inc()
+    if judge_verdict != verdict["verdict"]:
+        GATE_OVERRIDES.labels(judge_verdict).inc()
+    record.update({
+        "verdict": verdict["verdict"],
+        "gate_override": judge_verdict != verdict["verdict"],
+        "evaluations": verdict.get("evaluations", []),
+        "feedback": verdict.get("rejection_feedback") or {},
+    })
+    emit(
+        "judge_verdict", round=record["round"], verdict=verdict["verdict"],
+        gate_override=record["gate_override"], latency_s=record["judge_latency_s"],
+        scores=score_rows(state, record["evaluations"]),
+    )
+    return verdict
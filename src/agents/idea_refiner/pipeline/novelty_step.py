@@ -0,0 +1,51 @@
+import logging
+
+from agents.idea_refiner.generation.models import run_lanes
+from agents.idea_refiner.generation.prompt import build_novelty_message
+from agents.idea_refiner.generation.runner import generate_parallel
+from agents.idea_refiner.novelty.store import get_index
+from agents.idea_refiner.pipeline.state import round_record
+
+log = logging.getLogger(__name__)
+
+
+def send_back_repeats(state: dict, labels: list[str]) -> None:
+    """Regenerate freshly generated ideas that near-duplicate a past idea, before judging."""
+    index = get_index()
+    if index is None:
+        return
+    tasks = []
+    for label in labels:
+        idea = state["ideas"].get(label, "")
+        match = index.check(idea) if not idea.startswith("[Error") else None
+        if not match:
+            continue
+        model = run_lanes(state)[label]
+        log.info(
+            "   [%s] %s — 🧬 too similar to \"%s\" (%.2f), sending back",
+            label, model["name"], match["title"], match["similarity"],
+        )
+        state["repeats"].append({"label": label, **match})
+        state["messages"][label].append(build_novelty_message(match["title"]))
+        tasks.append((label, model, state["messages"][label]))
+    if not tasks:
+        return
+    for label, idea, elapsed in generate_parallel(tasks):
+        if not idea:
+            state["messages"][label].pop()
+            log.warning("   [%s] regeneration failed — keeping the repeat", label)
+            continue
+        state["ideas"][label] = idea
+        state["messages"][label].append({"role": "assistant", "content": idea})
+        log.info("   [%s] 🧬 regenerated (%.1fs)", label, elapsed)
+
+
+def remember_judged(state: dict) -> None:
+    """Index the ideas generated this round; ideas kept from an earlier round already are."""
+    index = get_index()
+    if index is None:
+        return
+    lanes = round_record(state)["lanes"]
+    for label, idea in state["ideas"].items():
+        if not lanes.get(label, {}).get("kept") and not idea.startswith("[Error"):
+            index.add(idea)
@@ -1,26 +1,101 @@
 import logging
 
 from agents.idea_refiner.config import MAX_RETRIES
-from agents.idea_refiner.generation.models import LABELS, MODELS
+from agents.idea_refiner.generation.models import lane_name, run_lanes
 from agents.idea_refiner.generation.prompt import build_feedback_message
+from agents.idea_refiner.observability.metrics import LANE_DECISIONS
+from agents.idea_refiner.pipeline.events import emit
+from agents.idea_refiner.pipeline.state import round_record
+from agents.idea_refiner.scheduling.retirement import (
+    lane_scores,
+    reassignment,
+    retirement_policy_name,
+    should_retire,
+)
 
 log = logging.getLogger(__name__)
 
 
+def _total(ev: dict) -> int:
+    return ev["acquisition_score"] + ev["demand_score"] + ev.get("build_score", 0)
+
+
+def _promising_model(verdict: dict, state: dict, label: str) -> dict:
+    """Model of the other lane the judge scored highest this round (the lane's own if none)."""
+    others = [ev for ev in verdict.get("evaluations", []) if ev["idea_label"] != label]
+    lanes = run_lanes(state)
+    if not others:
+        return lanes[label]
+    return lanes[max(others, key=_total)["idea_label"]]
+
+
+def review_lane(verdict: dict, state: dict, label: str) -> str:
+    """Ask the retirement policy whether a rejected lane is worth another attempt.
+
+    Returns ``continue``, ``retire``, or — when ``LANE_REASSIGN`` gives the retired
+    lane's remaining attempts away — ``restart`` (fresh conversation, same model) or
+    ``promote`` (fresh conversation with the model of this round's best other lane).
+    """
+    if retirement_policy_name() == "off":
+        return "continue"
+    scores = lane_scores(state, label)
+    remaining = MAX_RETRIES + 1 - state["attempts"][label]
+    retire, p_pass, policy = should_retire(scores, remaining)
+    decision = "continue"
+    if retire:
+        reassign = reassignment()
+        decision = "retire" if reassign == "none" else reassign
+    model = lane_name(state, label)
+    if decision in ("restart", "promote"):
+        if decision == "promote":
+            state.setdefault("lanes", dict(run_lanes(state)))[label] = \
+                _promising_model(verdict, state, label)
+        state["messages"][label] = []
+    retirement = state.setdefault("retirement", {"policy": policy, "decisions": []})
+    retirement["decisions"].append({
+        "round": round_record(state)["round"], "label": label, "model": model,
+        "totals": [sum(s.values()) for s in scores], "p_pass": p_pass,
+        "remaining": remaining, "decision": decision,
+        "next_model": lane_name(state, label) if decision != "retire" else None,
+    })
+    LANE_DECISIONS.labels(policy, decision).inc()
+    icon = {"continue": "📈", "retire": "🪦", "restart": "🔁", "promote": "🔀"}[decision]
+    log.info(
+        "   [%s] %s — %s %s (policy %s, totals %s, p_pass %s, %d attempt(s) left)",
+        label, model, icon, decision, policy,
+        "/".join(str(sum(s.values())) for s in scores) or "-",
+        "n/a" if p_pass is None else f"{p_pass:.3f}", remaining,
+    )
+    if decision != "continue":
+        emit("lane_retired", label=label, model=model, decision=decision, p_pass=p_pass,
+             next_model=lane_name(state, label) if decision != "retire" else None)
+    return decision
+
+
 def prepare_retries(verdict: dict, state: dict) -> bool:
     """Set up feedback for next round. Returns True if no retries remain (done)."""
     log.info("🔄 All ideas rejected. Preparing retries...")
     fb = verdict.get("rejection_feedback", {})
     any_retry = False
-    for label in LABELS:
+    for label in run_lanes(state):
         if fb.get(label) and state["attempts"][label] < MAX_RETRIES + 1:
+            decision = review_lane(verdict, state, label)
+            if decision == "retire":
+                state["needs_gen"][label] = False
+                continue
+            if decision in ("restart", "promote"):
+                state["needs_gen"][label] = True
+                any_retry = True
+                continue
             state["messages"][label].append(build_feedback_message(fb[label]))
             state["needs_gen"][label] = True
             any_retry = True
+            emit("retry_queued", label=label, model=lane_name(state, label),
+                 attempt=state["attempts"][label] + 1, feedback=str(fb[label]))
             log.info(
                 "   [%s] %s — will retry. Feedback: %s",
                 label,
-                MODELS[LABELS.index(label)]["name"],
+                lane_name(state, label),
                 str(fb[label])[:120] + ("..." if len(str(fb[label])) > 120 else ""),
             )
         else:
@@ -29,7 +104,7 @@ def prepare_retries(verdict: dict, state: dict) -> bool:
                 log.info(
                     "   [%s] %s — max retries reached",
                     label,
-                    MODELS[LABELS.index(label)]["name"],
+                    lane_name(state, label),
                 )
     if not any_retry:
         evals = verdict.get("evaluations", [])
@@ -50,7 +125,9 @@ def prepare_retries(verdict: dict, state: dict) -> bool:
         log.info(
             "⚠️  No retries left. Fallback winner: Idea %s (%s)",
             best["idea_label"],
-            MODELS[LABELS.index(best["idea_label"])]["name"],
+            lane_name(state, best["idea_label"]),
         )
+        emit("winner", label=best["idea_label"], model=lane_name(state, best["idea_label"]),
+             fallback=True)
         return True
     return False
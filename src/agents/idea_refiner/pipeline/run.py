@@ -0,0 +1,69 @@
+import time
+
+from agents.idea_refiner.archive.record import build_run_record
+from agents.idea_refiner.archive.writer import get_writer
+from agents.idea_refiner.config import MAX_RETRIES, build_idea_prompt
+from agents.idea_refiner.idea import idea_of
+from agents.idea_refiner.novelty.store import save_index
+from agents.idea_refiner.observability.logs import log_context
+from agents.idea_refiner.observability.metrics import RUN_ROUNDS
+from agents.idea_refiner.observability.tracing import span
+from agents.idea_refiner.pipeline.events import emit
+from agents.idea_refiner.pipeline.run_round import run_round
+from agents.idea_refiner.pipeline.state import init_state
+from agents.idea_refiner.scheduling.allocator import allocate_lanes, record_model_outcomes
+from agents.idea_refiner.scheduling.scheduler import record_outcome
+
+
+def run_pipeline(
+    theme: str | None, system_prompt: str, user_prompt: str, models: list[dict] | None = None,
+) -> dict:
+    lanes, allocation = allocate_lanes(models)
+    state = init_state(theme, lanes)
+    state["allocation"] = allocation
+    with log_context(run_id=state["run_id"]), \
+            span("run", run_id=state["run_id"], theme=theme, lanes=len(lanes)) as run_span:
+        emit("run_started", run_id=state["run_id"], theme=theme,
+             lanes={label: model["name"] for label, model in lanes.items()})
+        for rnd in range(1, MAX_RETRIES + 2):
+            state["rounds"] = rnd
+            if run_round(rnd, state, system_prompt, user_prompt):
+                break
+        RUN_ROUNDS.observe(state["rounds"])
+        run_span.set(
+            rounds=state["rounds"], winner=state["winner_label"],
+            tokens=state["meter"]["total_tokens"], llm_calls=state["meter"]["llm_calls"],
+        )
+        save_index()
+        elapsed = time.time() - state["start"]
+        record_outcome(theme, state, elapsed)
+        record_model_outcomes(state)
+        writer = get_writer()
+        if writer:
+            writer.submit(build_run_record(theme, state, elapsed))
+    return state
+
+
+def build_result(theme: str | None, state: dict) -> dict:
+    return {
+        "theme": theme,
+        "winning_idea": state["winning_idea"],
+        "idea": idea_of(state["winning_idea"]).to_dict() if state["winning_idea"] else None,
+        "winner_label": state["winner_label"],
+        "evaluations": state.get("all_evals", []),
+        "rounds": state.get("rounds", 0),
+        "repeats_sent_back": len(state.get("repeats", [])),
+        "run_id": state.get("run_id"),
+        "usage": dict(state.get("meter") or {}),
+        "allocation": state.get("allocation"),
+        "speculation": state.get("speculation"),
+        "retirement": state.get("retirement"),
+        "sinks": state.get("sinks"),
+        "elapsed_seconds": round(time.time() - state.get("start", time.time()), 1),
+    }
+
+
+def run_theme(theme: str | None, models: list[dict] | None = None) -> dict:
+    """Run the full pipeline for one theme without any output side effects."""
+    state = run_pipeline(theme, *build_idea_prompt(theme), models)
+    return build_result(theme, state)
@@ -1,7 +1,12 @@
 import logging
 
+from agents.idea_refiner.observability.logs import log_context
+from agents.idea_refiner.observability.profiling import memory_snapshot
+from agents.idea_refiner.observability.tracing import span
+from agents.idea_refiner.pipeline.events import emit
 from agents.idea_refiner.pipeline.generate_step import generate_needed
 from agents.idea_refiner.pipeline.judge_step import judge_and_log
+from agents.idea_refiner.pipeline.speculate import settle_drafts, start_drafts
 from agents.idea_refiner.pipeline.verdict import apply_verdict
 
 log = logging.getLogger(__name__)
@@ -9,5 +14,13 @@ log = logging.getLogger(__name__)
 
 def run_round(round_num: int, state: dict, system_prompt: str, user_prompt: str) -> bool:
     log.info("\n%s\n📋 ROUND %d\n%s", "━" * 60, round_num, "━" * 60)
-    generate_needed(state, system_prompt, user_prompt)
-    return apply_verdict(judge_and_log(state), state)
+    state.setdefault("history", []).append({"round": round_num, "lanes": {}})
+    with log_context(round=round_num), span("round", round=round_num):
+        emit("round_started", round=round_num,
+             lanes=[label for label, need in state["needs_gen"].items() if need])
+        generate_needed(state, system_prompt, user_prompt)
+        start_drafts(state)
+        done = apply_verdict(judge_and_log(state), state)
+        settle_drafts(state, done)
+    memory_snapshot(f"round {round_num}")
+    return done
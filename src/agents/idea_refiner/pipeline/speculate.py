@@ -0,0 +1,151 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from agents.idea_refiner.config import MAX_RETRIES
+from agents.idea_refiner.generation.metering import absorb_meter, start_meter
+from agents.idea_refiner.generation.models import lane_name, run_lanes
+from agents.idea_refiner.generation.prompt import build_refine_message, build_self_critique_message
+from agents.idea_refiner.observability.logs import log_context
+from agents.idea_refiner.observability.tracing import span
+
+log = logging.getLogger(__name__)
+
+# off: no drafts. direct: a rejected lane's draft goes to the judge as its next idea.
+# refine: the draft is revised with the judge's real feedback (one more call, warm start).
+MODES = ("off", "direct", "refine")
+
+_lock = threading.Lock()
+
+
+def speculate_mode() -> str:
+    mode = os.getenv("SPECULATE", "off").strip().lower()
+    if mode not in MODES:
+        log.warning("⚠️  Unknown SPECULATE mode %r — speculation off", mode)
+        return "off"
+    return mode
+
+
+def _stats(state: dict, mode: str) -> dict:
+    return state.setdefault("speculation", {
+        "mode": mode, "started": 0, "used": 0, "wasted": 0, "cancelled": 0, "failed": 0,
+        "draft_tokens": 0, "wasted_tokens": 0, "hit_rate": None,
+    })
+
+
+def _draft(label: str, model: dict, messages: list[dict]) -> dict:
+    # Own meter, so the draft's tokens can be booked as used or wasted later.
+    meter = start_meter()
+    start = time.time()
+    with log_context(lane=label, model=model["name"]), \
+            span("draft", lane=label, model=model["name"]) as s:
+        try:
+            idea = model["generate"](messages)
+        except Exception as e:  # noqa: BLE001
+            log.warning("   [%s] %s — speculative draft failed: %s", label, model["name"], e)
+            idea = None
+        s.set(ok=bool(idea), tokens=meter["total_tokens"])
+    return {"idea": idea, "messages": messages, "elapsed": time.time() - start, "meter": meter}
+
+
+def start_drafts(state: dict) -> None:
+    """Start drafting an alternative idea on every lane that could still be retried.
+
+    Runs while the judge is deciding; the drafts are settled once the verdict is in.
+    Lanes that kept their idea this round (``needs_gen`` off) are not drafted for.
+    """
+    mode = speculate_mode()
+    if mode == "off":
+        return
+    lanes = {
+        label: model for label, model in run_lanes(state).items()
+        if state["needs_gen"].get(label) and state["attempts"][label] < MAX_RETRIES + 1
+        and state["messages"][label] and state["messages"][label][-1]["role"] == "assistant"
+    }
+    if not lanes:
+        return
+    stats = _stats(state, mode)
+    pool = ThreadPoolExecutor(max_workers=len(lanes), thread_name_prefix="draft")
+    drafts = state.setdefault("drafts", {})
+    for label, model in lanes.items():
+        messages = [*state["messages"][label], build_self_critique_message()]
+        drafts[label] = pool.submit(contextvars.copy_context().run, _draft, label, model, messages)
+    pool.shutdown(wait=False)
+    stats["started"] += len(lanes)
+    log.info("   🔮 Drafting %d speculative idea(s) while the judge decides", len(lanes))
+
+
+def _judged_round(state: dict) -> dict:
+    return next((r for r in reversed(state.get("history") or []) if "verdict" in r), {})
+
+
+def _book(state: dict, draft: dict, used: bool) -> None:
+    stats = state["speculation"]
+    tokens = draft["meter"]["total_tokens"]
+    absorb_meter(state.get("meter"), draft["meter"])
+    with _lock:
+        stats["draft_tokens"] += tokens
+        if used:
+            stats["used"] += 1
+        elif draft["idea"]:
+            stats["wasted"] += 1
+            stats["wasted_tokens"] += tokens
+        else:
+            stats["failed"] += 1
+        stats["hit_rate"] = round(stats["used"] / stats["started"], 3)
+
+
+def _discard(state: dict, future: Future) -> None:
+    if future.cancel():
+        with _lock:
+            state["speculation"]["cancelled"] += 1
+        return
+    # The SDK call cannot be interrupted; book its tokens as wasted once it returns.
+    future.add_done_callback(lambda f: _book(state, f.result(), used=False))
+
+
+def settle_drafts(state: dict, done: bool) -> None:
+    """After the verdict: drop every draft once the run is done, else those of lanes not retried.
+
+    Lanes restarted from scratch (emptied messages) don't continue from their draft either.
+    """
+    drafts = state.get("drafts") or {}
+    for label in list(drafts):
+        if done or not state["needs_gen"].get(label) or not state["messages"][label]:
+            _discard(state, drafts.pop(label))
+    stats = state.get("speculation")
+    if done and stats:
+        log.info(
+            "   🔮 Speculation: %d/%d draft(s) used, %d tokens wasted so far",
+            stats["used"], stats["started"], stats["wasted_tokens"],
+        )
+
+
+def take_draft(state: dict, label: str) -> dict | None:
+    """The lane's speculative draft, ready to use for its next attempt (None if there is none).
+
+    Returns ``idea`` (None in refine mode, where the lane still generates) and the
+    ``messages`` the lane continues from in place of the judge's feedback.
+    """
+    future = (state.get("drafts") or {}).pop(label, None)
+    if future is None:
+        return None
+    t0 = time.time()
+    draft = future.result()
+    waited = time.time() - t0
+    _book(state, draft, used=bool(draft["idea"]))
+    if not draft["idea"]:
+        return None
+    if state["speculation"]["mode"] == "refine":
+        feedback = _judged_round(state).get("feedback", {}).get(label, "")
+        messages = [
+            *draft["messages"], {"role": "assistant", "content": draft["idea"]},
+            build_refine_message(str(feedback)),
+        ]
+        return {"idea": None, "messages": messages}
+    log.info("   [%s] %s — 🔮 using speculative draft (waited %.1fs)",
+             label, lane_name(state, label), waited)
+    return {"idea": draft["idea"], "messages": draft["messages"], "latency_s": waited}
@@ -1,29 +1,47 @@
 import logging
 import time
+import uuid
 
-from agents.idea_refiner.generation.clients import get_client
 from agents.idea_refiner.config import MAX_RETRIES
-from agents.idea_refiner.generation.models import LABELS, MODELS
+from agents.idea_refiner.generation.clients import get_client
+from agents.idea_refiner.generation.metering import start_call_log, start_meter
+from agents.idea_refiner.generation.models import default_lanes
 
 log = logging.getLogger(__name__)
 
 
-def init_state(theme: str | None) -> dict:
+def init_state(theme: str | None, lanes: dict[str, dict] | None = None) -> dict:
+    lanes = lanes or default_lanes()
     log.info("🚀 Starting Daily Business Idea Generator (Multi-Model)")
-    log.info("   Models: %s", ", ".join(m["name"] for m in MODELS))
+    log.info("   Lanes: %s", ", ".join(f"{label}={m['name']}" for label, m in lanes.items()))
     log.info("   Judge: Gemini 3.1 Pro Preview | Theme: %s", theme or "OPEN (no theme)")
     log.info("   Max retries: %d | Initializing clients...", MAX_RETRIES)
     for name in ("openai", "gemini"):
         get_client(name)
     log.info("   ✅ All clients ready")
     return {
-        "attempts": {label: 0 for label in LABELS},
-        "messages": {label: [] for label in LABELS},
+        "run_id": uuid.uuid4().hex,
+        "lanes": lanes,
+        "attempts": {label: 0 for label in lanes},
+        "messages": {label: [] for label in lanes},
         "ideas": {},
-        "needs_gen": {label: True for label in LABELS},
+        "needs_gen": {label: True for label in lanes},
         "winner_label": None,
         "winning_idea": None,
         "winner_ev": None,
         "all_evals": [],
+        "rounds": 0,
+        "repeats": [],
+        "history": [],
+        "meter": start_meter(),
+        "calls": start_call_log(),
         "start": time.time(),
     }
+
+
+def round_record(state: dict) -> dict:
+    """The history entry for the round in progress (created on first use)."""
+    history = state.setdefault("history", [])
+    if not history:
+        history.append({"round": state.get("rounds") or 1, "lanes": {}})
+    return history[-1]
@@ -0,0 +1,3 @@
+from agents.idea_refiner.pool.cli import main
+
+main()
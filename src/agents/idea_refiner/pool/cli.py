@@ -0,0 +1,30 @@
+import argparse
+import json
+from pathlib import Path
+
+from agents.idea_refiner.config import load_env
+from agents.idea_refiner.observability.logs import configure_logging
+from agents.idea_refiner.pool.filler import DEFAULT_DAYS, fill_pool
+from agents.idea_refiner.pool.store import DEFAULT_SIZE, IdeaPool, pool_path
+
+
+def main(argv: list[str] | None = None) -> None:
+    load_env()
+    parser = argparse.ArgumentParser(
+        prog="idea-refiner-pool", description="Pre-generate ideas for the coming days.",
+    )
+    parser.add_argument("--db", type=Path, default=pool_path(), help="default: $IDEA_POOL")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="max ready ideas")
+    sub = parser.add_subparsers(dest="command", required=True)
+    fill = sub.add_parser("fill", help="run the pipeline for upcoming days missing an idea")
+    fill.add_argument("--days", type=int, default=DEFAULT_DAYS)
+    sub.add_parser("stats", help="pool size, hit rate and staleness")
+    args = parser.parse_args(argv)
+    if args.db is None:
+        parser.error("no pool path: pass --db or set IDEA_POOL")
+
+    pool = IdeaPool(args.db, args.size)
+    if args.command == "fill":
+        configure_logging()
+        print(json.dumps(fill_pool(pool, args.days), indent=2))
+    print(json.dumps(pool.stats(), indent=2))
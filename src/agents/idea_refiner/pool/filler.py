@@ -0,0 +1,53 @@
+import logging
+import time
+from datetime import date, timedelta
+
+from agents.idea_refiner.config import get_idea_prompt
+from agents.idea_refiner.output.render import eval_total, render_result
+from agents.idea_refiner.pipeline.run import run_pipeline
+from agents.idea_refiner.pool.store import IdeaPool
+
+log = logging.getLogger(__name__)
+
+DEFAULT_DAYS = 3
+
+
+def accepted(state: dict) -> bool:
+    """True when the judge accepted the winner (not a last-round fallback)."""
+    history = state.get("history") or []
+    return bool(history) and history[-1].get("verdict") == "accept"
+
+
+def fill_pool(pool: IdeaPool, days: int = DEFAULT_DAYS, today: date | None = None) -> dict:
+    """Run the pipeline ahead of time for each upcoming day the pool has no idea for.
+
+    Days get the theme ``get_idea_prompt`` assigns them; only accepted ideas are kept,
+    so a day whose run falls back is tried again on the next fill.
+    """
+    today = today or date.today()
+    pool.evict()
+    ready = set(pool.ready_days())
+    report = {"filled": [], "rejected": [], "skipped": sorted(ready), "full": False}
+    for offset in range(days):
+        day = today + timedelta(days=offset)
+        if day.isoformat() in ready:
+            continue
+        if pool.size() >= pool.max_size:
+            report["full"] = True
+            break
+        theme, system_prompt, user_prompt = get_idea_prompt(day)
+        log.info("🧺 Pre-generating for %s (theme: %s)", day, theme or "open")
+        state = run_pipeline(theme, system_prompt, user_prompt)
+        if not accepted(state):
+            log.info("🧺 %s — no accepted idea, will retry on the next fill", day)
+            report["rejected"].append(day.isoformat())
+            continue
+        rendered = render_result(theme, state, time.time() - state["start"], day.isoformat())
+        total = eval_total(rendered["winner_ev"]) if rendered["winner_ev"] else None
+        if pool.put(day, theme, rendered, total):
+            report["filled"].append(day.isoformat())
+    log.info(
+        "🧺 Pool: filled %d, rejected %d, %d/%d ready",
+        len(report["filled"]), len(report["rejected"]), pool.size(), pool.max_size,
+    )
+    return report
@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from agents.idea_refiner.storage.db import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pool (
+    id          INTEGER PRIMARY KEY,
+    for_date    TEXT NOT NULL,
+    theme       TEXT,
+    rendered    TEXT NOT NULL,
+    total       INTEGER,
+    created_at  REAL NOT NULL,
+    expires_at  REAL NOT NULL,
+    served_at   REAL
+);
+CREATE INDEX IF NOT EXISTS idx_pool_date ON pool (for_date, served_at);
+CREATE TABLE IF NOT EXISTS pool_counters (
+    name   TEXT PRIMARY KEY,
+    value  REAL NOT NULL
+);
+"""
+
+DEFAULT_SIZE = 7
+
+_pool: "IdeaPool | None" = None
+_lock = threading.Lock()
+
+
+def _end_of(day: date) -> float:
+    return datetime.combine(day + timedelta(days=1), datetime.min.time()).timestamp()
+
+
+class IdeaPool:
+    """Accepted ideas generated ahead of time, one per upcoming day, served on request."""
+
+    def __init__(self, path: str | Path, max_size: int = DEFAULT_SIZE) -> None:
+        self.path = Path(path)
+        self.max_size = max_size
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def evict(self, now: float | None = None) -> int:
+        """Drop entries past their day and served entries; returns how many went."""
+        now = now or time.time()
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "DELETE FROM pool WHERE expires_at <= ? OR served_at IS NOT NULL", (now,)
+            )
+        return cur.rowcount
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM pool WHERE served_at IS NULL AND expires_at > ?",
+                (time.time(),),
+            ).fetchone()[0]
+
+    def ready_days(self) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT for_date FROM pool WHERE served_at IS NULL AND expires_at > ? "
+                "ORDER BY for_date",
+                (time.time(),),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def put(self, day: date, theme: str | None, rendered: dict, total: int | None) -> bool:
+        """Store an accepted idea for ``day``; False when the pool is already full."""
+        self.evict()
+        if self.size() >= self.max_size:
+            return False
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO pool (for_date, theme, rendered, total, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (day.isoformat(), theme, json.dumps(rendered, default=str), total,
+                 time.time(), _end_of(day)),
+            )
+        return True
+
+    def take(self, day: date, theme: str | None = None) -> dict | None:
+        """Claim ``day``'s entry (or, for a requested theme, the best live entry with that
+        theme for ``day`` or earlier — never one generated for a later day).
+
+        Every lookup counts as a hit or a miss for ``stats``.
+        """
+        now = time.time()
+        if theme:
+            where, params = "theme = ? AND for_date <= ?", (theme, day.isoformat())
+        else:
+            where, params = "for_date = ?", (day.isoformat(),)
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"SELECT * FROM pool WHERE {where} AND served_at IS NULL AND expires_at > ? "
+                "ORDER BY total DESC, created_at LIMIT 1",
+                (*params, now),
+            ).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE pool SET served_at = ? WHERE id = ?", (now, row["id"]))
+                self._bump("served_age_s", now - row["created_at"])
+                self._record_max("served_age_max_s", now - row["created_at"])
+            self._bump("hits" if row is not None else "misses", 1)
+        if row is None:
+            return None
+        return {
+            "for_date": row["for_date"],
+            "theme": row["theme"],
+            "rendered": json.loads(row["rendered"]),
+            "age_s": round(now - row["created_at"], 1),
+        }
+
+    def _bump(self, name: str, value: float) -> None:
+        self._conn.execute(
+            "INSERT INTO pool_counters VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, value),
+        )
+
+    def _record_max(self, name: str, value: float) -> None:
+        self._conn.execute(
+            "INSERT INTO pool_counters VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = MAX(value, excluded.value)",
+            (name, value),
+        )
+
+    def stats(self) -> dict:
+        """Size, hit rate and staleness, for the /pool endpoint and the CLI."""
+        now = time.time()
+        with self._lock:
+            counters = dict(self._conn.execute("SELECT name, value FROM pool_counters").fetchall())
+            oldest = self._conn.execute(
+                "SELECT MIN(created_at) FROM pool WHERE served_at IS NULL AND expires_at > ?",
+                (now,),
+            ).fetchone()[0]
+        hits, misses = int(counters.get("hits", 0)), int(counters.get("misses", 0))
+        return {
+            "size": self.size(),
+            "max_size": self.max_size,
+            "ready_days": self.ready_days(),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+            "avg_served_age_s": round(counters["served_age_s"] / hits, 1) if hits else None,
+            "max_served_age_s": round(counters.get("served_age_max_s", 0), 1) if hits else None,
+            "oldest_ready_age_s": round(now - oldest, 1) if oldest else None,
+        }
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def pool_path() -> Path | None:
+    value = os.getenv("IDEA_POOL")
+    return Path(value) if value else None
+
+
+def get_pool() -> IdeaPool | None:
+    """Process-wide pool from ``IDEA_POOL`` (every request runs live when unset)."""
+    global _pool
+    path = pool_path()
+    if path is None:
+        return None
+    with _lock:
+        if _pool is None:
+            _pool = IdeaPool(path, int(os.getenv("POOL_SIZE", str(DEFAULT_SIZE))))
+    return _pool
@@ -0,0 +1,165 @@
+import logging
+import os
+import random
+import threading
+from pathlib import Path
+
+from agents.idea_refiner.config import data_path
+from agents.idea_refiner.generation.models import MODELS, lane_labels
+from agents.idea_refiner.scheduling.model_stats import ModelStats
+
+log = logging.getLogger(__name__)
+
+DEFAULT_DISCOUNT = 0.9
+EXPLORATION = 0.1
+LATENCY_WEIGHT = 0.5
+
+_stats: ModelStats | None = None
+_lock = threading.Lock()
+
+
+def allocator_name() -> str:
+    return os.getenv("MODEL_ALLOCATOR", "fixed")
+
+
+def lane_budget() -> int:
+    return int(os.getenv("LANE_BUDGET", len(MODELS)))
+
+
+def stats_path() -> Path | None:
+    value = os.getenv("MODEL_STATS")
+    if value:
+        return Path(value)
+    return data_path("model_stats.db") if allocator_name() == "bandit" else None
+
+
+def get_stats() -> ModelStats | None:
+    global _stats
+    path = stats_path()
+    if path is None:
+        return None
+    with _lock:
+        if _stats is None:
+            _stats = ModelStats(path)
+    return _stats
+
+
+def summarize(stats: dict) -> dict:
+    """Per-model rates behind an allocation decision."""
+    samples, judged, ok = stats.get("samples", 0), stats.get("judged", 0), stats.get("ok", 0)
+    return {
+        "samples": round(samples, 2),
+        "mean_score": round(stats["score"] / judged, 3) if judged else None,
+        "win_rate": round(stats["wins"] / judged, 3) if judged else None,
+        "failure_rate": round(stats["failures"] / samples, 3) if samples else None,
+        "mean_latency_s": round(stats["latency_s"] / ok, 1) if ok else None,
+    }
+
+
+def bandit_allocation(
+    models: list[dict], stats: dict[str, dict], budget: int,
+) -> list[dict]:
+    """Thompson-sample each lane: the model with the best quality-per-latency draw wins it.
+
+    Quality is a Beta posterior over the judge's normalised score per sample (failed
+    generations count as zero); it is divided by the model's relative latency raised to
+    ``LATENCY_WEIGHT``. A uniform pick is made with probability ``EXPLORATION``.
+    """
+    latencies = {
+        m["name"]: s["latency_s"] / s["ok"]
+        for m in models
+        if (s := stats.get(m["name"])) and s.get("ok")
+    }
+    fastest = min(latencies.values(), default=1.0)
+
+    def draw(model: dict) -> float:
+        s = stats.get(model["name"]) or {}
+        score, samples = s.get("score", 0.0), s.get("samples", 0.0)
+        quality = random.betavariate(1 + score, 1 + max(samples - score, 0.0))
+        slowdown = latencies.get(model["name"], fastest) / fastest
+        return quality / slowdown ** LATENCY_WEIGHT
+
+    picks = []
+    for _ in range(budget):
+        if random.random() < EXPLORATION:
+            picks.append(random.choice(models))
+        else:
+            picks.append(max(models, key=draw))
+    return picks
+
+
+def fixed_allocation(models: list[dict], budget: int) -> list[dict]:
+    return [models[i % len(models)] for i in range(budget)]
+
+
+def allocate_lanes(models: list[dict] | None = None) -> tuple[dict[str, dict], dict]:
+    """Decide which model fills each of this run's lanes, and why.
+
+    ``models`` narrows the candidates (e.g. a work-queue item pinned to one model).
+    """
+    models = models or MODELS
+    budget = lane_budget()
+    stats = get_stats()
+    bandit = allocator_name() == "bandit" and stats is not None
+    known = stats.all() if bandit else {}
+    picks = bandit_allocation(models, known, budget) if bandit else fixed_allocation(models, budget)
+    picks.sort(key=MODELS.index)
+    lanes = dict(zip(lane_labels(budget), picks))
+    allocation = {
+        "allocator": "bandit" if bandit else "fixed",
+        "budget": budget,
+        "lanes": {m["name"]: picks.count(m) for m in models},
+        "models": {name: summarize(s) for name, s in known.items()},
+    }
+    log.info(
+        "🎰 Allocation (%s): %s",
+        allocation["allocator"],
+        ", ".join(f"{name} ×{n}" for name, n in allocation["lanes"].items()),
+    )
+    for name, why in allocation["models"].items():
+        log.info(
+            "   %s — score %s, wins %s, failures %s, latency %ss (n=%s)",
+            name, why["mean_score"], why["win_rate"], why["failure_rate"],
+            why["mean_latency_s"], why["samples"],
+        )
+    return lanes, allocation
+
+
+def _total(ev: dict) -> int:
+    return ev.get("acquisition_score", 0) + ev.get("demand_score", 0) + ev.get("build_score", 0)
+
+
+def run_outcomes(state: dict) -> dict[str, dict]:
+    """Per-model samples, failures, judge scores, wins and latency from a run's history."""
+    outcomes: dict[str, dict] = {}
+    history = state.get("history") or []
+    for rec in history:
+        fresh = {label: lane for label, lane in rec.get("lanes", {}).items() if not lane["kept"]}
+        for lane in fresh.values():
+            o = outcomes.setdefault(lane["model"], {})
+            o["samples"] = o.get("samples", 0) + 1
+            if lane["ok"]:
+                o["ok"] = o.get("ok", 0) + 1
+                o["latency_s"] = o.get("latency_s", 0) + (lane["latency_s"] or 0)
+            else:
+                o["failures"] = o.get("failures", 0) + 1
+        for ev in rec.get("evaluations") or []:
+            lane = fresh.get(ev["idea_label"])
+            if lane and lane["ok"]:
+                o = outcomes[lane["model"]]
+                o["judged"] = o.get("judged", 0) + 1
+                o["score"] = o.get("score", 0) + _total(ev) / 30
+    if history and history[-1].get("verdict") == "accept":
+        lane = history[-1].get("lanes", {}).get(state.get("winner_label"))
+        if lane:
+            o = outcomes.setdefault(lane["model"], {})
+            o["wins"] = o.get("wins", 0) + 1
+    return outcomes
+
+
+def record_model_outcomes(state: dict) -> None:
+    stats = get_stats()
+    if stats is None:
+        return
+    discount = float(os.getenv("MODEL_STATS_DISCOUNT", DEFAULT_DISCOUNT))
+    stats.record_run(run_outcomes(state), discount)
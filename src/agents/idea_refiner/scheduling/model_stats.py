@@ -0,0 +1,52 @@
+import threading
+from pathlib import Path
+
+from agents.idea_refiner.storage.db import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS model_stats (
+    model      TEXT PRIMARY KEY,
+    samples    REAL NOT NULL DEFAULT 0,
+    failures   REAL NOT NULL DEFAULT 0,
+    judged     REAL NOT NULL DEFAULT 0,
+    score      REAL NOT NULL DEFAULT 0,
+    wins       REAL NOT NULL DEFAULT 0,
+    ok         REAL NOT NULL DEFAULT 0,
+    latency_s  REAL NOT NULL DEFAULT 0
+)
+"""
+
+FIELDS = ("samples", "failures", "judged", "score", "wins", "ok", "latency_s")
+
+
+class ModelStats:
+    """Exponentially discounted per-model generation outcomes."""
+
+    def __init__(self, path: str | Path) -> None:
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(_SCHEMA)
+
+    def record_run(self, outcomes: dict[str, dict], discount: float) -> None:
+        """Decay every model's totals by ``discount``, then add this run's outcomes."""
+        decay = ", ".join(f"{f} = {f} * ?" for f in FIELDS)
+        upsert = (
+            f"INSERT INTO model_stats (model, {', '.join(FIELDS)}) "
+            f"VALUES (?, {', '.join('?' for _ in FIELDS)}) ON CONFLICT(model) DO UPDATE SET "
+            + ", ".join(f"{f} = {f} + excluded.{f}" for f in FIELDS)
+        )
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE model_stats SET {decay}", [discount] * len(FIELDS))
+            self._conn.executemany(
+                upsert,
+                [(model, *(o.get(f, 0) for f in FIELDS)) for model, o in outcomes.items()],
+            )
+
+    def all(self) -> dict[str, dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM model_stats").fetchall()
+        return {r["model"]: dict(r) for r in rows}
+
+    def close(self) -> None:
+        self._conn.close()
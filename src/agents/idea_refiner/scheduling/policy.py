@@ -0,0 +1,56 @@
+import random
+from collections.abc import Callable, Sequence
+from datetime import date, timedelta
+
+ThemePolicy = Callable[[Sequence[str], dict[str, dict], date], str]
+
+DEFAULT_EXPLORATION = 0.1
+DEFAULT_NO_REPEAT_DAYS = 14
+
+
+def random_policy(themes: Sequence[str], stats: dict[str, dict], today: date) -> str:
+    return random.choice(themes)
+
+
+def _eligible(themes: Sequence[str], stats: dict[str, dict], today: date, window: int) -> list[str]:
+    cutoff = (today - timedelta(days=window)).isoformat()
+    fresh = [
+        t for t in themes
+        if not (stats.get(t) or {}).get("last_picked")
+        or stats[t]["last_picked"] <= cutoff
+    ]
+    return fresh or list(themes)
+
+
+def thompson_policy(
+    themes: Sequence[str],
+    stats: dict[str, dict],
+    today: date,
+    exploration: float = DEFAULT_EXPLORATION,
+    no_repeat_days: int = DEFAULT_NO_REPEAT_DAYS,
+) -> str:
+    """Sample each theme's Beta posterior over fast acceptance and take the best draw.
+
+    With probability ``exploration`` a uniformly random theme is picked instead, and
+    themes picked within the last ``no_repeat_days`` are skipped while others remain.
+    """
+    candidates = _eligible(themes, stats, today, no_repeat_days)
+    if random.random() < exploration:
+        return random.choice(candidates)
+
+    def draw(theme: str) -> float:
+        s = stats.get(theme) or {}
+        reward, runs = s.get("reward", 0.0), s.get("runs", 0)
+        return random.betavariate(1 + reward, 1 + runs - reward)
+
+    return max(candidates, key=draw)
+
+
+POLICIES: dict[str, ThemePolicy] = {
+    "random": random_policy,
+    "thompson": thompson_policy,
+}
+
+
+def register_policy(name: str, policy: ThemePolicy) -> None:
+    POLICIES[name] = policy
@@ -0,0 +1,121 @@
+import itertools
+import logging
+import math
+import os
+from collections.abc import Callable
+
+log = logging.getLogger(__name__)
+
+GATE = 9  # the quality gate wants 9+ on every dimension
+DIMENSIONS = ("acquisition_score", "demand_score", "build_score")
+DEFAULT_THRESHOLD = 0.1
+DEFAULT_SPREAD = 1.5
+MIN_SPREAD = 0.75
+# A lane can only have stopped improving once it has been scored at least twice.
+MIN_SCORES = 2
+
+# (score history of one lane, attempts it has left) -> (retire?, estimated chance of passing)
+RetirementPolicy = Callable[[list[dict], int], tuple[bool, float | None]]
+
+
+def lane_scores(state: dict, label: str) -> list[dict]:
+    """Judge scores of each fresh idea the lane produced, oldest first (kept ideas skipped)."""
+    scores = []
+    for rec in state.get("history") or []:
+        lane = rec.get("lanes", {}).get(label)
+        if not lane or lane.get("kept") or not lane.get("ok"):
+            continue
+        ev = next((e for e in rec.get("evaluations") or [] if e["idea_label"] == label), None)
+        if ev:
+            scores.append({d: ev.get(d, 0) for d in DIMENSIONS})
+    return scores
+
+
+def _above_gate(mean: float, spread: float) -> float:
+    """P(score >= GATE) for a normal score, with half a point for integer rounding."""
+    return 0.5 * math.erfc((GATE - 0.5 - mean) / (spread * math.sqrt(2)))
+
+
+def pass_probability(scores: list[dict], remaining: int) -> float:
+    """Chance that one of the next ``remaining`` attempts clears the gate on every dimension.
+
+    Each dimension's next score is modelled as normal around the last score plus the mean
+    step so far (the trend), with the steps' spread as the deviation once there are a few.
+    Dimensions and attempts are treated as independent.
+    """
+    if remaining <= 0:
+        return 0.0
+    if not scores:
+        return 1.0
+    miss_all = 1.0
+    for k in range(1, remaining + 1):
+        p = 1.0
+        for d in DIMENSIONS:
+            series = [s[d] for s in scores]
+            steps = [b - a for a, b in itertools.pairwise(series)]
+            trend = sum(steps) / len(steps) if steps else 0.0
+            spread = DEFAULT_SPREAD
+            if len(steps) >= 2:
+                var = sum((s - trend) ** 2 for s in steps) / (len(steps) - 1)
+                spread = max(math.sqrt(var), MIN_SPREAD)
+            mean = min(max(series[-1] + k * trend, 0.0), 10.0)
+            p *= _above_gate(mean, spread)
+        miss_all *= 1.0 - p
+    return 1.0 - miss_all
+
+
+def never_policy(scores: list[dict], remaining: int) -> tuple[bool, float | None]:
+    return False, None
+
+
+def stalled_policy(scores: list[dict], remaining: int) -> tuple[bool, float | None]:
+    """Retire once the lane's latest total is no better than the one before."""
+    totals = [sum(s.values()) for s in scores]
+    return len(totals) >= 2 and totals[-1] <= totals[-2], None
+
+
+def probability_policy(scores: list[dict], remaining: int) -> tuple[bool, float | None]:
+    """Retire when the estimated chance of clearing the gate drops below ``RETIRE_BELOW``."""
+    p = pass_probability(scores, remaining)
+    threshold = float(os.getenv("RETIRE_BELOW", DEFAULT_THRESHOLD))
+    return p < threshold, round(p, 4)
+
+
+RETIREMENT_POLICIES: dict[str, RetirementPolicy] = {
+    "off": never_policy,
+    "stalled": stalled_policy,
+    "probability": probability_policy,
+}
+
+# What a retired lane's remaining attempts go to.
+REASSIGNMENTS = ("none", "restart", "promote")
+
+
+def register_retirement_policy(name: str, policy: RetirementPolicy) -> None:
+    RETIREMENT_POLICIES[name] = policy
+
+
+def retirement_policy_name() -> str:
+    return os.getenv("LANE_RETIREMENT", "off")
+
+
+def reassignment() -> str:
+    value = os.getenv("LANE_REASSIGN", "none").strip().lower()
+    if value not in REASSIGNMENTS:
+        log.warning("⚠️  Unknown LANE_REASSIGN %r — retired lanes stay retired", value)
+        return "none"
+    return value
+
+
+def should_retire(scores: list[dict], remaining: int) -> tuple[bool, float | None, str]:
+    """Ask the configured policy about one lane; returns ``(retire, p_pass, policy_name)``.
+
+    No policy retires a lane with fewer than ``MIN_SCORES`` scored ideas.
+    """
+    name = retirement_policy_name()
+    policy = RETIREMENT_POLICIES.get(name)
+    if policy is None:
+        log.warning("⚠️  Unknown LANE_RETIREMENT %r — lanes are never retired", name)
+        name, policy = "off", never_policy
+    retire, p = policy(scores, remaining)
+    return retire and len(scores) >= MIN_SCORES, p, name
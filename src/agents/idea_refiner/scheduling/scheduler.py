@@ -0,0 +1,80 @@
+import logging
+import os
+import threading
+from datetime import date
+from pathlib import Path
+
+from agents.idea_refiner.config import MAX_RETRIES, RANDOM_THEMES, data_path
+from agents.idea_refiner.scheduling.policy import POLICIES
+from agents.idea_refiner.scheduling.stats import ThemeStats
+
+log = logging.getLogger(__name__)
+
+_stats: ThemeStats | None = None
+_lock = threading.Lock()
+
+
+def policy_name() -> str:
+    return os.getenv("THEME_POLICY", "random")
+
+
+def stats_path() -> Path | None:
+    """``THEME_STATS``, or the data dir whenever a learning policy is configured."""
+    value = os.getenv("THEME_STATS")
+    if value:
+        return Path(value)
+    return None if policy_name() == "random" else data_path("theme_stats.db")
+
+
+def get_stats() -> ThemeStats | None:
+    global _stats
+    path = stats_path()
+    if path is None:
+        return None
+    with _lock:
+        if _stats is None:
+            _stats = ThemeStats(path)
+    return _stats
+
+
+def pick_theme(today: date | None = None) -> str:
+    today = today or date.today()
+    name = policy_name()
+    policy = POLICIES.get(name)
+    if policy is None:
+        log.warning("⚠️  Unknown THEME_POLICY %r — falling back to random", name)
+        policy = POLICIES["random"]
+    stats = get_stats()
+    theme = policy(RANDOM_THEMES, stats.all() if stats else {}, today)
+    if stats:
+        stats.mark_picked(theme, today)
+    return theme
+
+
+def outcome_reward(accepted: bool, rounds: int) -> float:
+    """1.0 for a first-round accept, falling linearly to 0 for a forced/last-resort winner."""
+    if not accepted:
+        return 0.0
+    return (MAX_RETRIES + 2 - rounds) / (MAX_RETRIES + 1)
+
+
+def record_outcome(theme: str | None, state: dict, elapsed: float) -> None:
+    stats = get_stats()
+    if stats is None or not theme:
+        return
+    history = state.get("history") or []
+    accepted = bool(history) and history[-1].get("verdict") == "accept"
+    rounds = state.get("rounds", 0)
+    totals = [
+        ev.get("acquisition_score", 0) + ev.get("demand_score", 0) + ev.get("build_score", 0)
+        for record in history
+        for ev in record.get("evaluations") or []
+    ]
+    stats.record(
+        theme,
+        accepted=accepted,
+        rounds=rounds,
+        reward=outcome_reward(accepted, rounds),
+        best_total=max(totals, default=None),
+        latency_s=elapsed,
+    )
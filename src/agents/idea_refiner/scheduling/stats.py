@@ -0,0 +1,60 @@
+import threading
+from datetime import date
+from pathlib import Path
+
+from agents.idea_refiner.storage.db import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS theme_stats (
+    theme        TEXT PRIMARY KEY,
+    runs         INTEGER NOT NULL DEFAULT 0,
+    accepted     INTEGER NOT NULL DEFAULT 0,
+    rounds       INTEGER NOT NULL DEFAULT 0,
+    reward       REAL NOT NULL DEFAULT 0,
+    best_total   INTEGER,
+    latency_s    REAL NOT NULL DEFAULT 0,
+    last_picked  TEXT
+)
+"""
+
+
+class ThemeStats:
+    """Per-theme run outcomes, updated incrementally after every run."""
+
+    def __init__(self, path: str | Path) -> None:
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(_SCHEMA)
+
+    def record(
+        self, theme: str, *, accepted: bool, rounds: int, reward: float,
+        best_total: int | None, latency_s: float,
+    ) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO theme_stats (theme, runs, accepted, rounds, reward, best_total, "
+                "latency_s) VALUES (?, 1, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(theme) DO UPDATE SET runs = runs + 1, "
+                "accepted = accepted + excluded.accepted, rounds = rounds + excluded.rounds, "
+                "reward = reward + excluded.reward, "
+                "best_total = max(coalesce(best_total, 0), coalesce(excluded.best_total, 0)), "
+                "latency_s = latency_s + excluded.latency_s",
+                (theme, int(accepted), rounds, reward, best_total, latency_s),
+            )
+
+    def mark_picked(self, theme: str, day: date) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO theme_stats (theme, last_picked) VALUES (?, ?) "
+                "ON CONFLICT(theme) DO UPDATE SET last_picked = excluded.last_picked",
+                (theme, day.isoformat()),
+            )
+
+    def all(self) -> dict[str, dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM theme_stats").fetchall()
+        return {r["theme"]: dict(r) for r in rows}
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,73 @@
+import contextvars
+import logging
+import os
+import threading
+
+from agents.idea_refiner.output.telegram import build_messages
+from agents.idea_refiner.output.telegram_client import get_telegram_client
+from agents.idea_refiner.server.ondemand import OnDemand, RateLimited
+
+log = logging.getLogger(__name__)
+
+COMMAND = "/idea"
+
+
+def parse_command(update: dict) -> tuple[str, str, str | None] | None:
+    """``(chat_id, user_id, theme)`` for an ``/idea [theme]`` message, else None."""
+    message = update.get("message") or {}
+    text = (message.get("text") or "").strip()
+    command, _, theme = text.partition(" ")
+    # Group chats address commands as /idea@BotName.
+    if command.split("@", 1)[0] != COMMAND:
+        return None
+    user = message.get("from") or {}
+    chat = message.get("chat") or {}
+    return str(chat.get("id")), str(user.get("id") or chat.get("id")), theme.strip() or None
+
+
+def secret_ok(header: str | None) -> bool:
+    """Telegram echoes the webhook's secret token; checked when TELEGRAM_WEBHOOK_SECRET is set."""
+    secret = os.getenv("TELEGRAM_WEBHOOK_SECRET")
+    return not secret or header == secret
+
+
+def _reply(chat_id: str, messages: list[str]) -> None:
+    token = os.getenv("TELEGRAM_BOT_TOKEN")
+    if not token:
+        log.warning("⚠️  TELEGRAM_BOT_TOKEN is not set — cannot reply to %s", chat_id)
+        return
+    report = get_telegram_client(token).send(chat_id, messages)
+    if not report["ok"]:
+        log.warning("   ⚠️ Reply to %s failed: %s", chat_id, report["error"])
+
+
+def _answer(service: OnDemand, chat_id: str, user_id: str, theme: str | None) -> None:
+    try:
+        rendered, source = service.request(theme, user_id)
+    except RateLimited as e:
+        _reply(chat_id, [f"🐢 Easy there — try again in {e.retry_after_s / 60:.0f} min."])
+        return
+    except Exception as e:  # noqa: BLE001
+        log.error("❌ On-demand run for %s failed: %s", chat_id, e)
+        _reply(chat_id, ["❌ Something went wrong generating your idea. Please try again later."])
+        return
+    log.info("🛎️  Replying to %s (%s)", chat_id, source)
+    _reply(chat_id, build_messages(rendered))
+
+
+def handle_update(update: dict, service: OnDemand) -> bool:
+    """Answer an ``/idea`` command in the background; False when the update is not one.
+
+    Telegram re-sends updates whose webhook call does not return promptly, so the
+    run never happens on the request thread.
+    """
+    parsed = parse_command(update)
+    if parsed is None:
+        return False
+    chat_id, user_id, theme = parsed
+    log.info("🛎️  /idea from %s (theme: %s)", user_id, theme or "open")
+    threading.Thread(
+        target=contextvars.copy_context().run, args=(_answer, service, chat_id, user_id, theme),
+        name=f"idea-{chat_id}", daemon=True,
+    ).start()
+    return True
@@ -0,0 +1,257 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from datetime import date
+from pathlib import Path
+from typing import Protocol
+
+from agents.idea_refiner.config import data_path
+from agents.idea_refiner.storage.db import connect
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS idempotency (
+    key          TEXT PRIMARY KEY,
+    status       TEXT NOT NULL,
+    owner        TEXT,
+    lease_until  REAL,
+    attempts     INTEGER NOT NULL DEFAULT 1,
+    result       TEXT,
+    error        TEXT,
+    created_at   REAL NOT NULL,
+    finished_at  REAL
+);
+"""
+
+LEASE_S = 120.0
+WAIT_S = 900.0
+POLL_S = 0.5
+TTL_S = 3 * 86400.0
+
+_store: "IdempotencyStore | None" = None
+_lock = threading.Lock()
+
+
+class IdempotencyTimeout(Exception):
+    """Gave up waiting for another caller's in-progress run with the same key."""
+
+
+class IdempotencyStore(Protocol):
+    def claim(self, key: str, owner: str, lease_s: float) -> tuple[str, dict | None]:
+        """``("acquired", None)``, ``("done", result)`` or ``("busy", None)``.
+
+        A key whose lease has expired (its owner crashed) or whose run failed is
+        acquired again.
+        """
+
+    def renew(self, key: str, owner: str, lease_s: float) -> bool: ...
+
+    def complete(self, key: str, owner: str, result: dict) -> None: ...
+
+    def release(self, key: str, owner: str, error: str) -> None: ...
+
+
+class SqliteIdempotencyStore:
+    """Idempotency records in a local SQLite file, shared by every process on the instance."""
+
+    def __init__(self, path: str | Path, ttl_s: float = TTL_S) -> None:
+        self.path = Path(path)
+        self.ttl_s = ttl_s
+        self._conn = connect(path)
+        self._conn.isolation_level = None
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+
+    def claim(self, key: str, owner: str, lease_s: float) -> tuple[str, dict | None]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "DELETE FROM idempotency WHERE created_at < ?", (now - self.ttl_s,)
+                )
+                row = self._conn.execute(
+                    "SELECT status, lease_until, result FROM idempotency WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute(
+                        "INSERT INTO idempotency (key, status, owner, lease_until, created_at) "
+                        "VALUES (?, 'running', ?, ?, ?)",
+                        (key, owner, now + lease_s, now),
+                    )
+                    outcome = ("acquired", None)
+                elif row["status"] == "done":
+                    outcome = ("done", json.loads(row["result"]))
+                elif row["status"] == "running" and row["lease_until"] > now:
+                    outcome = ("busy", None)
+                else:
+                    self._conn.execute(
+                        "UPDATE idempotency SET status = 'running', owner = ?, lease_until = ?, "
+                        "attempts = attempts + 1, error = NULL WHERE key = ?",
+                        (owner, now + lease_s, key),
+                    )
+                    outcome = ("acquired", None)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return outcome
+
+    def _update(self, sql: str, params: tuple) -> bool:
+        with self._lock:
+            cur = self._conn.execute(sql, params)
+        return cur.rowcount > 0
+
+    def renew(self, key: str, owner: str, lease_s: float) -> bool:
+        return self._update(
+            "UPDATE idempotency SET lease_until = ? WHERE key = ? AND owner = ? "
+            "AND status = 'running'",
+            (time.time() + lease_s, key, owner),
+        )
+
+    def complete(self, key: str, owner: str, result: dict) -> None:
+        self._update(
+            "UPDATE idempotency SET status = 'done', result = ?, finished_at = ?, "
+            "lease_until = NULL WHERE key = ? AND owner = ?",
+            (json.dumps(result, default=str), time.time(), key, owner),
+        )
+
+    def release(self, key: str, owner: str, error: str) -> None:
+        self._update(
+            "UPDATE idempotency SET status = 'failed', error = ?, lease_until = NULL "
+            "WHERE key = ? AND owner = ?",
+            (error, key, owner),
+        )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class MemoryIdempotencyStore:
+    """Per-process idempotency records, for single-process deployments and tests."""
+
+    def __init__(self) -> None:
+        self._records: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def claim(self, key: str, owner: str, lease_s: float) -> tuple[str, dict | None]:
+        now = time.time()
+        with self._lock:
+            rec = self._records.get(key)
+            if rec and rec["status"] == "done":
+                return "done", rec["result"]
+            if rec and rec["status"] == "running" and rec["lease_until"] > now:
+                return "busy", None
+            self._records[key] = {"status": "running", "owner": owner, "lease_until": now + lease_s}
+            return "acquired", None
+
+    def renew(self, key: str, owner: str, lease_s: float) -> bool:
+        with self._lock:
+            rec = self._records.get(key)
+            if not rec or rec["owner"] != owner or rec["status"] != "running":
+                return False
+            rec["lease_until"] = time.time() + lease_s
+            return True
+
+    def complete(self, key: str, owner: str, result: dict) -> None:
+        with self._lock:
+            rec = self._records.get(key)
+            if rec and rec["owner"] == owner:
+                rec.update(status="done", result=result)
+
+    def release(self, key: str, owner: str, error: str) -> None:
+        with self._lock:
+            rec = self._records.get(key)
+            if rec and rec["owner"] == owner:
+                rec.update(status="failed", error=error)
+
+
+def _sqlite_backend() -> IdempotencyStore:
+    return SqliteIdempotencyStore(os.getenv("IDEMPOTENCY_DB") or data_path("idempotency.db"))
+
+
+BACKENDS: dict[str, Callable[[], IdempotencyStore]] = {
+    "sqlite": _sqlite_backend,
+    "memory": MemoryIdempotencyStore,
+}
+
+
+def register_backend(name: str, factory: Callable[[], IdempotencyStore]) -> None:
+    BACKENDS[name] = factory
+
+
+def get_idempotency_store() -> IdempotencyStore | None:
+    """Process-wide store for ``IDEMPOTENCY_BACKEND`` (default sqlite; ``off`` disables)."""
+    global _store
+    name = os.getenv("IDEMPOTENCY_BACKEND", "sqlite").strip().lower()
+    if name in ("", "off", "none"):
+        return None
+    with _lock:
+        if _store is None:
+            if name not in BACKENDS:
+                raise ValueError(f"unknown idempotency backend {name!r}")
+            _store = BACKENDS[name]()
+    return _store
+
+
+def idempotency_key(supplied: str | None, theme: str | None, today: date | None = None) -> str:
+    """The caller's key, or today's date plus the requested theme (``auto`` for the daily pick)."""
+    if supplied:
+        return supplied
+    return f"{(today or date.today()).isoformat()}:{theme or 'auto'}"
+
+
+def run_once(
+    store: IdempotencyStore,
+    key: str,
+    fn: Callable[[], dict],
+    lease_s: float = LEASE_S,
+    wait_s: float = WAIT_S,
+    poll_s: float = POLL_S,
+) -> tuple[dict, bool]:
+    """Run ``fn`` at most once per key; returns ``(result, replayed)``.
+
+    A finished key returns its stored result. While another caller holds the key's
+    lease this waits for its result; the lease is renewed while ``fn`` runs, so it
+    only lapses (letting a waiter take over) if the owner dies.
+    """
+    owner = uuid.uuid4().hex
+    deadline = time.monotonic() + wait_s
+    while True:
+        status, result = store.claim(key, owner, lease_s)
+        if status == "done":
+            log.info("♻️  %s already ran — returning the stored result", key)
+            return result, True
+        if status == "acquired":
+            break
+        if time.monotonic() >= deadline:
+            raise IdempotencyTimeout(f"run {key!r} still in progress after {wait_s:.0f}s")
+        time.sleep(poll_s)
+
+    stop = threading.Event()
+
+    def heartbeat() -> None:
+        while not stop.wait(lease_s / 3):
+            if not store.renew(key, owner, lease_s):
+                log.warning("⚠️  Lost the lease on %s", key)
+                return
+
+    keeper = threading.Thread(target=heartbeat, name="idempotency-lease", daemon=True)
+    keeper.start()
+    try:
+        result = fn()
+    except BaseException as e:
+        store.release(key, owner, f"{type(e).__name__}: {e}")
+        raise
+    else:
+        store.complete(key, owner, result)
+        return result, False
+    finally:
+        stop.set()
+        keeper.join()
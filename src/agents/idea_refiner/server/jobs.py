@@ -0,0 +1,279 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from agents.idea_refiner.config import data_path
+from agents.idea_refiner.pipeline.events import listen
+from agents.idea_refiner.storage.db import connect
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           TEXT PRIMARY KEY,
+    status       TEXT NOT NULL DEFAULT 'queued',
+    theme        TEXT,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    created_at   REAL NOT NULL,
+    started_at   REAL,
+    finished_at  REAL,
+    progress     TEXT NOT NULL DEFAULT '{}',
+    result       TEXT,
+    error        TEXT,
+    worker       TEXT,
+    lease_until  REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+"""
+# Columns added after the first release, for stores created before them.
+_ADDED_COLUMNS = {"worker": "TEXT", "lease_until": "REAL"}
+
+DEFAULT_WORKERS = 2
+MAX_ATTEMPTS = 3
+LEASE_S = 120.0
+
+_executor: "JobExecutor | None" = None
+_lock = threading.Lock()
+
+
+class JobStore:
+    """Job status, progress and results, kept on disk so a restarted worker can pick them up."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+            have = {r["name"] for r in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in _ADDED_COLUMNS.items():
+                if column not in have:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+
+    def create(self, theme: str | None) -> dict:
+        job_id = uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, theme, created_at) VALUES (?, ?, ?)",
+                (job_id, theme, time.time()),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job(row) if row else None
+
+    def recent(self, limit: int = 20) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [_job(r) for r in rows]
+
+    def claim(self, job_id: str, worker: str, lease_s: float = LEASE_S) -> bool:
+        """Start a queued job, or take over one whose worker's lease expired.
+
+        False when the job is finished or another live worker holds it, so a job that
+        two instances both try to resume still runs once.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?, "
+                "progress = '{}', worker = ?, lease_until = ? WHERE id = ? AND (status = 'queued' "
+                "OR (status = 'running' AND (lease_until IS NULL OR lease_until < ?)))",
+                (now, worker, now + lease_s, job_id, now),
+            )
+        return cur.rowcount > 0
+
+    def renew(self, job_id: str, worker: str, lease_s: float = LEASE_S) -> bool:
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE jobs SET lease_until = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time() + lease_s, job_id, worker),
+            )
+        return cur.rowcount > 0
+
+    def set_progress(self, job_id: str, progress: dict) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET progress = ? WHERE id = ?", (json.dumps(progress), job_id)
+            )
+
+    def finish(self, job_id: str, worker: str, result: dict) -> bool:
+        """Record the result; False when ``worker`` lost the job to another worker."""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = 'done', finished_at = ?, result = ?, lease_until = NULL "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time(), json.dumps(result, default=str), job_id, worker),
+            )
+        return cur.rowcount > 0
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        """Record the error; False when ``worker`` lost the job to another worker."""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, error = ?, lease_until = NULL "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time(), error, job_id, worker),
+            )
+        return cur.rowcount > 0
+
+    def unfinished(self) -> list[dict]:
+        """Queued jobs and running jobs whose worker stopped renewing its lease, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' OR (status = 'running' "
+                "AND (lease_until IS NULL OR lease_until < ?)) ORDER BY created_at",
+                (time.time(),),
+            ).fetchall()
+        return [_job(r) for r in rows]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _job(row) -> dict:
+    job = dict(row)
+    job["progress"] = json.loads(job["progress"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def apply_event(progress: dict, event: str, data: dict) -> dict:
+    """Fold one pipeline event into a job's progress: current round and per-lane state."""
+    lanes = progress.setdefault("lanes", {})
+    if event == "run_started":
+        progress["run_id"] = data.get("run_id")
+        for label, model in data["lanes"].items():
+            lanes[label] = {"model": model, "status": "queued"}
+    elif event == "round_started":
+        progress["round"] = data["round"]
+        progress["stage"] = "generating"
+        for label in data["lanes"]:
+            lanes.setdefault(label, {})["status"] = "generating"
+    elif event == "lane_generated":
+        lanes.setdefault(data["label"], {}).update({
+            "model": data["model"], "attempt": data["attempt"],
+            "status": "generated" if data["ok"] else "failed", "latency_s": data["latency_s"],
+        })
+        if all(lane.get("status") != "generating" for lane in lanes.values()):
+            progress["stage"] = "judging"
+    elif event == "judge_verdict":
+        progress["verdict"] = data["verdict"]
+        for row in data["scores"]:
+            lanes.setdefault(row["label"], {})["total"] = row["total"]
+    elif event == "retry_queued":
+        lanes.setdefault(data["label"], {})["status"] = "retrying"
+    elif event == "winner":
+        progress["stage"] = "delivering"
+        progress["winner_label"] = data["label"]
+    return progress
+
+
+class JobExecutor:
+    """Runs submitted jobs on a bounded pool, recording progress as the pipeline reports it."""
+
+    def __init__(
+        self, store: JobStore, run: Callable[[str | None], dict], workers: int = DEFAULT_WORKERS,
+        lease_s: float = LEASE_S,
+    ) -> None:
+        self.store = store
+        self._run = run
+        self.lease_s = lease_s
+        self.worker = uuid.uuid4().hex
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+
+    def submit(self, theme: str | None = None) -> dict:
+        job = self.store.create(theme)
+        self._pool.submit(self._execute, job["id"])
+        log.info("📥 Job %s queued (theme: %s)", job["id"], theme or "today's pick")
+        return job
+
+    def resume(self) -> int:
+        """Requeue jobs left unfinished by a previous worker; returns how many.
+
+        Running jobs are only taken over once their lease has expired, so jobs another
+        instance is still working on are left alone.
+        """
+        resumed = 0
+        for job in self.store.unfinished():
+            if job["attempts"] >= MAX_ATTEMPTS:
+                # Take the job over first, so only one instance gives up on it.
+                if self.store.claim(job["id"], self.worker, self.lease_s):
+                    self.store.fail(
+                        job["id"], self.worker,
+                        f"abandoned after {job['attempts']} interrupted runs",
+                    )
+                continue
+            self._pool.submit(self._execute, job["id"])
+            resumed += 1
+        if resumed:
+            log.info("📥 Resumed %d unfinished job(s)", resumed)
+        return resumed
+
+    def _execute(self, job_id: str) -> None:
+        if not self.store.claim(job_id, self.worker, self.lease_s):
+            log.info("📥 Job %s is finished or held by another worker — skipping", job_id)
+            return
+        job = self.store.get(job_id)
+        progress: dict = {}
+        stop = threading.Event()
+
+        def on_event(event: str, data: dict) -> None:
+            self.store.set_progress(job_id, apply_event(progress, event, data))
+
+        def heartbeat() -> None:
+            while not stop.wait(self.lease_s / 3):
+                if not self.store.renew(job_id, self.worker, self.lease_s):
+                    log.warning("⚠️  Lost the lease on job %s", job_id)
+                    return
+
+        keeper = threading.Thread(target=heartbeat, name="job-lease", daemon=True)
+        keeper.start()
+        listen(on_event)
+        try:
+            result = self._run(job["theme"])
+        except Exception as e:
+            log.exception("❌ Job %s failed", job_id)
+            if not self.store.fail(job_id, self.worker, f"{type(e).__name__}: {e}"):
+                log.warning("⚠️  Job %s lost to another worker — error dropped", job_id)
+        else:
+            if self.store.finish(job_id, self.worker, result):
+                log.info("✅ Job %s done", job_id)
+            else:
+                log.warning("⚠️  Job %s lost to another worker — result dropped", job_id)
+        finally:
+            listen(None)
+            stop.set()
+            keeper.join()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+def jobs_path() -> Path:
+    value = os.getenv("JOBS_DB")
+    return Path(value) if value else data_path("jobs.db")
+
+
+def get_executor() -> JobExecutor:
+    """Process-wide executor over ``JOBS_DB``; unfinished jobs are resumed on first use."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            from agents.idea_refiner.server.run import run_request
+
+            workers = int(os.getenv("JOB_WORKERS", str(DEFAULT_WORKERS)))
+            _executor = JobExecutor(JobStore(jobs_path()), run_request, workers)
+            _executor.resume()
+    return _executor
@@ -0,0 +1,213 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CACHE_S = 600.0
+DEFAULT_USER_LIMIT = 5
+DEFAULT_WINDOW_S = 3600.0
+
+_service: "OnDemand | None" = None
+_lock = threading.Lock()
+
+
+class RateLimited(Exception):
+    def __init__(self, user: str, retry_after_s: float) -> None:
+        super().__init__(f"rate limit reached for {user}; retry in {retry_after_s:.0f}s")
+        self.retry_after_s = retry_after_s
+
+
+def normalize_theme(theme: str | None) -> str | None:
+    """Case- and whitespace-insensitive theme; blank means an open (unthemed) run."""
+    theme = " ".join((theme or "").split()).lower()
+    return theme or None
+
+
+def request_key(theme: str | None, params: dict | None = None) -> str:
+    return json.dumps({"theme": normalize_theme(theme), **(params or {})}, sort_keys=True)
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one execution and its result (or error)."""
+
+    def __init__(self) -> None:
+        self._calls: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key: str, fn: Callable[[], object]) -> tuple[object, bool]:
+        """Returns ``(result, shared)``; ``shared`` is True when another caller ran ``fn``."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            return call.result(), True
+        try:
+            result = fn()
+            call.set_result(result)
+            return result, False
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class ResultCache:
+    """Results kept for ``ttl_s`` seconds after their run finished."""
+
+    def __init__(self, ttl_s: float) -> None:
+        self.ttl_s = ttl_s
+        self._entries: dict[str, tuple[float, object]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> object | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def put(self, key: str, value: object) -> None:
+        if self.ttl_s <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._entries = {k: e for k, e in self._entries.items() if e[0] > now}
+            self._entries[key] = (now + self.ttl_s, value)
+
+    def __len__(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            return sum(e[0] > now for e in self._entries.values())
+
+
+class UserLimiter:
+    """At most ``limit`` requests per user in any ``window_s`` seconds (sliding window)."""
+
+    def __init__(self, limit: int, window_s: float) -> None:
+        self.limit = limit
+        self.window_s = window_s
+        self._seen: dict[str, deque[float]] = {}
+        self._next_prune = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._seen)
+
+    def _prune(self, now: float) -> None:
+        """Forget users with no request left in the window (at most once per window)."""
+        if now < self._next_prune:
+            return
+        cutoff = now - self.window_s
+        self._seen = {u: seen for u, seen in self._seen.items() if seen and seen[-1] > cutoff}
+        self._next_prune = now + self.window_s
+
+    def check(self, user: str) -> None:
+        """Count one request for ``user``; raises ``RateLimited`` when over the limit."""
+        if self.limit <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            seen = self._seen.setdefault(user, deque())
+            while seen and seen[0] <= now - self.window_s:
+                seen.popleft()
+            if len(seen) >= self.limit:
+                raise RateLimited(user, seen[0] + self.window_s - now)
+            seen.append(now)
+
+
+class OnDemand:
+    """On-demand ideas: per-user limit, then the result cache, then one run per distinct request."""
+
+    def __init__(
+        self, run: Callable[[str | None], dict], cache_s: float = DEFAULT_CACHE_S,
+        user_limit: int = DEFAULT_USER_LIMIT, window_s: float = DEFAULT_WINDOW_S,
+    ) -> None:
+        self.run = run
+        self.cache = ResultCache(cache_s)
+        self.limiter = UserLimiter(user_limit, window_s)
+        self.flights = SingleFlight()
+        self._counts = {"requests": 0, "limited": 0, "cached": 0, "coalesced": 0, "runs": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def request(self, theme: str | None, user: str) -> tuple[dict, str]:
+        """Returns ``(rendered, source)``, source being ``cache``, ``shared`` or ``run``."""
+        self._count("requests")
+        try:
+            self.limiter.check(user)
+        except RateLimited:
+            self._count("limited")
+            raise
+        theme = normalize_theme(theme)
+        key = request_key(theme)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._count("cached")
+            return cached, "cache"
+
+        def compute() -> dict:
+            # A flight that landed between the cache check and this one becoming leader.
+            landed = self.cache.get(key)
+            if landed is not None:
+                return landed
+            self._count("runs")
+            log.info("🛎️  On-demand run for theme %s", theme or "open")
+            rendered = self.run(theme)
+            self.cache.put(key, rendered)
+            return rendered
+
+        rendered, shared = self.flights.do(key, compute)
+        if shared:
+            self._count("coalesced")
+            log.info("🛎️  Joined the in-flight run for theme %s", theme or "open")
+        return rendered, "shared" if shared else "run"
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        served = counts["requests"] - counts["limited"]
+        return {
+            **counts,
+            "in_flight": self.flights.in_flight(),
+            "cached_results": len(self.cache),
+            "tracked_users": len(self.limiter),
+            "runs_per_request": round(counts["runs"] / served, 3) if served else None,
+        }
+
+
+def get_on_demand() -> OnDemand:
+    """Process-wide service, tuned by ``ON_DEMAND_CACHE_S``, ``_USER_LIMIT`` and ``_WINDOW_S``."""
+    global _service
+    with _lock:
+        if _service is None:
+            from agents.idea_refiner.server.run import render_on_demand
+
+            _service = OnDemand(
+                render_on_demand,
+                float(os.getenv("ON_DEMAND_CACHE_S", str(DEFAULT_CACHE_S))),
+                int(os.getenv("ON_DEMAND_USER_LIMIT", str(DEFAULT_USER_LIMIT))),
+                float(os.getenv("ON_DEMAND_WINDOW_S", str(DEFAULT_WINDOW_S))),
+            )
+    return _service
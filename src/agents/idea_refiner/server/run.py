@@ -0,0 +1,75 @@
+import logging
+import time
+from datetime import date
+
+from agents.idea_refiner.config import build_idea_prompt, get_idea_prompt
+from agents.idea_refiner.observability.profiling import profile_dir, profile_run
+from agents.idea_refiner.output.display import display_and_save
+from agents.idea_refiner.output.render import render_result
+from agents.idea_refiner.output.sinks import deliver_to_sinks
+from agents.idea_refiner.pipeline.events import emit
+from agents.idea_refiner.pipeline.run import build_result, run_pipeline
+from agents.idea_refiner.pool.store import get_pool
+from agents.idea_refiner.server.idempotency import (
+    get_idempotency_store,
+    idempotency_key,
+    run_once,
+)
+
+log = logging.getLogger(__name__)
+
+
+def serve_from_pool(theme: str | None = None, today: date | None = None) -> dict | None:
+    """Deliver and return a pre-generated idea for today (or ``theme``), if the pool has one."""
+    pool = get_pool()
+    entry = pool.take(today or date.today(), theme) if pool else None
+    if entry is None:
+        return None
+    rendered = entry["rendered"]
+    log.info("🧺 Serving pre-generated idea for %s (%.0fs old)", entry["for_date"], entry["age_s"])
+    emit("pool_hit", for_date=entry["for_date"], theme=entry["theme"], age_s=entry["age_s"])
+    sinks = deliver_to_sinks(rendered)
+    return {
+        **rendered["result"],
+        "sinks": sinks,
+        "pool": {"for_date": entry["for_date"], "age_s": entry["age_s"]},
+    }
+
+
+def run_request(theme: str | None = None) -> dict:
+    """One full run with output delivery; today's theme is picked when none is given.
+
+    Served from the pre-generated pool when it has an idea (``IDEA_POOL``), and
+    profiled under ``PROFILE_DIR`` when it is set.
+    """
+    today = date.today()
+    pooled = serve_from_pool(theme, today)
+    if pooled is not None:
+        return pooled
+    with profile_run(profile_dir()):
+        # A miss runs live for the same request: the requested theme, or the same day's.
+        if theme:
+            system_prompt, user_prompt = build_idea_prompt(theme)
+        else:
+            theme, system_prompt, user_prompt = get_idea_prompt(today)
+        state = run_pipeline(theme, system_prompt, user_prompt)
+        display_and_save(theme, state)
+        return build_result(theme, state)
+
+
+def render_on_demand(theme: str | None) -> dict:
+    """A run for one requester: rendered for their reply only, no output sinks."""
+    system_prompt, user_prompt = build_idea_prompt(theme)
+    state = run_pipeline(theme, system_prompt, user_prompt)
+    return render_result(theme, state, time.time() - state["start"], date.today().isoformat())
+
+
+def run_idempotent(theme: str | None = None, key: str | None = None) -> tuple[dict, bool]:
+    """``run_request`` at most once per idempotency key; returns ``(result, replayed)``.
+
+    The key defaults to today's date plus the requested theme.
+    """
+    store = get_idempotency_store()
+    if store is None:
+        return run_request(theme), False
+    return run_once(store, idempotency_key(key, theme), lambda: run_request(theme))
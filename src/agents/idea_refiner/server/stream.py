@@ -0,0 +1,71 @@
+import json
+import logging
+import queue
+import threading
+from collections.abc import Callable, Iterator
+
+from agents.idea_refiner.pipeline.events import listen
+
+log = logging.getLogger(__name__)
+
+HEARTBEAT_S = 15.0
+MIMETYPES = {"sse": "text/event-stream", "ndjson": "application/x-ndjson"}
+HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+_DONE = object()
+
+
+def stream_format(stream_arg: str | None, accept: str | None) -> str | None:
+    """Pick ``sse``/``ndjson`` from ``?stream=`` or the Accept header; None means plain JSON."""
+    if stream_arg:
+        fmt = stream_arg.strip().lower()
+        if fmt in ("1", "true", "yes"):
+            return "sse"
+        return fmt if fmt in MIMETYPES else None
+    for fmt, mimetype in MIMETYPES.items():
+        if mimetype in (accept or ""):
+            return fmt
+    return None
+
+
+def format_event(fmt: str, event: str, data: dict) -> str:
+    if fmt == "sse":
+        return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+    return json.dumps({"event": event, "data": data}, default=str) + "\n"
+
+
+def heartbeat(fmt: str) -> str:
+    return ": keep-alive\n\n" if fmt == "sse" else json.dumps({"event": "heartbeat"}) + "\n"
+
+
+def run_with_events(
+    run: Callable[[], dict], fmt: str, heartbeat_s: float = HEARTBEAT_S
+) -> Iterator[str]:
+    """Run ``run`` on a worker thread, yielding its progress events as they happen.
+
+    The last event is ``result`` (the same payload the JSON response returns) or ``error``.
+    A heartbeat goes out whenever nothing has happened for ``heartbeat_s`` so proxies keep
+    the connection open through long judge calls.
+    """
+    events: queue.Queue = queue.Queue()
+
+    def work() -> None:
+        listen(lambda event, data: events.put((event, data)))
+        try:
+            events.put(("result", run()))
+        except Exception as e:
+            log.exception("❌ Streamed run failed")
+            events.put(("error", {"error": f"{type(e).__name__}: {e}"}))
+        finally:
+            events.put(_DONE)
+
+    threading.Thread(target=work, name="stream-run", daemon=True).start()
+    while True:
+        try:
+            item = events.get(timeout=heartbeat_s)
+        except queue.Empty:
+            yield heartbeat(fmt)
+            continue
+        if item is _DONE:
+            return
+        yield format_event(fmt, *item)
@@ -0,0 +1,3 @@
+from agents.idea_refiner.subscribers.cli import main
+
+main()
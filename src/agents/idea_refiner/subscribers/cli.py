@@ -0,0 +1,46 @@
+import argparse
+from pathlib import Path
+
+from agents.idea_refiner.config import load_env
+from agents.idea_refiner.observability.logs import configure_logging
+from agents.idea_refiner.subscribers.registry import SubscriberRegistry
+from agents.idea_refiner.subscribers.schedule import DEFAULT_CONCURRENCY, deliver_to_subscribers
+
+
+def main(argv: list[str] | None = None) -> None:
+    load_env()
+    parser = argparse.ArgumentParser(
+        prog="idea-refiner-subscribers",
+        description="Manage Telegram subscribers and run the daily fan-out delivery.",
+    )
+    parser.add_argument("--db", type=Path, help="registry path (default: data dir)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    add = sub.add_parser("add", help="add or update a subscriber")
+    add.add_argument("chat_id")
+    add.add_argument("--name")
+    add.add_argument("--themes", nargs="+", metavar="THEME", help="preferred themes")
+
+    remove = sub.add_parser("remove", help="unsubscribe a chat")
+    remove.add_argument("chat_id")
+
+    sub.add_parser("list", help="list active subscribers")
+
+    run = sub.add_parser("run", help="generate once per theme and deliver to everyone")
+    run.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+
+    args = parser.parse_args(argv)
+    registry = SubscriberRegistry(args.db)
+
+    if args.command == "add":
+        registry.add(args.chat_id, args.themes, args.name)
+        print(f"✅ {args.chat_id} subscribed")
+    elif args.command == "remove":
+        print(f"{'✅' if registry.remove(args.chat_id) else '⚠️ '} {args.chat_id} unsubscribed")
+    elif args.command == "list":
+        for s in registry.active():
+            themes = ", ".join(s["themes"]) or "daily theme"
+            print(f"{s['chat_id']:<16} {s['name'] or '':<20} {themes}")
+    else:
+        configure_logging()
+        deliver_to_subscribers(registry, args.concurrency)
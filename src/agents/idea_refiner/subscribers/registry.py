@@ -0,0 +1,56 @@
+import json
+import threading
+from pathlib import Path
+
+from agents.idea_refiner.config import data_path
+from agents.idea_refiner.storage.db import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscribers (
+    chat_id    TEXT PRIMARY KEY,
+    name       TEXT,
+    themes     TEXT NOT NULL DEFAULT '[]',
+    active     INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT NOT NULL DEFAULT (datetime('now'))
+)
+"""
+
+
+class SubscriberRegistry:
+    """Telegram chats that receive the daily idea, with optional theme preferences."""
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self._conn = connect(path or data_path("subscribers.db"))
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(_SCHEMA)
+
+    def add(self, chat_id: str, themes: list[str] | None = None, name: str | None = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO subscribers (chat_id, name, themes, active) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT(chat_id) DO UPDATE SET "
+                "name = excluded.name, themes = excluded.themes, active = 1",
+                (str(chat_id), name, json.dumps(themes or [])),
+            )
+
+    def remove(self, chat_id: str) -> bool:
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE subscribers SET active = 0 WHERE chat_id = ? AND active = 1",
+                (str(chat_id),),
+            )
+        return cur.rowcount > 0
+
+    def active(self) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chat_id, name, themes FROM subscribers WHERE active = 1 ORDER BY created_at"
+            ).fetchall()
+        return [
+            {"chat_id": r["chat_id"], "name": r["name"], "themes": json.loads(r["themes"])}
+            for r in rows
+        ]
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,71 @@
+import logging
+import time
+from datetime import date, datetime
+
+from agents.idea_refiner.batch.runner import iter_runs
+from agents.idea_refiner.config import build_idea_prompt, get_idea_prompt
+from agents.idea_refiner.output.telegram import broadcast_summary
+from agents.idea_refiner.pipeline.run import run_pipeline
+from agents.idea_refiner.subscribers.registry import SubscriberRegistry
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 2
+
+
+def resolve_theme(subscriber: dict, day: date, default_theme: str | None) -> str | None:
+    """Today's theme for one subscriber: a daily rotation through their own picks, if any."""
+    themes = subscriber.get("themes") or []
+    if not themes:
+        return default_theme
+    return themes[day.toordinal() % len(themes)]
+
+
+def group_by_theme(
+    subscribers: list[dict], day: date, default_theme: str | None,
+) -> dict[str | None, list[str]]:
+    groups: dict[str | None, list[str]] = {}
+    for sub in subscribers:
+        groups.setdefault(resolve_theme(sub, day, default_theme), []).append(sub["chat_id"])
+    return groups
+
+
+def _run_theme_state(theme: str | None) -> dict:
+    return run_pipeline(theme, *build_idea_prompt(theme))
+
+
+def deliver_to_subscribers(
+    registry: SubscriberRegistry, concurrency: int = DEFAULT_CONCURRENCY,
+) -> dict:
+    """Run the pipeline once per distinct resolved theme and fan each result out.
+
+    LLM cost grows with the number of distinct themes, not with the number of
+    subscribers.
+    """
+    subscribers = registry.active()
+    default_theme = get_idea_prompt()[0]
+    groups = group_by_theme(subscribers, datetime.now().date(), default_theme)
+    log.info(
+        "👥 %d subscriber(s) → %d distinct theme(s) → %d pipeline run(s)",
+        len(subscribers), len(groups), len(groups),
+    )
+    summary = {
+        "subscribers": len(subscribers), "themes": len(groups),
+        "runs_failed": 0, "delivered": 0, "failed": 0,
+    }
+    today = datetime.now().strftime("%Y-%m-%d")
+    for theme, state, error in iter_runs(_run_theme_state, groups, concurrency):
+        if error:
+            summary["runs_failed"] += 1
+            summary["failed"] += len(groups[theme])
+            log.error("   ❌ %s — pipeline failed: %s", theme or "OPEN", error)
+            continue
+        report = broadcast_summary(
+            groups[theme], theme, state, time.time() - state["start"], today,
+        )
+        summary["delivered"] += report["delivered"]
+        summary["failed"] += report["failed"]
+    log.info(
+        "👥 Delivered to %d subscriber(s), %d failed", summary["delivered"], summary["failed"],
+    )
+    return summary
@@ -0,0 +1,3 @@
+from agents.idea_refiner.workqueue.cli import main
+
+main()
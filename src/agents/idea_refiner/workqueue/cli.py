@@ -0,0 +1,69 @@
+import argparse
+import json
+from pathlib import Path
+
+from agents.idea_refiner.batch.jsonl import append_record
+from agents.idea_refiner.config import RANDOM_THEMES, load_env
+from agents.idea_refiner.generation.models import find_model
+from agents.idea_refiner.observability.logs import configure_logging
+from agents.idea_refiner.workqueue.store import LEASE_S, MAX_ATTEMPTS, open_queue
+from agents.idea_refiner.workqueue.worker import DEFAULT_WORKERS, run_workers
+
+
+def main(argv: list[str] | None = None) -> dict:
+    load_env()
+    parser = argparse.ArgumentParser(
+        prog="idea-refiner-queue",
+        description="Durable work queue for large batch runs, drained by worker processes.",
+    )
+    parser.add_argument("--queue", help="queue location (default: $WORK_QUEUE)")
+    parser.add_argument("--backend", help="queue backend (default: $WORK_QUEUE_BACKEND or sqlite)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    enqueue = sub.add_parser("enqueue", help="add one item per theme × model")
+    enqueue.add_argument(
+        "--themes", nargs="+", metavar="THEME",
+        help="themes to run (default: every theme in RANDOM_THEMES)",
+    )
+    enqueue.add_argument(
+        "--models", nargs="+", metavar="MODEL",
+        help="pin each run to one model, e.g. gpt gemini (default: one run with all models)",
+    )
+    work = sub.add_parser("work", help="run worker processes until the queue is drained")
+    work.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    work.add_argument("--lease", type=float, default=LEASE_S, help="lease length in seconds")
+    work.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS)
+    sub.add_parser("stats", help="progress, retries, workers and throughput")
+    export = sub.add_parser("export", help="write finished items to JSONL (overwrites)")
+    export.add_argument("--out", type=Path, default=Path("ideas.jsonl"))
+    args = parser.parse_args(argv)
+
+    queue = open_queue(args.queue, args.backend)
+    if args.command == "enqueue":
+        models = [None]
+        if args.models:
+            found = {m: find_model(m) for m in args.models}
+            unknown = [m for m, model in found.items() if model is None]
+            if unknown:
+                parser.error(f"unknown model(s): {', '.join(unknown)}")
+            models = list(dict.fromkeys(model["name"] for model in found.values()))
+        added = queue.enqueue([
+            {"theme": theme, "model": model}
+            for theme in args.themes or RANDOM_THEMES for model in models
+        ])
+        stats = {"added": added, **queue.stats()}
+    elif args.command == "work":
+        configure_logging()
+        stats = run_workers(
+            args.workers, args.queue, args.backend, args.lease, args.max_attempts,
+        )
+    elif args.command == "export":
+        results = queue.results()
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        with args.out.open("w", encoding="utf-8") as f:
+            for record in results:
+                append_record(f, record)
+        stats = {"exported": len(results), "out": str(args.out)}
+    else:
+        stats = queue.stats()
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
+    return stats
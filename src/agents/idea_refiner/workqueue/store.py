@@ -0,0 +1,295 @@
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Protocol
+
+from agents.idea_refiner.config import data_path
+from agents.idea_refiner.storage.db import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS work (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    key          TEXT NOT NULL UNIQUE,
+    theme        TEXT,
+    model        TEXT,
+    status       TEXT NOT NULL DEFAULT 'pending',
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    expirations  INTEGER NOT NULL DEFAULT 0,
+    worker       TEXT,
+    lease_until  REAL,
+    created_at   REAL NOT NULL,
+    started_at   REAL,
+    finished_at  REAL,
+    result       TEXT,
+    last_error   TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_work_status ON work (status, id);
+CREATE TABLE IF NOT EXISTS workers (
+    worker      TEXT PRIMARY KEY,
+    started_at  REAL NOT NULL,
+    last_seen   REAL NOT NULL,
+    done        INTEGER NOT NULL DEFAULT 0,
+    failed      INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+LEASE_S = 300.0
+MAX_ATTEMPTS = 3
+RETRIED_SHOWN = 50
+
+
+class WorkQueue(Protocol):
+    def enqueue(self, items: list[dict]) -> int:
+        """Add ``{"theme", "model"}`` items; returns how many were new (duplicates are ignored)."""
+
+    def claim(self, worker: str, lease_s: float, max_attempts: int) -> dict | None:
+        """Lease the oldest pending item to ``worker``, or None when nothing is pending.
+
+        Leases that expired (their worker died) are put back first, or marked dead once
+        they've used up ``max_attempts``.
+        """
+
+    def heartbeat(self, item_id: int, worker: str, lease_s: float) -> bool:
+        """Extend ``worker``'s lease; False once the lease was lost to another worker."""
+
+    def complete(self, item_id: int, worker: str, result: dict) -> bool: ...
+
+    def fail(self, item_id: int, worker: str, error: str, max_attempts: int) -> str:
+        """Put the item back (``pending``) or give up on it (``dead``); returns which, or
+        ``lost`` when ``worker`` no longer holds the lease."""
+
+    def outstanding(self) -> int:
+        """Items pending or leased, i.e. still to be finished by someone."""
+
+    def results(self) -> list[dict]: ...
+
+    def stats(self, lease_s: float = LEASE_S) -> dict: ...
+
+
+def item_key(theme: str | None, model: str | None) -> str:
+    return f"{theme or ''}|{model or ''}"
+
+
+class SqliteWorkQueue:
+    """Work items in a SQLite file; every worker process opens its own connection."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._conn = connect(path)
+        self._conn.isolation_level = None
+        # A worker's heartbeat thread shares its connection.
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+
+    def _write(self, fn: Callable[[], object]) -> object:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                out = fn()
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return out
+
+    def _seen(self, worker: str, now: float, done: int = 0, failed: int = 0) -> None:
+        self._conn.execute(
+            "INSERT INTO workers (worker, started_at, last_seen, done, failed) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT (worker) DO UPDATE SET "
+            "last_seen = excluded.last_seen, done = done + excluded.done, "
+            "failed = failed + excluded.failed",
+            (worker, now, now, done, failed),
+        )
+
+    def enqueue(self, items: list[dict]) -> int:
+        now = time.time()
+
+        def add() -> int:
+            added = 0
+            for item in items:
+                theme, model = item.get("theme"), item.get("model")
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO work (key, theme, model, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (item_key(theme, model), theme, model, now),
+                )
+                added += cur.rowcount
+            return added
+
+        return self._write(add)
+
+    def _requeue_expired(self, now: float, max_attempts: int) -> None:
+        self._conn.execute(
+            "UPDATE work SET status = 'dead', worker = NULL, lease_until = NULL, "
+            "finished_at = ?, expirations = expirations + 1, "
+            "last_error = 'lease expired on its last attempt' "
+            "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+            (now, now, max_attempts),
+        )
+        self._conn.execute(
+            "UPDATE work SET status = 'pending', worker = NULL, lease_until = NULL, "
+            "expirations = expirations + 1, last_error = 'lease expired' "
+            "WHERE status = 'leased' AND lease_until < ?",
+            (now,),
+        )
+
+    def claim(self, worker: str, lease_s: float, max_attempts: int) -> dict | None:
+        now = time.time()
+
+        def take() -> dict | None:
+            self._requeue_expired(now, max_attempts)
+            self._seen(worker, now)
+            row = self._conn.execute(
+                "UPDATE work SET status = 'leased', worker = ?, lease_until = ?, "
+                "attempts = attempts + 1, started_at = COALESCE(started_at, ?) "
+                "WHERE id = (SELECT id FROM work WHERE status = 'pending' ORDER BY id LIMIT 1) "
+                "RETURNING id, theme, model, attempts",
+                (worker, now + lease_s, now),
+            ).fetchone()
+            return dict(row) if row else None
+
+        return self._write(take)
+
+    def heartbeat(self, item_id: int, worker: str, lease_s: float) -> bool:
+        now = time.time()
+
+        def renew() -> bool:
+            self._seen(worker, now)
+            cur = self._conn.execute(
+                "UPDATE work SET lease_until = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (now + lease_s, item_id, worker),
+            )
+            return cur.rowcount > 0
+
+        return self._write(renew)
+
+    def complete(self, item_id: int, worker: str, result: dict) -> bool:
+        now = time.time()
+
+        def finish() -> bool:
+            cur = self._conn.execute(
+                "UPDATE work SET status = 'done', worker = NULL, lease_until = NULL, "
+                "finished_at = ?, result = ?, last_error = NULL "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (now, json.dumps(result, ensure_ascii=False), item_id, worker),
+            )
+            self._seen(worker, now, done=cur.rowcount)
+            return cur.rowcount > 0
+
+        return self._write(finish)
+
+    def fail(self, item_id: int, worker: str, error: str, max_attempts: int) -> str:
+        now = time.time()
+
+        def release() -> str:
+            row = self._conn.execute(
+                "SELECT attempts FROM work WHERE id = ? AND worker = ? AND status = 'leased'",
+                (item_id, worker),
+            ).fetchone()
+            if row is None:
+                return "lost"
+            status = "dead" if row["attempts"] >= max_attempts else "pending"
+            self._conn.execute(
+                "UPDATE work SET status = ?, worker = NULL, lease_until = NULL, "
+                "finished_at = CASE WHEN ? = 'dead' THEN ? END, last_error = ? WHERE id = ?",
+                (status, status, now, error, item_id),
+            )
+            self._seen(worker, now, failed=1)
+            return status
+
+        return self._write(release)
+
+    def outstanding(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM work WHERE status IN ('pending', 'leased')"
+            ).fetchone()[0]
+
+    def results(self) -> list[dict]:
+        """Finished items in queue order: each done item's result, or the error of a dead one."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT theme, model, status, attempts, result, last_error FROM work "
+                "WHERE status IN ('done', 'dead') ORDER BY id"
+            ).fetchall()
+        out = []
+        for r in rows:
+            if r["status"] == "done":
+                result = json.loads(r["result"])
+                out.append({**result, "model": r["model"], "attempts": r["attempts"]})
+            else:
+                out.append({
+                    "theme": r["theme"], "model": r["model"],
+                    "attempts": r["attempts"], "error": r["last_error"],
+                })
+        return out
+
+    def stats(self, lease_s: float = LEASE_S) -> dict:
+        """Progress, retries, worker count and throughput, for the CLI."""
+        now = time.time()
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM work GROUP BY status"
+            ).fetchall())
+            totals = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(MAX(attempts - 1, 0)), 0), "
+                "COALESCE(SUM(expirations), 0), MIN(started_at), MAX(finished_at) FROM work"
+            ).fetchone()
+            retried = [dict(r) for r in self._conn.execute(
+                "SELECT theme, model, status, attempts, expirations, last_error FROM work "
+                "WHERE attempts > 1 OR expirations > 0 ORDER BY attempts DESC, id LIMIT ?",
+                (RETRIED_SHOWN,),
+            )]
+            workers = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(last_seen >= ?), 0) FROM workers",
+                (now - lease_s,),
+            ).fetchone()
+        first, last = totals[3], totals[4]
+        elapsed = (last - first) if first and last else 0.0
+        return {
+            "total": totals[0],
+            "pending": counts.get("pending", 0),
+            "leased": counts.get("leased", 0),
+            "done": counts.get("done", 0),
+            "dead": counts.get("dead", 0),
+            "retries": totals[1],
+            "expired_leases": totals[2],
+            "retried": retried,
+            "workers_seen": workers[0],
+            "workers_active": workers[1],
+            "elapsed_seconds": round(elapsed, 1),
+            "items_per_min": round(counts.get("done", 0) / elapsed * 60, 2) if elapsed else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+BACKENDS: dict[str, Callable[[str], WorkQueue]] = {
+    "sqlite": SqliteWorkQueue,
+}
+
+
+def register_backend(name: str, factory: Callable[[str], WorkQueue]) -> None:
+    BACKENDS[name] = factory
+
+
+def queue_location() -> str:
+    return os.getenv("WORK_QUEUE") or str(data_path("work_queue.db"))
+
+
+def open_queue(location: str | None = None, backend: str | None = None) -> WorkQueue:
+    """Open the ``WORK_QUEUE_BACKEND`` queue (default sqlite) at ``location``.
+
+    Each process opens its own; nothing is shared in memory between workers.
+    """
+    name = (backend or os.getenv("WORK_QUEUE_BACKEND", "sqlite")).strip().lower()
+    if name not in BACKENDS:
+        raise ValueError(f"unknown work queue backend {name!r}")
+    return BACKENDS[name](location or queue_location())
@@ -0,0 +1,162 @@
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import Counter
+from collections.abc import Callable
+
+from agents.idea_refiner.config import load_env
+from agents.idea_refiner.generation.models import find_model
+from agents.idea_refiner.observability.logs import configure_logging
+from agents.idea_refiner.pipeline.run import run_theme
+from agents.idea_refiner.workqueue.store import LEASE_S, MAX_ATTEMPTS, WorkQueue, open_queue
+
+log = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+POLL_S = 5.0
+
+
+def run_item(item: dict) -> dict:
+    """Run the pipeline for one queue item, pinned to its model when it names one."""
+    models = None
+    if item.get("model"):
+        model = find_model(item["model"])
+        if model is None:
+            raise ValueError(f"unknown model {item['model']!r}")
+        models = [model]
+    return run_theme(item["theme"], models)
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def _describe(item: dict) -> str:
+    return f"{item['theme'] or 'open'} × {item['model'] or 'all models'}"
+
+
+class QueueWorker:
+    """Claims items one at a time and runs them, heartbeating the lease while each runs."""
+
+    def __init__(
+        self, queue: WorkQueue, run: Callable[[dict], dict] = run_item,
+        lease_s: float = LEASE_S, max_attempts: int = MAX_ATTEMPTS,
+        poll_s: float = POLL_S, name: str | None = None,
+    ) -> None:
+        self.queue = queue
+        self._run = run
+        self.lease_s = lease_s
+        self.max_attempts = max_attempts
+        self.poll_s = poll_s
+        self.name = name or worker_name()
+
+    def process(self, item: dict) -> str:
+        """Run one claimed item; returns ``done``, ``pending`` (retry), ``dead`` or ``lost``."""
+        stop = threading.Event()
+
+        def heartbeat() -> None:
+            while not stop.wait(self.lease_s / 3):
+                if not self.queue.heartbeat(item["id"], self.name, self.lease_s):
+                    log.warning("⚠️  %s lost the lease on %s", self.name, _describe(item))
+                    return
+
+        keeper = threading.Thread(target=heartbeat, name="queue-lease", daemon=True)
+        keeper.start()
+        try:
+            result = self._run(item)
+        except Exception as e:  # noqa: BLE001
+            status = self.queue.fail(
+                item["id"], self.name, f"{type(e).__name__}: {e}", self.max_attempts,
+            )
+            log.error(
+                "   ❌ %s (attempt %d) — %s; %s", _describe(item), item["attempts"], e,
+                "giving up" if status == "dead" else "re-queued",
+            )
+        else:
+            status = "done" if self.queue.complete(item["id"], self.name, result) else "lost"
+            log.info(
+                "   ✅ %s (attempt %d)%s", _describe(item), item["attempts"],
+                "" if status == "done" else " — lease lost, result dropped",
+            )
+        finally:
+            stop.set()
+            keeper.join()
+        return status
+
+    def work(self) -> dict:
+        """Process items until none are pending or leased to anyone; returns outcome counts.
+
+        While other workers still hold leases this keeps polling, so it picks up their
+        items if they die and the leases expire.
+        """
+        counts = Counter()
+        log.info("👷 Worker %s started", self.name)
+        while True:
+            item = self.queue.claim(self.name, self.lease_s, self.max_attempts)
+            if item is None:
+                if not self.queue.outstanding():
+                    break
+                time.sleep(self.poll_s)
+                continue
+            counts[self.process(item)] += 1
+        log.info("👷 Worker %s done: %s", self.name, dict(counts) or "nothing to do")
+        return dict(counts)
+
+
+def _worker_process(
+    location: str | None, backend: str | None, lease_s: float, max_attempts: int,
+    run: Callable[[dict], dict],
+) -> None:
+    load_env()
+    configure_logging()
+    QueueWorker(open_queue(location, backend), run, lease_s, max_attempts).work()
+
+
+def run_workers(
+    workers: int = DEFAULT_WORKERS, location: str | None = None, backend: str | None = None,
+    lease_s: float = LEASE_S, max_attempts: int = MAX_ATTEMPTS,
+    run: Callable[[dict], dict] = run_item,
+) -> dict:
+    """Drain the queue with ``workers`` processes; returns the queue's stats plus this session's.
+
+    Workers on other machines can pull from the same queue at the same time.
+    """
+    queue = open_queue(location, backend)
+    done_before = queue.stats(lease_s)["done"]
+    log.info("👷 Starting %d worker process(es), %d item(s) outstanding",
+             workers, queue.outstanding())
+    ctx = multiprocessing.get_context("spawn")
+    procs = [
+        ctx.Process(
+            target=_worker_process, name=f"queue-worker-{i}",
+            args=(location, backend, lease_s, max_attempts, run),
+        )
+        for i in range(workers)
+    ]
+    start = time.time()
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    elapsed = time.time() - start
+
+    stats = queue.stats(lease_s)
+    done = stats["done"] - done_before
+    stats["session"] = {
+        "workers": workers,
+        "crashed_workers": sum(p.exitcode != 0 for p in procs),
+        "done": done,
+        "elapsed_seconds": round(elapsed, 1),
+        "items_per_min": round(done / elapsed * 60, 2) if elapsed else 0.0,
+    }
+    log.info(
+        "👷 Queue session done: %d item(s) in %.1fs with %d worker(s) (%.2f items/min); "
+        "%d pending, %d dead, %d retries, %d expired lease(s)",
+        done, elapsed, workers, stats["session"]["items_per_min"],
+        stats["pending"], stats["dead"], stats["retries"], stats["expired_leases"],
+    )
+    return stats
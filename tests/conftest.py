@@ -1,7 +1,12 @@
+import importlib.util
 import time
+from pathlib import Path
 
 import pytest
 
+from agents.idea_refiner.output.telegram_client import close_telegram_clients
+from tests.fake_telegram import FakeBotApi
+
 
 @pytest.fixture()
 def fake_verdict_accept():
@@ -96,3 +101,36 @@ def populated_state(pipeline_state):
     return pipeline_state
 
 
+
+
+@pytest.fixture()
+def telegram_api(monkeypatch):
+    """A local Bot API server, with the bot token and chat pointed at it."""
+    server = FakeBotApi().start()
+    monkeypatch.setenv("TELEGRAM_API_URL", server.url)
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test-token")
+    monkeypatch.setenv("TELEGRAM_CHAT_ID", "12345")
+    yield server
+    close_telegram_clients()
+    server.stop()
+
+
+@pytest.fixture()
+def progress_events():
+    """Collect pipeline progress events emitted in this test as ``(event, data)`` pairs."""
+    from agents.idea_refiner.pipeline.events import _listener, listen
+
+    events = []
+    token = listen(lambda event, data: events.append((event, data)))
+    yield events
+    _listener.reset(token)
+
+
+@pytest.fixture(scope="session")
+def handler_module():
+    """The Cloud Run entry point (root ``main.py``), loaded as a module."""
+    path = Path(__file__).resolve().parent.parent / "main.py"
+    spec = importlib.util.spec_from_file_location("cloud_main", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,120 @@
+"""A local stand-in for the Telegram Bot API, for delivery tests without the network."""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+ALLOWED_TAGS = {"b", "i", "u", "s", "code", "pre", "a"}
+_TAG = re.compile(r"<(/?)([a-zA-Z]+)[^>]*>")
+
+
+def html_error(text: str) -> str | None:
+    """Why Telegram would refuse to parse ``text`` as HTML, or None when it is valid."""
+    stack = []
+    for m in _TAG.finditer(text):
+        closing, name = m.group(1), m.group(2)
+        if name not in ALLOWED_TAGS:
+            return f"unsupported start tag \"{name}\""
+        if not closing:
+            stack.append(name)
+        elif not stack or stack.pop() != name:
+            return f"unmatched end tag \"{name}\""
+    if stack:
+        return f"can't find end tag corresponding to start tag \"{stack[-1]}\""
+    stripped = _TAG.sub("", text)
+    if "<" in stripped or ">" in stripped:
+        return "unexpected angle bracket"
+    if re.search(r"&(?!(amp|lt|gt|quot);)", stripped):
+        return "unsupported entity"
+    return None
+
+
+class FakeBotApi(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.sent: list[dict] = []
+        self.requests = 0
+        self.failures: list[tuple[int, dict] | None] = []
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def fail_next(self, status: int, times: int = 1, after: int = 0, **parameters) -> None:
+        """Answer the next ``times`` sendMessage calls (once ``after`` more went through)
+        with an error instead."""
+        self.failures.extend([None] * after + [(status, parameters)] * times)
+
+    def start(self) -> "FakeBotApi":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeBotApi
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _reply(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: int, description: str, **parameters) -> None:
+        body = {"ok": False, "error_code": status, "description": description}
+        if parameters:
+            body["parameters"] = parameters
+        self._reply(status, body)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length).decode()
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            params = json.loads(raw or "{}")
+        else:
+            params = {k: v[0] for k, v in parse_qs(raw).items()}
+        method = self.path.rsplit("/", 1)[-1]
+        if method != "sendMessage":
+            return self._error(404, "Not Found: method not found")
+
+        server = self.server
+        with server._lock:
+            server.requests += 1
+            failure = server.failures.pop(0) if server.failures else None
+        if failure:
+            status, parameters = failure
+            return self._error(status, f"Error {status}", **parameters)
+
+        text = params.get("text", "")
+        if len(text) > 4096:
+            return self._error(400, "Bad Request: message is too long")
+        if params.get("parse_mode") == "HTML" and (why := html_error(text)):
+            return self._error(400, f"Bad Request: can't parse entities: {why}")
+        if params.get("chat_id", "").startswith("blocked"):
+            return self._error(403, "Forbidden: bot was blocked by the user")
+
+        with server._lock:
+            server.sent.append(params)
+            message_id = len(server.sent)
+        self._reply(200, {"ok": True, "result": {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": int(params["chat_id"]) if params["chat_id"].isdigit() else 1,
+                     "type": "private"},
+            "text": text,
+        }})
@@ -0,0 +1,152 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from agents.idea_refiner.archive.queries import (
+    acceptance_rates,
+    latency_percentiles,
+    percentile,
+    top_ideas,
+)
+from agents.idea_refiner.archive.record import build_run_record
+from agents.idea_refiner.archive.writer import ArchiveWriter, open_archive
+from agents.idea_refiner.pipeline.run import run_pipeline
+
+
+def _ev(label, acq, dem, bld):
+    return {"idea_label": label, "acquisition_score": acq, "demand_score": dem,
+            "build_score": bld, "explanation": f"{label} explained"}
+
+
+def _lane(model, idea, latency=1.0):
+    return {"model": model, "attempt": 1, "latency_s": latency, "ok": True, "kept": False,
+            "idea": idea}
+
+
+def _finished_state(run_id, theme_accepts=True):
+    second_verdict = "accept" if theme_accepts else "reject_all"
+    return {
+        "run_id": run_id,
+        "start": time.time(),
+        "rounds": 2,
+        "attempts": {"A": 2, "B": 2},
+        "winner_label": "A",
+        "winning_idea": "**Product Name:** Winner",
+        "meter": {"llm_calls": 6, "prompt_tokens": 100, "completion_tokens": 50,
+                  "total_tokens": 150, "rate_limit_wait_s": 0.5},
+        "history": [
+            {"round": 1, "verdict": "reject_all", "gate_override": True, "judge_latency_s": 3.0,
+             "lanes": {"A": _lane("GPT-5.2 (OpenAI)", "**Product Name:** First"),
+                       "B": _lane("Gemini 3.1 Pro", "**Product Name:** Other")},
+             "evaluations": [_ev("A", 6, 6, 6), _ev("B", 5, 5, 5)],
+             "feedback": {"A": "meh", "B": "bad"}},
+            {"round": 2, "verdict": second_verdict, "judge_latency_s": 2.0,
+             "lanes": {"A": _lane("GPT-5.2 (OpenAI)", "**Product Name:** Winner"),
+                       "B": _lane("Gemini 3.1 Pro", "**Product Name:** Loser")},
+             "evaluations": [_ev("A", 9, 9, 10), _ev("B", 7, 7, 7)],
+             "feedback": {}},
+        ],
+        "calls": [
+            {"provider": "openai", "model": "gpt-5.2", "status": 200, "started_at": 0.0,
+             "latency_s": lat, "wait_s": 0.0, "prompt_tokens": 10, "completion_tokens": 5,
+             "total_tokens": 15}
+            for lat in (1.0, 2.0, 3.0, 4.0)
+        ],
+    }
+
+
+@pytest.fixture()
+def archive(tmp_path):
+    writer = ArchiveWriter(tmp_path / "runs.db")
+    yield writer
+    writer.close()
+
+
+class TestRunRecord:
+    def test_flattens_every_table(self):
+        record = build_run_record("pets", _finished_state("r1"), 12.0)
+        assert record["runs"][0][0] == "r1"
+        assert record["runs"][0][5] == 1  # accepted
+        assert len(record["rounds"]) == 2
+        assert len(record["ideas"]) == 4
+        assert len(record["evaluations"]) == 4
+        assert len(record["lanes"]) == 2
+        assert len(record["llm_calls"]) == 4
+
+    def test_evaluations_credit_the_model_of_each_round(self):
+        state = _finished_state("r1")
+        state["history"][0]["lanes"]["A"]["model"] = "Gemini 3.1 Pro"  # promoted after round 1
+        record = build_run_record("pets", state, 1.0)
+        models = {(row[1], row[2]): row[3] for row in record["evaluations"]}
+        assert models[(1, "A")] == "Gemini 3.1 Pro"
+        assert models[(2, "A")] == "GPT-5.2 (OpenAI)"
+
+    def test_fallback_winner_is_not_accepted(self):
+        record = build_run_record("pets", _finished_state("r1", theme_accepts=False), 1.0)
+        assert record["runs"][0][5] == 0
+
+
+class TestArchiveWriter:
+    def test_writes_in_background_and_queries(self, archive):
+        archive.submit(build_run_record("pets", _finished_state("r1"), 10.0))
+        archive.submit(build_run_record("pets", _finished_state("r2", False), 10.0))
+        archive.submit(build_run_record("taxes", _finished_state("r3"), 10.0))
+        archive.flush()
+        conn = open_archive(archive.path)
+
+        top = top_ideas(conn, limit=2)
+        assert [t["title"] for t in top] == ["Winner", "Winner"]
+        assert top[0]["total"] == 28
+
+        by_theme = {r["key"]: r for r in acceptance_rates(conn, "theme")}
+        assert by_theme["pets"]["rate"] == 0.5
+        assert by_theme["taxes"]["rate"] == 1.0
+
+        by_model = {r["key"]: r for r in acceptance_rates(conn, "model")}
+        assert by_model["GPT-5.2 (OpenAI)"]["accepted"] == 2
+        assert by_model["Gemini 3.1 Pro"]["accepted"] == 0
+
+        (lat,) = latency_percentiles(conn, "model")
+        assert lat["key"] == "gpt-5.2"
+        assert lat["n"] == 12
+        assert lat["p50"] == 2.5
+
+    def test_top_ideas_filters(self, archive):
+        archive.submit(build_run_record("pets", _finished_state("r1"), 10.0))
+        archive.flush()
+        conn = open_archive(archive.path)
+        assert top_ideas(conn, theme="taxes") == []
+        assert top_ideas(conn, since="2999-01-01") == []
+
+    def test_rewriting_a_run_is_idempotent(self, archive):
+        record = build_run_record("pets", _finished_state("r1"), 10.0)
+        archive.submit(record)
+        archive.submit(record)
+        archive.flush()
+        conn = open_archive(archive.path)
+        assert conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(*) FROM ideas").fetchone()[0] == 4
+
+    def test_bad_grouping_raises(self, archive):
+        with pytest.raises(ValueError):
+            acceptance_rates(open_archive(archive.path), "weather")
+
+
+class TestPercentile:
+    def test_interpolates(self):
+        assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+        assert percentile([1.0], 99) == 1.0
+        assert percentile([], 50) is None
+
+
+class TestRunPipelineArchiving:
+    @patch("agents.idea_refiner.pipeline.run.get_writer")
+    @patch("agents.idea_refiner.pipeline.run.run_round", return_value=True)
+    @patch("agents.idea_refiner.pipeline.state.get_client")
+    def test_finished_run_is_submitted(self, mock_client, mock_round, mock_writer):
+        writer = MagicMock()
+        mock_writer.return_value = writer
+        state = run_pipeline("pets", "sys", "usr")
+        (record,), _ = writer.submit.call_args
+        assert record["runs"][0][0] == state["run_id"]
@@ -0,0 +1,106 @@
+import json
+import threading
+import time
+from unittest.mock import patch
+
+from agents.idea_refiner.batch.jsonl import append_record, completed_themes, open_for_append
+from agents.idea_refiner.batch.runner import iter_runs, run_batch
+
+
+def _fake_result(theme):
+    return {
+        "theme": theme,
+        "winning_idea": f"idea for {theme}",
+        "winner_label": "A",
+        "evaluations": [],
+        "rounds": 1,
+        "usage": {"total_tokens": 100},
+        "elapsed_seconds": 0.0,
+    }
+
+
+class TestJsonl:
+    def test_completed_themes_missing_file(self, tmp_path):
+        assert completed_themes(tmp_path / "nope.jsonl") == set()
+
+    def test_completed_themes_ignores_errors_and_partial_lines(self, tmp_path):
+        path = tmp_path / "out.jsonl"
+        path.write_text(
+            json.dumps({"theme": "pets"}) + "\n"
+            + json.dumps({"theme": "taxes", "error": "boom"}) + "\n"
+            + '{"theme": "sle'
+        )
+        assert completed_themes(path) == {"pets"}
+
+    def test_append_after_partial_line_starts_new_line(self, tmp_path):
+        path = tmp_path / "out.jsonl"
+        path.write_text('{"theme": "sle')
+        with open_for_append(path) as f:
+            append_record(f, {"theme": "sleep"})
+        assert completed_themes(path) == {"sleep"}
+
+
+class TestIterRuns:
+    def test_yields_results_and_errors(self):
+        def fn(x):
+            if x == 2:
+                raise RuntimeError("bad")
+            return x * 10
+
+        results = {item: (res, err) for item, res, err in iter_runs(fn, [1, 2, 3], 2)}
+        assert results[1] == (10, None)
+        assert results[3] == (30, None)
+        assert isinstance(results[2][1], RuntimeError)
+
+    def test_respects_concurrency_limit(self):
+        lock = threading.Lock()
+        running = peak = 0
+
+        def fn(_):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.01)
+            with lock:
+                running -= 1
+
+        list(iter_runs(fn, range(12), 3))
+        assert peak <= 3
+
+
+class TestRunBatch:
+    @patch("agents.idea_refiner.batch.runner.run_theme", side_effect=_fake_result)
+    def test_streams_one_record_per_theme(self, mock_run, tmp_path):
+        out = tmp_path / "ideas.jsonl"
+        stats = run_batch(["pets", "taxes", "pets"], out, concurrency=2)
+
+        records = [json.loads(line) for line in out.read_text().splitlines()]
+        assert sorted(r["theme"] for r in records) == ["pets", "taxes"]
+        assert stats["completed"] == 2
+        assert stats["total_tokens"] == 200
+        assert "runs_per_min" in stats and "tokens_per_s" in stats
+
+    @patch("agents.idea_refiner.batch.runner.run_theme", side_effect=_fake_result)
+    def test_resume_skips_completed_themes(self, mock_run, tmp_path):
+        out = tmp_path / "ideas.jsonl"
+        out.write_text(json.dumps(_fake_result("pets")) + "\n")
+
+        stats = run_batch(["pets", "taxes"], out)
+
+        assert stats["skipped"] == 1
+        mock_run.assert_called_once_with("taxes")
+
+    @patch("agents.idea_refiner.batch.runner.run_theme", side_effect=RuntimeError("API down"))
+    def test_failed_runs_recorded_and_retried_on_resume(self, mock_run, tmp_path):
+        out = tmp_path / "ideas.jsonl"
+        stats = run_batch(["pets"], out)
+        assert stats["failed"] == 1
+        assert json.loads(out.read_text())["error"] == "API down"
+        assert completed_themes(out) == set()
+
+    @patch("agents.idea_refiner.batch.runner.set_provider_limit")
+    @patch("agents.idea_refiner.batch.runner.run_theme", side_effect=_fake_result)
+    def test_applies_provider_limits(self, mock_run, mock_limit, tmp_path):
+        run_batch(["pets"], tmp_path / "o.jsonl", provider_limits={"openai": 2})
+        mock_limit.assert_called_once_with("openai", 2)
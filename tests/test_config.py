@@ -5,6 +5,7 @@ from agents.idea_refiner.config import (
     IDEA_USER_TEMPLATE,
     MAX_RETRIES,
     RANDOM_THEMES,
+    build_idea_prompt,
     get_idea_prompt,
 )
 
@@ -46,3 +47,14 @@ class TestGetIdeaPrompt:
         theme, _, user = get_idea_prompt()
         assert theme is None
         assert "TODAY'S FOCUS" not in user
+
+
+class TestBuildIdeaPrompt:
+    def test_theme_section_included(self):
+        system, user = build_idea_prompt("pet owners")
+        assert system == IDEA_SYSTEM_PROMPT
+        assert "TODAY'S FOCUS: pet owners" in user
+
+    def test_no_theme(self):
+        _, user = build_idea_prompt(None)
+        assert "TODAY'S FOCUS" not in user
@@ -1,10 +1,24 @@
+import json
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
+import httpx
+
 from agents.idea_refiner.generation.prompt import build_feedback_message, build_initial_messages
 from agents.idea_refiner.generation.models import LABELS, MODELS, get_model
 from agents.idea_refiner.generation.gpt52 import generate_gpt52
 from agents.idea_refiner.generation.gemini import generate_gemini
 from agents.idea_refiner.generation.runner import generate_parallel
+from agents.idea_refiner.generation.metering import current_meter, start_call_log, start_meter
+from agents.idea_refiner.generation.ratelimit import (
+    RateLimiter,
+    TokenBucket,
+    estimate_tokens,
+    parse_duration,
+    set_rate_limits,
+)
+from agents.idea_refiner.generation.transport import ProviderTransport, set_provider_limit
 
 from tests.helpers import make_chat_response
 
@@ -116,3 +130,207 @@ class TestRunner:
     def test_generate_parallel_empty_tasks(self):
         results = generate_parallel([])
         assert results == []
+
+
+def _usage_handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(
+        200, json={"usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}},
+    )
+
+
+class TestMetering:
+    def test_start_meter_attaches_to_context(self):
+        meter = start_meter()
+        assert current_meter() is meter
+        assert meter["total_tokens"] == 0
+
+
+class TestProviderTransport:
+    def test_records_usage_into_current_meter(self):
+        meter = start_meter()
+        client = httpx.Client(transport=ProviderTransport("x", httpx.MockTransport(_usage_handler)))
+
+        resp = client.post("http://llm.test/v1/chat/completions", json={})
+
+        assert resp.json()["usage"]["total_tokens"] == 15
+        assert meter["llm_calls"] == 1
+        assert meter["prompt_tokens"] == 10
+        assert meter["total_tokens"] == 15
+
+    def test_logs_each_call_with_model_and_latency(self):
+        calls = start_call_log()
+        client = httpx.Client(transport=ProviderTransport("x", httpx.MockTransport(_usage_handler)))
+        client.post("http://llm.test/v1/chat/completions", json={"model": "gpt-5.2"})
+        (call,) = calls
+        assert call["provider"] == "x"
+        assert call["model"] == "gpt-5.2"
+        assert call["status"] == 200
+        assert call["total_tokens"] == 15
+        assert call["latency_s"] >= 0
+
+    def test_feeds_latency_and_token_metrics(self):
+        from agents.idea_refiner.observability import metrics
+
+        client = httpx.Client(
+            transport=ProviderTransport("metrics-test", httpx.MockTransport(_usage_handler)),
+        )
+        client.post("http://llm.test/v1/chat/completions", json={"model": "gpt-5.2"})
+        assert metrics.LLM_CALLS.labels("metrics-test", 200).value() == 1
+        _, latency_sum = metrics.LLM_LATENCY.labels("metrics-test", "gpt-5.2").snapshot()
+        assert latency_sum >= 0
+        counts, total = metrics.LLM_TOKENS.labels("metrics-test", "prompt").snapshot()
+        assert (sum(counts), total) == (1, 10)
+
+    def test_non_json_response_counts_call_without_tokens(self):
+        meter = start_meter()
+        transport = ProviderTransport(
+            "x", httpx.MockTransport(lambda r: httpx.Response(500, text="oops")),
+        )
+        httpx.Client(transport=transport).get("http://llm.test/")
+        assert meter["llm_calls"] == 1
+        assert meter["total_tokens"] == 0
+
+    def test_provider_limit_caps_in_flight_requests(self):
+        lock = threading.Lock()
+        running = peak = 0
+
+        def handler(request):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return httpx.Response(200, content=json.dumps({}).encode())
+
+        set_provider_limit("limited", 2)
+        try:
+            transport = ProviderTransport("limited", httpx.MockTransport(handler))
+            client = httpx.Client(transport=transport)
+            threads = [
+                threading.Thread(target=client.get, args=("http://llm.test/",)) for _ in range(6)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            set_provider_limit("limited", None)
+        assert peak == 2
+
+
+    def test_sdk_request_goes_through_the_transport(self):
+        from openai import DefaultHttpxClient, OpenAI
+
+        def handler(request):
+            return httpx.Response(200, json={
+                "id": "chatcmpl-1", "object": "chat.completion", "created": 0,
+                "model": "gpt-5.2",
+                "choices": [{
+                    "index": 0, "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": "**Product Name:** Mocked"},
+                }],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+            })
+
+        calls = start_call_log()
+        transport = ProviderTransport("sdk-test", httpx.MockTransport(handler))
+        client = OpenAI(
+            api_key="test", base_url="http://llm.test/v1",
+            http_client=DefaultHttpxClient(transport=transport),
+        )
+        resp = client.chat.completions.create(
+            model="gpt-5.2", messages=[{"role": "user", "content": "idea please"}],
+        )
+        assert resp.choices[0].message.content == "**Product Name:** Mocked"
+        (call,) = calls
+        assert (call["provider"], call["model"], call["total_tokens"]) == ("sdk-test", "gpt-5.2", 15)
+
+
+class TestTokenBucket:
+    @patch("agents.idea_refiner.generation.ratelimit.time")
+    def test_full_bucket_admits_immediately(self, mock_time):
+        mock_time.monotonic.return_value = 0.0
+        bucket = TokenBucket(per_minute=60)
+        assert bucket.reserve(60) == 0.0
+
+    @patch("agents.idea_refiner.generation.ratelimit.time")
+    def test_overdraft_returns_wait_in_arrival_order(self, mock_time):
+        mock_time.monotonic.return_value = 0.0
+        bucket = TokenBucket(per_minute=60)  # 1 token / second
+        bucket.reserve(60)
+        assert bucket.reserve(1) == 1.0
+        assert bucket.reserve(1) == 2.0
+
+    @patch("agents.idea_refiner.generation.ratelimit.time")
+    def test_refills_over_time(self, mock_time):
+        mock_time.monotonic.return_value = 0.0
+        bucket = TokenBucket(per_minute=60)
+        bucket.reserve(60)
+        mock_time.monotonic.return_value = 5.0
+        assert bucket.reserve(5) == 0.0
+
+    @patch("agents.idea_refiner.generation.ratelimit.time")
+    def test_clamp_and_adjust(self, mock_time):
+        mock_time.monotonic.return_value = 0.0
+        bucket = TokenBucket(per_minute=600)
+        bucket.clamp(0)
+        assert bucket.reserve(10) == 1.0
+        bucket.adjust(20)
+        assert bucket.reserve(0) == 0.0
+
+
+class TestRateLimiter:
+    def test_parse_duration(self):
+        assert parse_duration("2") == 2.0
+        assert parse_duration("1.5s") == 1.5
+        assert parse_duration("6m0s") == 360.0
+        assert parse_duration("20ms") == 0.02
+        assert parse_duration("soon") is None
+
+    def test_estimate_tokens(self):
+        body = json.dumps({"messages": [{"content": "x" * 400}], "max_tokens": 100}).encode()
+        assert estimate_tokens(body) == 200
+
+    @patch("agents.idea_refiner.generation.ratelimit.time")
+    def test_429_retry_after_pauses_admission(self, mock_time):
+        mock_time.monotonic.return_value = 10.0
+        limiter = RateLimiter(rpm=600)
+        limiter.observe(429, {"retry-after": "3"})
+        limiter.acquire(0)
+        mock_time.sleep.assert_called_once_with(3.0)
+
+    @patch("agents.idea_refiner.generation.ratelimit.time")
+    def test_remaining_header_clamps_bucket(self, mock_time):
+        mock_time.monotonic.return_value = 0.0
+        limiter = RateLimiter(tpm=6000)
+        limiter.observe(200, {"x-ratelimit-remaining-tokens": "0"})
+        assert limiter.acquire(100) == 1.0
+
+    @patch("agents.idea_refiner.generation.ratelimit.time")
+    def test_settle_refunds_overestimate(self, mock_time):
+        mock_time.monotonic.return_value = 0.0
+        limiter = RateLimiter(tpm=6000)
+        limiter.acquire(6000)
+        limiter.settle(6000, 100)
+        assert limiter.acquire(5000) == 0.0
+
+    @patch("agents.idea_refiner.generation.ratelimit.time.sleep")
+    def test_transport_reports_wait_and_throttling_in_meter(self, mock_sleep):
+        meter = start_meter()
+        set_rate_limits("throttled", rpm=60, tpm=None)
+        try:
+            transport = ProviderTransport(
+                "throttled",
+                httpx.MockTransport(
+                    lambda r: httpx.Response(429, headers={"retry-after": "2"}, json={}),
+                ),
+            )
+            client = httpx.Client(transport=transport)
+            client.post("http://llm.test/", json={})
+            client.post("http://llm.test/", json={})
+        finally:
+            set_rate_limits("throttled", None, None)
+        assert meter["throttled"] == 2
+        assert meter["rate_limit_wait_s"] >= 1.9
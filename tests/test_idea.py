@@ -0,0 +1,55 @@
+from agents.idea_refiner.idea import FIELDS, Idea, idea_of, parse_idea
+from agents.idea_refiner.loadtest.fake_llm import IDEA_TEMPLATE
+
+FULL_IDEA = IDEA_TEMPLATE.format(n=7)
+
+
+class TestParseIdea:
+    def test_splits_every_section(self):
+        idea = parse_idea(FULL_IDEA)
+        assert idea.name == "LoadTest 7"
+        assert idea.pricing == "$4.99/month"
+        assert idea.path_to_100 == "21 customers x $4.99."
+        assert idea.missing() == []
+        assert idea.raw == FULL_IDEA
+
+    def test_multiline_sections_and_heading_variants(self):
+        text = (
+            "## **Product Name**: Pawsome\n\n"
+            "**How It Works:** Upload a photo.\nGet a portrait.\n\n"
+            "**Bonus:** not a known section\n"
+        )
+        idea = parse_idea(text)
+        assert idea.name == "Pawsome"
+        assert idea.how_it_works.startswith("Upload a photo.\nGet a portrait.")
+        assert "not a known section" in idea.how_it_works
+
+    def test_reports_missing_sections(self):
+        idea = parse_idea("**Product Name:** Half\n\n**Pricing:** $1")
+        assert "One-Line Pitch" in idea.missing()
+        assert "Pricing" not in idea.missing()
+
+    def test_unstructured_text_falls_back(self):
+        idea = parse_idea("[Error: generation failed for GPT]")
+        assert idea.title == "[Error: generation failed for GPT]"
+        assert idea.canonical() == "[Error: generation failed for GPT]"
+        assert len(idea.missing()) == len(FIELDS)
+
+    def test_title_is_first_line_of_name(self):
+        assert parse_idea("**Product Name:** **SinkMate**\n\nMore text").title == "SinkMate"
+
+    def test_slots_keep_instances_compact(self):
+        assert not hasattr(Idea("x"), "__dict__")
+
+
+class TestCanonical:
+    def test_condensed_and_shorter(self):
+        text = FULL_IDEA.replace("Anyone running", "Anyone **running**\n ")
+        canonical = parse_idea(text).canonical()
+        assert canonical.splitlines()[0] == "Name: LoadTest 7"
+        assert "Customer: Anyone running a load test." in canonical
+        assert "**" not in canonical
+        assert len(canonical) < len(text)
+
+    def test_parsed_once_and_shared(self):
+        assert idea_of(FULL_IDEA) is idea_of(FULL_IDEA)
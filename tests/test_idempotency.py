@@ -0,0 +1,152 @@
+import threading
+import time
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from agents.idea_refiner.server import idempotency
+from agents.idea_refiner.server.idempotency import (
+    IdempotencyTimeout,
+    MemoryIdempotencyStore,
+    SqliteIdempotencyStore,
+    get_idempotency_store,
+    idempotency_key,
+    run_once,
+)
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryIdempotencyStore()
+        return
+    store = SqliteIdempotencyStore(tmp_path / "idempotency.db")
+    yield store
+    store.close()
+
+
+class TestKey:
+    def test_defaults_to_date_and_theme(self):
+        today = date(2026, 3, 14)
+        assert idempotency_key(None, "dentists", today) == "2026-03-14:dentists"
+        assert idempotency_key(None, None, today) == "2026-03-14:auto"
+        assert idempotency_key("retry-42", "dentists", today) == "retry-42"
+
+
+class TestClaim:
+    def test_states(self, store):
+        assert store.claim("k", "one", 60) == ("acquired", None)
+        assert store.claim("k", "two", 60) == ("busy", None)
+        store.complete("k", "one", {"winner_label": "A"})
+        assert store.claim("k", "two", 60) == ("done", {"winner_label": "A"})
+
+    def test_expired_lease_is_taken_over(self, store):
+        store.claim("k", "crashed", 0.01)
+        time.sleep(0.02)
+        assert store.claim("k", "next", 60) == ("acquired", None)
+        assert store.renew("k", "crashed", 60) is False
+        assert store.renew("k", "next", 60) is True
+
+    def test_failed_run_can_be_retried(self, store):
+        store.claim("k", "one", 60)
+        store.release("k", "one", "RuntimeError: judge down")
+        assert store.claim("k", "two", 60) == ("acquired", None)
+
+
+class TestRunOnce:
+    def test_repeat_returns_stored_result(self, store):
+        calls = []
+
+        def run():
+            calls.append(1)
+            return {"winning_idea": "x"}
+
+        assert run_once(store, "k", run) == ({"winning_idea": "x"}, False)
+        assert run_once(store, "k", run) == ({"winning_idea": "x"}, True)
+        assert len(calls) == 1
+
+    def test_concurrent_callers_wait_for_one_run(self, store):
+        started = threading.Event()
+        calls = []
+
+        def run():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return {"winning_idea": "x"}
+
+        results = []
+
+        def call():
+            results.append(run_once(store, "k", run, poll_s=0.01))
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(calls) == 1
+        assert sorted(replayed for _, replayed in results) == [False, True, True, True]
+
+    def test_failure_is_raised_and_released(self, store):
+        def broken():
+            raise RuntimeError("judge down")
+
+        with pytest.raises(RuntimeError):
+            run_once(store, "k", broken)
+        assert run_once(store, "k", lambda: {"ok": 1}) == ({"ok": 1}, False)
+
+    def test_lease_is_renewed_while_running(self, store):
+        def slow():
+            time.sleep(0.15)
+            return {}
+
+        t = threading.Thread(target=run_once, args=(store, "k", slow, 0.06))
+        t.start()
+        time.sleep(0.1)
+        assert store.claim("k", "intruder", 60) == ("busy", None)
+        t.join()
+
+    def test_gives_up_waiting(self, store):
+        store.claim("k", "other", 60)
+        with pytest.raises(IdempotencyTimeout):
+            run_once(store, "k", dict, wait_s=0.05, poll_s=0.01)
+
+
+class TestBackendSelection:
+    def test_off_and_unknown(self, monkeypatch):
+        monkeypatch.setattr(idempotency, "_store", None)
+        monkeypatch.setenv("IDEMPOTENCY_BACKEND", "off")
+        assert get_idempotency_store() is None
+        monkeypatch.setenv("IDEMPOTENCY_BACKEND", "redis")
+        with pytest.raises(ValueError):
+            get_idempotency_store()
+
+    def test_memory_backend(self, monkeypatch):
+        monkeypatch.setattr(idempotency, "_store", None)
+        monkeypatch.setenv("IDEMPOTENCY_BACKEND", "memory")
+        assert isinstance(get_idempotency_store(), MemoryIdempotencyStore)
+
+
+class TestHandler:
+    def call(self, handler_module, path, headers=None):
+        from flask import Flask, request
+
+        with Flask(__name__).test_request_context(path, headers=headers or {}):
+            return handler_module.idea_refiner(request)
+
+    def test_repeat_call_is_replayed(self, handler_module, monkeypatch):
+        monkeypatch.setattr(idempotency, "_store", MemoryIdempotencyStore())
+        monkeypatch.setenv("IDEMPOTENCY_BACKEND", "memory")
+        with patch("agents.idea_refiner.server.run.run_request") as mock_run:
+            mock_run.return_value = {"winning_idea": "x"}
+            first = self.call(handler_module, "/?theme=dentists")
+            second = self.call(handler_module, "/?theme=dentists")
+            other = self.call(handler_module, "/", {"Idempotency-Key": "manual-1"})
+        assert first.headers["Idempotent-Replayed"] == "false"
+        assert second.headers["Idempotent-Replayed"] == "true"
+        assert second.get_json() == {"winning_idea": "x"}
+        assert other.headers["Idempotent-Replayed"] == "false"
+        assert mock_run.call_count == 2
+        mock_run.assert_any_call("dentists")
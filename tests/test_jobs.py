@@ -0,0 +1,195 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from agents.idea_refiner.pipeline.events import emit
+from agents.idea_refiner.server.jobs import MAX_ATTEMPTS, JobExecutor, JobStore, apply_event
+
+
+def wait_for(store, job_id, status, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job["status"] == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} is {store.get(job_id)['status']}, wanted {status}")
+
+
+def fake_run(theme):
+    emit("run_started", run_id="r1", theme=theme, lanes={"A": "GPT-5.2", "B": "Gemini"})
+    emit("round_started", round=1, lanes=["A", "B"])
+    emit("lane_generated", round=1, label="A", model="GPT-5.2", attempt=1, ok=True,
+         latency_s=1.5)
+    return {"theme": theme, "winner_label": "A", "winning_idea": "idea"}
+
+
+@pytest.fixture()
+def store(tmp_path):
+    store = JobStore(tmp_path / "jobs.db")
+    yield store
+    store.close()
+
+
+class TestApplyEvent:
+    def test_tracks_round_and_lanes(self):
+        progress = {}
+        apply_event(progress, "run_started", {"run_id": "r", "lanes": {"A": "m1", "B": "m2"}})
+        apply_event(progress, "round_started", {"round": 1, "lanes": ["A", "B"]})
+        apply_event(progress, "lane_generated", {
+            "label": "A", "model": "m1", "attempt": 1, "ok": True, "latency_s": 2.0,
+        })
+        assert progress["round"] == 1
+        assert progress["stage"] == "generating"
+        assert progress["lanes"]["A"]["status"] == "generated"
+        assert progress["lanes"]["B"]["status"] == "generating"
+        apply_event(progress, "lane_generated", {
+            "label": "B", "model": "m2", "attempt": 1, "ok": False, "latency_s": 3.0,
+        })
+        assert progress["stage"] == "judging"
+        apply_event(progress, "retry_queued", {"label": "B"})
+        assert progress["lanes"]["B"]["status"] == "retrying"
+
+
+class TestJobExecutor:
+    def test_submit_runs_and_stores_result(self, store):
+        executor = JobExecutor(store, fake_run, workers=2)
+        job = executor.submit("pet owners")
+        assert job["status"] == "queued"
+        done = wait_for(store, job["id"], "done")
+        executor.shutdown()
+        assert done["result"]["theme"] == "pet owners"
+        assert done["progress"]["lanes"]["A"]["latency_s"] == 1.5
+        assert done["attempts"] == 1
+
+    def test_progress_visible_while_running(self, store):
+        release = threading.Event()
+
+        def slow_run(theme):
+            emit("round_started", round=2, lanes=["A"])
+            release.wait(5)
+            return {}
+
+        executor = JobExecutor(store, slow_run, workers=1)
+        job = executor.submit()
+        deadline = time.monotonic() + 5
+        while store.get(job["id"])["progress"].get("round") != 2:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert store.get(job["id"])["status"] == "running"
+        release.set()
+        wait_for(store, job["id"], "done")
+        executor.shutdown()
+
+    def test_failure_recorded(self, store):
+        def broken(theme):
+            raise RuntimeError("judge down")
+
+        executor = JobExecutor(store, broken, workers=1)
+        job = executor.submit()
+        failed = wait_for(store, job["id"], "failed")
+        executor.shutdown()
+        assert failed["error"] == "RuntimeError: judge down"
+
+    def test_resume_restarts_unfinished_jobs(self, store):
+        interrupted = store.create("freelancers")
+        assert store.claim(interrupted["id"], "crashed", lease_s=-1)
+        exhausted = store.create(None)
+        for _ in range(MAX_ATTEMPTS):
+            store.claim(exhausted["id"], "crashed", lease_s=-1)
+        executor = JobExecutor(store, fake_run, workers=1)
+        assert executor.resume() == 1
+        done = wait_for(store, interrupted["id"], "done")
+        executor.shutdown()
+        assert done["attempts"] == 2
+        assert store.get(exhausted["id"])["status"] == "failed"
+
+    def test_jobs_with_a_live_lease_are_left_alone(self, store):
+        elsewhere = store.create("plumbers")
+        assert store.claim(elsewhere["id"], "other-instance")
+        executor = JobExecutor(store, fake_run, workers=1)
+        assert executor.resume() == 0
+        executor._execute(elsewhere["id"])  # e.g. a duplicate submit racing the owner
+        executor.shutdown()
+        job = store.get(elsewhere["id"])
+        assert (job["status"], job["attempts"], job["worker"]) == ("running", 1, "other-instance")
+
+    def test_lease_is_renewed_while_running(self, store):
+        def slow_run(theme):
+            time.sleep(0.2)
+            return fake_run(theme)
+
+        executor = JobExecutor(store, slow_run, workers=1, lease_s=0.06)
+        job = executor.submit("bakers")
+        time.sleep(0.1)
+        assert not store.claim(job["id"], "other-instance")
+        assert wait_for(store, job["id"], "done")["attempts"] == 1
+        executor.shutdown()
+
+    def test_expired_worker_cannot_overwrite_the_new_owner(self, store):
+        job = store.create("bakers")
+        assert store.claim(job["id"], "stalled", lease_s=-1)
+        assert store.claim(job["id"], "successor")
+        assert not store.finish(job["id"], "stalled", {"title": "Stale"})
+        assert not store.fail(job["id"], "stalled", "RuntimeError: late")
+        assert store.finish(job["id"], "successor", {"title": "Fresh"})
+        finished = store.get(job["id"])
+        assert (finished["status"], finished["result"]["title"]) == ("done", "Fresh")
+        assert not store.fail(job["id"], "successor", "RuntimeError: twice")
+
+    def test_old_stores_gain_lease_columns(self, tmp_path):
+        import sqlite3
+
+        path = tmp_path / "jobs.db"
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL DEFAULT "
+                     "'queued', theme TEXT, attempts INTEGER NOT NULL DEFAULT 0, created_at REAL "
+                     "NOT NULL, started_at REAL, finished_at REAL, progress TEXT NOT NULL "
+                     "DEFAULT '{}', result TEXT, error TEXT)")
+        conn.execute("INSERT INTO jobs (id, status, created_at) VALUES ('j1', 'running', 0)")
+        conn.commit()
+        conn.close()
+        store = JobStore(path)
+        assert [j["id"] for j in store.unfinished()] == ["j1"]
+        store.close()
+
+    def test_jobs_survive_reopening_the_store(self, tmp_path):
+        path = tmp_path / "jobs.db"
+        first = JobStore(path)
+        job = first.create("teachers")
+        first.close()
+        second = JobStore(path)
+        assert [j["id"] for j in second.unfinished()] == [job["id"]]
+        second.close()
+
+
+class TestJobRoutes:
+    def call(self, handler_module, executor, path, method="GET", json=None):
+        from flask import Flask, request
+
+        with patch.object(handler_module, "get_executor", return_value=executor), \
+                Flask(__name__).test_request_context(path, method=method, json=json):
+            response = handler_module.idea_refiner(request)
+        if isinstance(response, tuple):
+            return response[0].get_json(), response[1]
+        return response.get_json(), response.status_code
+
+    def test_submit_then_poll(self, handler_module, store):
+        executor = JobExecutor(store, fake_run, workers=1)
+        body, status = self.call(
+            handler_module, executor, "/jobs", "POST", {"theme": "gardeners"}
+        )
+        assert status == 202
+        wait_for(store, body["id"], "done")
+        job, status = self.call(handler_module, executor, body["url"])
+        executor.shutdown()
+        assert status == 200
+        assert job["result"]["theme"] == "gardeners"
+
+    def test_unknown_job_is_404(self, handler_module, store):
+        executor = JobExecutor(store, fake_run, workers=1)
+        _, status = self.call(handler_module, executor, "/jobs/nope")
+        executor.shutdown()
+        assert status == 404
@@ -20,6 +20,11 @@ class TestShuffleIdeas:
         assert "unique-alpha-text" in ideas_text
         assert "unique-beta-text" in ideas_text
 
+    def test_more_than_two_lanes(self):
+        shuffle_map, ideas_text = _shuffle_ideas({"A": "x", "B": "y", "C": "z"})
+        assert set(shuffle_map) == {"A", "B", "C"}
+        assert "Idea C" in ideas_text
+
     def test_ideas_text_contains_labels(self):
         ideas = {"A": "x", "B": "y"}
         _, ideas_text = _shuffle_ideas(ideas)
@@ -27,6 +32,16 @@ class TestShuffleIdeas:
         assert "Idea B" in ideas_text
 
 
+class TestCanonicalJudgeView:
+    def test_canonical_judge_view(self, monkeypatch):
+        idea = "**Product Name:** Pawsome\n\n**One-Line Pitch:** **Pet** portraits."
+        _, full = _shuffle_ideas({"A": idea})
+        monkeypatch.setenv("JUDGE_IDEA_FORMAT", "canonical")
+        _, condensed = _shuffle_ideas({"A": idea})
+        assert "**Product Name:**" in full
+        assert "Name: Pawsome\nPitch: Pet portraits." in condensed
+
+
 class TestParseRaw:
     def test_parse_plain_json(self):
         raw = '{"verdict": "accept", "winner": "A"}'
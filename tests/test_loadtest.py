@@ -0,0 +1,104 @@
+import json
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from agents.idea_refiner.generation import clients
+from agents.idea_refiner.loadtest.cli import point_at
+from agents.idea_refiner.loadtest.fake_llm import FakeLLM
+from agents.idea_refiner.loadtest.traffic import run_load, serve_app
+
+ROOT_MAIN = Path(__file__).resolve().parent.parent / "main.py"
+
+
+def chat(url, payload):
+    request = urllib.request.Request(
+        f"{url}/chat/completions", data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"}, method="POST",
+    )
+    return urllib.request.urlopen(request, timeout=5)
+
+
+@pytest.fixture()
+def fake_llm(monkeypatch, tmp_path):
+    """Both providers pointed at a fresh fake LLM, with fresh clients."""
+    fake = FakeLLM(seed=1).start()
+    for key in ("OPENAI_BASE_URL", "GEMINI_BASE_URL", "OUTPUT_SINKS", "IDEMPOTENCY_BACKEND"):
+        monkeypatch.setenv(key, "")
+    monkeypatch.setenv("IDEA_REFINER_DATA_DIR", str(tmp_path))
+    point_at(fake)
+    clients._clients.clear()
+    yield fake
+    clients._clients.clear()
+    fake.stop()
+
+
+class TestFakeLLM:
+    def test_generation_through_the_sdk(self, fake_llm):
+        from agents.idea_refiner.generation.gemini import generate_gemini
+        from agents.idea_refiner.generation.gpt52 import generate_gpt52
+
+        first = generate_gpt52([{"role": "user", "content": "idea please"}])
+        second = generate_gemini([{"role": "user", "content": "idea please"}])
+        assert first.startswith("**Product Name:** LoadTest")
+        assert first != second
+        assert fake_llm.statuses[200] == 2
+
+    def test_judge_verdict_over_shuffled_labels(self, fake_llm):
+        from agents.idea_refiner.judging.judge import judge_ideas
+
+        verdict = judge_ideas({"A": "idea a", "B": "idea b"})
+        assert verdict["verdict"] == "accept"
+        assert {ev["idea_label"] for ev in verdict["evaluations"]} == {"A", "B"}
+
+    def test_scripted_429_then_success(self, fake_llm):
+        fake_llm.fail_next(429)
+        with pytest.raises(urllib.error.HTTPError) as err:
+            chat(fake_llm.url, {"messages": []})
+        assert err.value.code == 429
+        assert err.value.headers["retry-after"] == "1"
+        assert chat(fake_llm.url, {"messages": []}).status == 200
+
+    def test_streaming(self, fake_llm):
+        with chat(fake_llm.url, {"model": "gpt-5.2", "stream": True, "messages": []}) as r:
+            events = [line for line in r.read().decode().split("\n\n") if line]
+        assert events[-1] == "data: [DONE]"
+        chunks = [json.loads(e.removeprefix("data: ")) for e in events[:-1]]
+        text = "".join(c["choices"][0]["delta"].get("content", "") for c in chunks)
+        assert text.startswith("**Product Name:** LoadTest")
+        assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+
+    def test_error_rate(self):
+        fake = FakeLLM(error_rate=1.0).start()
+        try:
+            with pytest.raises(urllib.error.HTTPError) as err:
+                chat(fake.url, {"messages": []})
+        finally:
+            fake.stop()
+        assert err.value.code == 500
+
+
+class TestTraffic:
+    def test_drives_the_app_end_to_end(self, fake_llm):
+        server = serve_app(ROOT_MAIN)
+        try:
+            report = run_load(
+                f"http://127.0.0.1:{server.server_port}/", requests=4, concurrency=2,
+                in_process=True,
+            )
+        finally:
+            server.shutdown()
+        assert report["ok"] == 4
+        assert report["error_rate"] == 0.0
+        assert report["statuses"] == {"200": 4}
+        assert report["latency_s"]["p50"] <= report["latency_s"]["p99"]
+        assert report["peak_rss_mb"] > 0 and report["peak_threads"] >= 1
+        assert fake_llm.statuses[200] >= 4 * 3
+
+    def test_connection_errors_are_counted(self):
+        report = run_load("http://127.0.0.1:9/", requests=3, concurrency=3, timeout=1)
+        assert report["ok"] == 0
+        assert report["error_rate"] == 1.0
+        assert report["statuses"] == {"error": 3}
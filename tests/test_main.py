@@ -77,14 +77,14 @@ FAKE_JUDGE_RESPONSE = json.dumps({
 
 
 class TestMainIntegration:
-    @patch("agents.idea_refiner.output.display.send_telegram_summary")
+    @patch.dict("os.environ", {"OUTPUT_SINKS": "console"})
     @patch("agents.idea_refiner.pipeline.state.get_client")
     @patch("agents.idea_refiner.judging.judge.get_client")
     @patch("agents.idea_refiner.generation.gemini.get_client")
     @patch("agents.idea_refiner.generation.gpt52.get_client")
     def test_main_accepts_on_first_round(
         self, mock_gpt_client, mock_gem_client, mock_judge_client,
-        mock_state_client, mock_telegram,
+        mock_state_client,
     ):
         gpt_client = MagicMock()
         gpt_client.chat.completions.create.return_value = make_chat_response(FAKE_IDEA_A)
@@ -100,21 +100,21 @@ class TestMainIntegration:
         )
         mock_judge_client.return_value = judge_client
 
-        result = main()
+        result = main([])
 
         assert "QuickMenu" in result
         assert gpt_client.chat.completions.create.call_count == 1
         assert gem_client.chat.completions.create.call_count == 1
         assert judge_client.chat.completions.create.call_count == 1
 
-    @patch("agents.idea_refiner.output.display.send_telegram_summary")
+    @patch.dict("os.environ", {"OUTPUT_SINKS": "console"})
     @patch("agents.idea_refiner.pipeline.state.get_client")
     @patch("agents.idea_refiner.judging.judge.get_client")
     @patch("agents.idea_refiner.generation.gemini.get_client")
     @patch("agents.idea_refiner.generation.gpt52.get_client")
     def test_main_retries_then_accepts(
         self, mock_gpt_client, mock_gem_client, mock_judge_client,
-        mock_state_client, mock_telegram,
+        mock_state_client,
     ):
         gpt_client = MagicMock()
         gpt_client.chat.completions.create.return_value = make_chat_response(FAKE_IDEA_A)
@@ -144,7 +144,7 @@ class TestMainIntegration:
         ]
         mock_judge_client.return_value = judge_client
 
-        result = main()
+        result = main([])
 
         assert result is not None
         assert judge_client.chat.completions.create.call_count == 2
@@ -0,0 +1,181 @@
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from agents.idea_refiner.novelty.index import NoveltyIndex
+from agents.idea_refiner.novelty.minhash import idea_title, shingles, signature, similarity
+from agents.idea_refiner.novelty.store import iter_jsonl_ideas
+from agents.idea_refiner.pipeline.novelty_step import remember_judged, send_back_repeats
+from tests.test_main import FAKE_IDEA_A, FAKE_IDEA_B
+
+REWORDED_A = FAKE_IDEA_A.replace("QuickMenu", "MenuSnap").replace("60 seconds", "a minute")
+
+
+class TestMinHash:
+    def test_section_labels_do_not_count_as_overlap(self):
+        assert shingles("**Product Name:** **Pricing:**") == set()
+
+    def test_identical_text_similarity_one(self):
+        assert similarity(signature(FAKE_IDEA_A), signature(FAKE_IDEA_A)) == 1.0
+
+    def test_reworded_idea_is_similar_unrelated_is_not(self):
+        assert similarity(signature(FAKE_IDEA_A), signature(REWORDED_A)) > 0.6
+        assert similarity(signature(FAKE_IDEA_A), signature(FAKE_IDEA_B)) < 0.2
+
+    def test_idea_title(self):
+        assert idea_title(FAKE_IDEA_A) == "QuickMenu"
+
+
+class TestNoveltyIndex:
+    def test_flags_near_duplicate(self):
+        index = NoveltyIndex()
+        index.add(FAKE_IDEA_A)
+        match = index.check(REWORDED_A)
+        assert match["title"] == "QuickMenu"
+        assert match["similarity"] >= index.threshold
+
+    def test_novel_idea_passes(self):
+        index = NoveltyIndex()
+        index.add(FAKE_IDEA_A)
+        assert index.check(FAKE_IDEA_B) is None
+
+    def test_empty_index_and_empty_text(self):
+        index = NoveltyIndex()
+        assert index.check(FAKE_IDEA_A) is None
+        index.add("")
+        assert len(index) == 0
+
+    def test_save_load_round_trip(self, tmp_path):
+        index = NoveltyIndex()
+        index.build([(FAKE_IDEA_A, None), (FAKE_IDEA_B, "Pets")])
+        index.save(tmp_path / "novelty.idx")
+
+        loaded = NoveltyIndex.load(tmp_path / "novelty.idx")
+        assert len(loaded) == 2
+        assert loaded.check(FAKE_IDEA_B)["title"] == "Pets"
+
+    def test_concurrent_saves_leave_a_complete_file(self, tmp_path):
+        import threading
+
+        index = NoveltyIndex()
+        index.build([(FAKE_IDEA_A, None), (FAKE_IDEA_B, "Pets")])
+        path = tmp_path / "novelty.idx"
+        errors = []
+
+        def save():
+            try:
+                for _ in range(20):
+                    index.save(path)
+            except Exception as e:  # noqa: BLE001
+                errors.append(e)
+
+        threads = [threading.Thread(target=save) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+        assert len(NoveltyIndex.load(path)) == 2
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_sync_merges_ideas_from_every_process(self, tmp_path):
+        path = tmp_path / "novelty.idx"
+        first, second = NoveltyIndex.load(path), NoveltyIndex.load(path)
+        first.add(FAKE_IDEA_A)
+        second.add(FAKE_IDEA_B)
+        first.sync(path)
+        second.sync(path)
+        assert len(NoveltyIndex.load(path)) == 2
+        assert second.check(REWORDED_A) is not None
+        assert not second.dirty
+        assert first.stale(path)
+        first.sync(path)
+        assert len(first) == 2
+        assert not first.stale(path)
+
+    def test_save_index_picks_up_other_writers(self, tmp_path, monkeypatch):
+        from agents.idea_refiner.novelty import store
+
+        path = tmp_path / "novelty.idx"
+        monkeypatch.setenv("NOVELTY_INDEX", str(path))
+        monkeypatch.setattr(store, "_index", None)
+        store.get_index()
+        other = NoveltyIndex.load(path)
+        other.add(FAKE_IDEA_B)
+        other.sync(path)
+        store.save_index()
+        assert store.get_index().check(FAKE_IDEA_B) is not None
+
+    def test_load_rejects_foreign_file(self, tmp_path):
+        path = tmp_path / "junk.idx"
+        path.write_bytes(b"XXXX\x00\x00\x00\x00")
+        with pytest.raises(ValueError):
+            NoveltyIndex.load(path)
+
+    def test_check_is_sub_millisecond(self):
+        index = NoveltyIndex()
+        index.build((f"{FAKE_IDEA_B} variant {i} " + " ".join(map(str, range(i, i + 40))), None)
+                    for i in range(500))
+        sig = signature(FAKE_IDEA_A)
+        t0 = time.perf_counter()
+        for _ in range(200):
+            index.query_signature(sig)
+        assert (time.perf_counter() - t0) / 200 < 0.001
+
+    def test_bulk_build_from_jsonl(self, tmp_path):
+        path = tmp_path / "ideas.jsonl"
+        path.write_text(
+            json.dumps({"theme": "a", "winning_idea": FAKE_IDEA_A}) + "\n"
+            + json.dumps({"theme": "b", "error": "boom"}) + "\n"
+        )
+        index = NoveltyIndex()
+        assert index.build(iter_jsonl_ideas(path)) == 1
+
+
+class TestNoveltyStep:
+    @patch("agents.idea_refiner.pipeline.novelty_step.generate_parallel")
+    @patch("agents.idea_refiner.pipeline.novelty_step.get_index")
+    def test_repeat_sent_back_to_lane(self, mock_index, mock_parallel, populated_state):
+        index = NoveltyIndex()
+        index.add(FAKE_IDEA_A)
+        mock_index.return_value = index
+        populated_state["repeats"] = []
+        populated_state["ideas"]["A"] = REWORDED_A
+        mock_parallel.return_value = [("A", "a brand new idea", 1.0)]
+
+        send_back_repeats(populated_state, ["A", "B"])
+
+        (label, _, messages), = mock_parallel.call_args.args[0]
+        assert label == "A"
+        assert "too similar" in messages[-2]["content"]
+        assert "QuickMenu" in messages[-2]["content"]
+        assert populated_state["ideas"]["A"] == "a brand new idea"
+        assert populated_state["repeats"][0]["title"] == "QuickMenu"
+
+    @patch("agents.idea_refiner.pipeline.novelty_step.generate_parallel")
+    @patch("agents.idea_refiner.pipeline.novelty_step.get_index", return_value=None)
+    def test_disabled_without_index(self, mock_index, mock_parallel, populated_state):
+        send_back_repeats(populated_state, ["A", "B"])
+        mock_parallel.assert_not_called()
+
+    @patch("agents.idea_refiner.pipeline.novelty_step.get_index")
+    def test_judged_ideas_are_remembered(self, mock_index, populated_state):
+        index = NoveltyIndex()
+        mock_index.return_value = index
+        populated_state["ideas"]["B"] = "[Error: generation failed for X]"
+        remember_judged(populated_state)
+        assert len(index) == 1
+
+    @patch("agents.idea_refiner.pipeline.novelty_step.get_index")
+    def test_kept_ideas_are_not_indexed_again(self, mock_index, populated_state):
+        index = NoveltyIndex()
+        mock_index.return_value = index
+        remember_judged(populated_state)
+        populated_state["history"].append({"round": 2, "lanes": {
+            "A": {"kept": True}, "B": {"kept": False},
+        }})
+        populated_state["ideas"]["B"] = "**Product Name:** Fresh\n\nA different product entirely."
+        remember_judged(populated_state)
+        assert len(index) == 3
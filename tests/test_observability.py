@@ -0,0 +1,407 @@
+import io
+import json
+import logging
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from agents.idea_refiner.observability import metrics
+from agents.idea_refiner.observability.logs import configure_logging, flush_logging, log_context
+from agents.idea_refiner.observability.metrics import Counter, Histogram, render_metrics
+from agents.idea_refiner.observability.profiling import memory_snapshot, profile_run, stage
+from agents.idea_refiner.observability.tracing import (
+    JsonFileExporter,
+    OtlpExporter,
+    SpanProcessor,
+    get_processor,
+    set_processor,
+    span,
+)
+from tests.fake_collector import FakeCollector
+
+log = logging.getLogger("tests.observability")
+
+
+@pytest.fixture()
+def root_logging():
+    """Restore the root logger's handlers after a test reconfigures it."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    flush_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+@pytest.fixture()
+def json_logs(monkeypatch, root_logging):
+    monkeypatch.setenv("LOG_FORMAT", "json")
+    stream = io.StringIO()
+    configure_logging(stream=stream)
+
+    def lines():
+        flush_logging()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    return lines
+
+
+class SlowStream(io.StringIO):
+    def write(self, text):
+        time.sleep(0.02)
+        return super().write(text)
+
+
+class TestJsonLogging:
+    def test_records_carry_context(self, json_logs):
+        with log_context(run_id="r1", round=2):
+            with log_context(lane="A", model="GPT-5.2", call_id=7):
+                log.info("   [%s] generated", "A")
+            log.info("judging")
+        log.info("outside")
+        inner, outer, bare = json_logs()
+        assert inner["msg"] == "[A] generated"
+        assert inner | {"run_id": "r1", "round": 2, "lane": "A", "model": "GPT-5.2"} == inner
+        assert inner["call_id"] == 7
+        assert outer["run_id"] == "r1" and "lane" not in outer
+        assert "run_id" not in bare
+
+    def test_concurrent_runs_stay_separate(self, json_logs):
+        def run(run_id):
+            with log_context(run_id=run_id):
+                for i in range(20):
+                    log.info("step %d of %s", i, run_id)
+
+        threads = [threading.Thread(target=run, args=(f"run-{n}",)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        records = json_logs()
+        assert len(records) == 80
+        assert all(r["msg"].endswith(r["run_id"]) for r in records)
+
+    def test_exception_is_a_field(self, json_logs):
+        try:
+            raise ValueError("bad score")
+        except ValueError:
+            log.exception("judge failed")
+        (record,) = json_logs()
+        assert record["msg"] == "judge failed"
+        assert "ValueError: bad score" in record["exc"]
+
+    def test_slow_output_does_not_block_callers(self, monkeypatch, root_logging):
+        monkeypatch.setenv("LOG_FORMAT", "json")
+        stream = SlowStream()
+        configure_logging(stream=stream)
+        t0 = time.perf_counter()
+        for i in range(20):
+            log.info("line %d", i)
+        assert time.perf_counter() - t0 < 0.2
+        flush_logging()
+        assert len(stream.getvalue().splitlines()) == 20
+
+    def test_lane_context_reaches_generation_threads(self, json_logs):
+        from agents.idea_refiner.generation.runner import generate_parallel
+
+        def generate(messages):
+            log.info("calling model")
+            return "idea"
+
+        with log_context(run_id="r9", round=1):
+            generate_parallel([
+                ("A", {"name": "GPT-5.2", "generate": generate}, []),
+                ("B", {"name": "Gemini", "generate": generate}, []),
+            ])
+        records = json_logs()
+        assert {(r["lane"], r["model"], r["run_id"]) for r in records} == {
+            ("A", "GPT-5.2", "r9"), ("B", "Gemini", "r9"),
+        }
+
+
+class TestTextLogging:
+    def test_text_is_the_default(self, monkeypatch, root_logging):
+        monkeypatch.delenv("LOG_FORMAT", raising=False)
+        logging.getLogger().handlers.clear()
+        stream = io.StringIO()
+        configure_logging(stream=stream)
+        log.info("🚀 Starting")
+        assert stream.getvalue().strip().endswith("| INFO     | 🚀 Starting")
+
+
+@pytest.fixture()
+def spans():
+    """Finished spans, collected in memory while the test runs."""
+    finished = []
+    processor = SpanProcessor(lambda batch: finished.extend(s.to_dict() for s in batch))
+    set_processor(processor)
+
+    def collected():
+        processor.flush()
+        return {s["name"]: s for s in finished} | {"_all": finished}
+
+    yield collected
+    processor.shutdown()
+    set_processor(None)
+
+
+class TestTracing:
+    def test_disabled_by_default(self, monkeypatch):
+        monkeypatch.delenv("TRACE_EXPORTER", raising=False)
+        set_processor(None)
+        assert get_processor() is None
+        with span("run", theme="x") as s:
+            s.set(rounds=1)
+
+    def test_spans_nest_across_tasks_and_threads(self, spans):
+        from agents.idea_refiner.generation.runner import generate_parallel
+
+        def generate(messages):
+            with span("llm.call", provider="fake"):
+                return "idea"
+
+        with span("round", round=1):
+            generate_parallel([
+                ("A", {"name": "GPT-5.2", "generate": generate}, []),
+                ("B", {"name": "Gemini", "generate": generate}, []),
+            ])
+        collected = spans()
+        round_span = collected["round"]
+        generates = [s for s in collected["_all"] if s["name"] == "generate"]
+        calls = [s for s in collected["_all"] if s["name"] == "llm.call"]
+        assert {s["parent_id"] for s in generates} == {round_span["span_id"]}
+        assert {s["parent_id"] for s in calls} == {s["span_id"] for s in generates}
+        assert {s["trace_id"] for s in collected["_all"]} == {round_span["trace_id"]}
+        assert {s["attributes"]["lane"] for s in generates} == {"A", "B"}
+
+    def test_error_recorded_and_raised(self, spans):
+        with pytest.raises(RuntimeError), span("judge"):
+            raise RuntimeError("timeout")
+        assert spans()["judge"]["status"] == "error"
+        assert spans()["judge"]["error"] == "RuntimeError: timeout"
+
+    @patch("agents.idea_refiner.pipeline.judge_step.judge_ideas")
+    def test_judge_and_quality_gate_spans(self, mock_judge, spans, populated_state):
+        from agents.idea_refiner.pipeline.judge_step import judge_and_log
+
+        mock_judge.return_value = {
+            "evaluations": [
+                {"idea_label": "A", "acquisition_score": 8, "demand_score": 9,
+                 "build_score": 9, "explanation": "close"},
+            ],
+            "verdict": "accept", "winner": "A", "winning_idea": "x", "rejection_feedback": {},
+        }
+        judge_and_log(populated_state)
+        collected = spans()
+        assert collected["judge"]["attributes"]["verdict"] == "accept"
+        assert collected["quality_gate"]["attributes"]["override"] is True
+        assert collected["quality_gate"]["attributes"]["verdict"] == "reject_all"
+
+
+class TestExporters:
+    def test_json_file(self, tmp_path):
+        processor = SpanProcessor(JsonFileExporter(tmp_path / "traces.jsonl"))
+        set_processor(processor)
+        try:
+            with span("run", theme="dentists"), span("round", round=1):
+                pass
+        finally:
+            processor.shutdown()
+            set_processor(None)
+        rows = [json.loads(line) for line in (tmp_path / "traces.jsonl").read_text().splitlines()]
+        assert [r["name"] for r in rows] == ["round", "run"]
+        assert rows[0]["parent_id"] == rows[1]["span_id"]
+        assert rows[1]["attributes"] == {"theme": "dentists"}
+
+    def test_otlp_against_local_collector(self):
+        collector = FakeCollector().start()
+        processor = SpanProcessor(OtlpExporter(collector.url))
+        set_processor(processor)
+        try:
+            with span("run", rounds=2, accepted=True, cost=0.5):
+                pass
+            processor.flush()
+        finally:
+            processor.shutdown()
+            set_processor(None)
+            collector.stop()
+        (exported,) = collector.spans
+        assert exported["name"] == "run"
+        assert len(exported["traceId"]) == 32 and len(exported["spanId"]) == 16
+        assert {a["key"]: a["value"] for a in exported["attributes"]} == {
+            "rounds": {"intValue": "2"},
+            "accepted": {"boolValue": True},
+            "cost": {"doubleValue": 0.5},
+        }
+        assert exported["status"] == {"code": 1}
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    n = 0
+    while time.perf_counter() < end:
+        n += 1
+    return n
+
+
+class TestProfiling:
+    def test_off_by_default_and_cheap(self):
+        t0 = time.perf_counter()
+        for _ in range(100_000):
+            with stage("judge"):
+                pass
+        assert time.perf_counter() - t0 < 0.5
+        memory_snapshot("round 1")
+
+    def test_writes_stage_profiles_stacks_and_summary(self, tmp_path):
+        from agents.idea_refiner.generation.runner import generate_parallel
+
+        def generate(messages):
+            busy(0.1)
+            return "idea"
+
+        with profile_run(tmp_path) as profile:
+            with stage("generate", cpu=False):
+                generate_parallel([
+                    ("A", {"name": "GPT-5.2", "generate": generate}, []),
+                    ("B", {"name": "Gemini", "generate": generate}, []),
+                ])
+            kept = [bytearray(1024) for _ in range(1000)]
+            memory_snapshot("round 1")
+            with stage("judge"):
+                busy(0.05)
+        assert kept
+        out = profile.out_dir
+        assert {p.name for p in out.iterdir()} >= {
+            "generate_calls.pstats", "judge.pstats",
+            "stacks.collapsed", "summary.txt",
+        }
+        assert profile.stages["generate_calls"].calls == 2
+        assert profile.stages["generate"].profiles == []
+        assert "busy" in (out / "stacks.collapsed").read_text()
+        summary = (out / "summary.txt").read_text()
+        assert summary.splitlines()[1].startswith("generate ")
+        assert "event-loop lag" in summary
+        assert "memory after round 1" in summary
+
+    def test_overlapping_runs_share_tracemalloc(self, tmp_path):
+        import tracemalloc
+
+        first = profile_run(tmp_path / "first")
+        second = profile_run(tmp_path / "second")
+        first.__enter__()
+        profile = second.__enter__()
+        first.__exit__(None, None, None)
+        assert tracemalloc.is_tracing()
+        profile.snapshot("round 1")
+        second.__exit__(None, None, None)
+        assert not tracemalloc.is_tracing()
+        assert profile.memory[0]["label"] == "round 1"
+
+    def test_snapshot_skipped_when_tracing_is_off(self, tmp_path):
+        with profile_run(tmp_path) as profile, \
+                patch("tracemalloc.is_tracing", return_value=False):
+            profile.snapshot("round 1")
+        assert profile.memory == []
+
+    def test_main_profile_flag(self, tmp_path):
+        with patch("agents.idea_refiner.main.get_idea_prompt", return_value=(None, "s", "u")), \
+                patch("agents.idea_refiner.main.run_pipeline", return_value={}), \
+                patch("agents.idea_refiner.main.display_and_save", return_value="idea"):
+            from agents.idea_refiner.main import main
+
+            with stage("judge"):
+                pass
+            assert main(["--profile", str(tmp_path)]) == "idea"
+        (run_dir,) = tmp_path.iterdir()
+        assert (run_dir / "summary.txt").exists()
+
+
+class TestMetrics:
+    def test_counter_renders_labels(self):
+        c = Counter("t_events_total", "Events.", ("kind",))
+        c.labels("a").inc()
+        c.labels("a").inc(2)
+        c.labels('say "hi"').inc()
+        assert c.render() == [
+            "# HELP t_events_total Events.",
+            "# TYPE t_events_total counter",
+            't_events_total{kind="a"} 3',
+            't_events_total{kind="say \\"hi\\""} 1',
+        ]
+
+    def test_histogram_buckets_are_cumulative(self):
+        h = Histogram("t_latency_seconds", "Latency.", buckets=(1, 5))
+        for value in (0.5, 1, 3, 10):
+            h.observe(value)
+        lines = h.render()[2:]
+        assert lines == [
+            't_latency_seconds_bucket{le="1"} 2',
+            't_latency_seconds_bucket{le="5"} 3',
+            't_latency_seconds_bucket{le="+Inf"} 4',
+            "t_latency_seconds_sum 14.5",
+            "t_latency_seconds_count 4",
+        ]
+
+    def test_wrong_label_count_rejected(self):
+        with pytest.raises(ValueError):
+            Counter("t_x_total", "X.", ("a", "b")).labels("only-one")
+
+    def test_concurrent_updates_sum_across_threads(self):
+        c = Counter("t_hot_total", "Hot path.")
+
+        def work():
+            for _ in range(10_000):
+                c.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert c.labels().value() == 80_000
+        # Finished threads are folded away without losing their counts.
+        assert c.labels()._shards._live == []
+        assert c.labels().value() == 80_000
+
+    def test_dead_threads_are_folded_without_a_scrape(self):
+        c = Counter("t_short_lived_total", "Short-lived threads.")
+        for _ in range(50):
+            t = threading.Thread(target=c.inc)
+            t.start()
+            t.join()
+        assert len(c.labels()._shards._live) <= 1
+        assert c.labels().value() == 50
+
+    def test_pipeline_metrics_exposed(self, populated_state, fake_verdict_accept):
+        from agents.idea_refiner.pipeline.judge_step import judge_and_log
+
+        before = metrics.JUDGE_VERDICTS.labels("accept").value()
+        with patch("agents.idea_refiner.pipeline.judge_step.judge_ideas",
+                   return_value=fake_verdict_accept):
+            judge_and_log(populated_state)
+        assert metrics.JUDGE_VERDICTS.labels("accept").value() == before + 1
+        assert 'idea_refiner_judge_verdicts_total{verdict="accept"}' in render_metrics()
+
+    def test_generation_failures_counted(self):
+        from agents.idea_refiner.generation.runner import generate_parallel
+
+        def boom(messages):
+            raise RuntimeError("down")
+
+        failures = metrics.GENERATION_FAILURES.labels("Broken", "error")
+        before = failures.value()
+        generate_parallel([("A", {"name": "Broken", "generate": boom}, [])])
+        assert failures.value() == before + 1
+
+    def test_metrics_route(self, handler_module):
+        from flask import Flask, request
+
+        with Flask(__name__).test_request_context("/metrics"):
+            response = handler_module.idea_refiner(request)
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain; version=0.0.4")
+        body = response.get_data(as_text=True)
+        assert "# TYPE idea_refiner_llm_latency_seconds histogram" in body
@@ -0,0 +1,212 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from agents.idea_refiner.server import bot
+from agents.idea_refiner.server.ondemand import (
+    OnDemand,
+    RateLimited,
+    SingleFlight,
+    UserLimiter,
+    normalize_theme,
+)
+
+
+def _rendered(theme):
+    return {"title": f"Idea for {theme}", "result": {"theme": theme, "title": f"Idea for {theme}"}}
+
+
+def slow_run(calls, delay=0.2):
+    def run(theme):
+        calls.append(theme)
+        time.sleep(delay)
+        return _rendered(theme)
+
+    return run
+
+
+def _concurrently(n, fn):
+    results = [None] * n
+    barrier = threading.Barrier(n)
+
+    def worker(i):
+        barrier.wait()
+        results[i] = fn(i)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+class TestSingleFlight:
+    def test_concurrent_calls_share_one_execution(self):
+        flight, calls = SingleFlight(), []
+        results = _concurrently(5, lambda i: flight.do("k", lambda: slow_run(calls)("x")))
+        assert len(calls) == 1
+        assert sum(shared for _, shared in results) == 4
+        assert flight.in_flight() == 0
+
+    def test_errors_reach_every_waiter(self):
+        flight = SingleFlight()
+
+        def boom():
+            time.sleep(0.1)
+            raise RuntimeError("judge down")
+
+        def call(i):
+            try:
+                flight.do("k", boom)
+            except RuntimeError as e:
+                return str(e)
+
+        assert _concurrently(3, call) == ["judge down"] * 3
+
+
+class TestOnDemand:
+    def test_normalizes_theme(self):
+        assert normalize_theme("  Dental   Clinics ") == "dental clinics"
+        assert normalize_theme("   ") is None
+
+    def test_identical_requests_coalesce(self):
+        calls = []
+        service = OnDemand(slow_run(calls), user_limit=0)
+        themes = ["Dentists", "dentists ", "DENTISTS", "dentists"]
+        results = _concurrently(4, lambda i: service.request(themes[i], f"user-{i}"))
+        assert calls == ["dentists"]
+        assert sorted(source for _, source in results) == ["run", "shared", "shared", "shared"]
+        assert service.stats()["runs_per_request"] == 0.25
+
+    def test_distinct_themes_run_separately(self):
+        calls = []
+        service = OnDemand(slow_run(calls, 0.05), user_limit=0)
+        _concurrently(2, lambda i: service.request(["dentists", "gardeners"][i], "u"))
+        assert sorted(calls) == ["dentists", "gardeners"]
+
+    def test_cache_serves_repeats(self):
+        calls = []
+        service = OnDemand(slow_run(calls, 0), cache_s=60, user_limit=0)
+        service.request("dentists", "a")
+        rendered, source = service.request("dentists", "b")
+        assert source == "cache"
+        assert rendered["title"] == "Idea for dentists"
+        assert len(calls) == 1
+
+    def test_cache_disabled(self):
+        calls = []
+        service = OnDemand(slow_run(calls, 0), cache_s=0, user_limit=0)
+        service.request("dentists", "a")
+        service.request("dentists", "a")
+        assert len(calls) == 2
+
+    def test_per_user_limit(self):
+        service = OnDemand(slow_run([], 0), user_limit=2, window_s=60)
+        service.request("a", "alice")
+        service.request("b", "alice")
+        with pytest.raises(RateLimited) as exc:
+            service.request("c", "alice")
+        assert 0 < exc.value.retry_after_s <= 60
+        service.request("c", "bob")
+        assert service.stats()["limited"] == 1
+
+    def test_limit_window_slides(self):
+        limiter = UserLimiter(1, window_s=0.05)
+        limiter.check("alice")
+        time.sleep(0.06)
+        limiter.check("alice")
+
+    def test_idle_users_are_forgotten(self):
+        limiter = UserLimiter(5, window_s=0.05)
+        for user in ("alice", "bob", "carol"):
+            limiter.check(user)
+        assert len(limiter) == 3
+        time.sleep(0.06)
+        limiter.check("dave")
+        assert len(limiter) == 1
+
+
+class TestBot:
+    def _update(self, text, user=7, chat=42):
+        return {"message": {"text": text, "from": {"id": user}, "chat": {"id": chat}}}
+
+    def test_parse_command(self):
+        assert bot.parse_command(self._update("/idea  dog walkers ")) == ("42", "7", "dog walkers")
+        assert bot.parse_command(self._update("/idea@IdeaBot")) == ("42", "7", None)
+        assert bot.parse_command(self._update("hello")) is None
+        assert bot.parse_command({"edited_message": {}}) is None
+
+    def test_replies_with_rendered_idea(self):
+        service = MagicMock()
+        service.request.return_value = (_rendered("dentists"), "run")
+        with patch.object(bot, "build_messages", return_value=["msg"]), \
+                patch.object(bot, "_reply") as reply:
+            bot._answer(service, "42", "7", "dentists")
+        service.request.assert_called_once_with("dentists", "7")
+        reply.assert_called_once_with("42", ["msg"])
+
+    def test_rate_limited_user_is_told_to_wait(self):
+        service = MagicMock()
+        service.request.side_effect = RateLimited("7", 600)
+        with patch.object(bot, "_reply") as reply:
+            bot._answer(service, "42", "7", None)
+        assert "10 min" in reply.call_args.args[1][0]
+
+    def test_secret_checked_when_set(self, monkeypatch):
+        assert bot.secret_ok(None)
+        monkeypatch.setenv("TELEGRAM_WEBHOOK_SECRET", "s3cret")
+        assert not bot.secret_ok("wrong")
+        assert bot.secret_ok("s3cret")
+
+
+class TestOnDemandRoutes:
+    def call(self, handler_module, service, path, method="GET", json=None, headers=None):
+        from flask import Flask, request
+
+        with patch.object(handler_module, "get_on_demand", return_value=service), \
+                Flask(__name__).test_request_context(
+                    path, method=method, json=json, headers=headers or {}):
+            response = handler_module.idea_refiner(request)
+        if isinstance(response, tuple):
+            return response[0], response[1]
+        return response, response.status_code
+
+    def test_idea_route_reports_source(self, handler_module):
+        service = OnDemand(slow_run([], 0), cache_s=60, user_limit=1)
+        response, status = self.call(handler_module, service, "/idea?theme=dentists&user=a")
+        assert status == 200
+        assert response.get_json()["title"] == "Idea for dentists"
+        assert response.headers["X-Idea-Source"] == "run"
+        response, status = self.call(handler_module, service, "/idea?theme=dentists&user=a")
+        assert status == 429
+        assert int(response.headers["Retry-After"]) > 0
+
+    def test_client_chosen_ids_do_not_dodge_the_limit(self, handler_module):
+        service = OnDemand(slow_run([], 0), cache_s=0, user_limit=1)
+        _, status = self.call(handler_module, service, "/idea?user=a", headers={"X-User-Id": "a"})
+        assert status == 200
+        _, status = self.call(handler_module, service, "/idea?user=b", headers={"X-User-Id": "b"})
+        assert status == 429
+
+    def test_trusted_proxy_address_is_used(self, handler_module, monkeypatch):
+        monkeypatch.setenv("TRUSTED_PROXY_HOPS", "1")
+        service = OnDemand(slow_run([], 0), cache_s=0, user_limit=1)
+        for spoofed in ("1.1.1.1", "2.2.2.2"):
+            _, status = self.call(handler_module, service, "/idea", headers={
+                "X-Forwarded-For": f"{spoofed}, 203.0.113.7"})
+        assert status == 429
+        _, status = self.call(handler_module, service, "/idea", headers={
+            "X-Forwarded-For": "198.51.100.2"})
+        assert status == 200
+
+    def test_telegram_webhook_hands_off(self, handler_module):
+        with patch.object(handler_module, "handle_update", return_value=True) as handle:
+            response, status = self.call(
+                handler_module, MagicMock(), "/telegram", "POST", json={"message": {}},
+            )
+        assert status == 200
+        assert response.get_json()["handled"] is True
+        handle.assert_called_once()
@@ -0,0 +1,154 @@
+import json
+import sqlite3
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from agents.idea_refiner.outbox import store, worker
+from agents.idea_refiner.outbox.store import Outbox
+from agents.idea_refiner.outbox.worker import MAX_ATTEMPTS, OutboxWorker, backoff
+from agents.idea_refiner.output.display import display_and_save
+from agents.idea_refiner.output.telegram import deliver_payload
+
+PAYLOAD = {"chat_id": "12345", "messages": ["<b>hello</b>"]}
+
+
+@pytest.fixture()
+def outbox(tmp_path):
+    box = Outbox(tmp_path / "outbox.db")
+    yield box
+    box.close()
+
+
+def _state():
+    return {
+        "run_id": "run-1",
+        "winner_label": "A",
+        "winning_idea": "**Product Name:** Queued",
+        "all_evals": [],
+        "winner_ev": None,
+        "ideas": {},
+        "start": time.time(),
+    }
+
+
+class TestOutbox:
+    def test_enqueue_dedupes_by_run_id(self, outbox):
+        assert outbox.enqueue("r1", PAYLOAD) is True
+        assert outbox.enqueue("r1", PAYLOAD) is False
+        assert outbox.stats()["depth"] == 1
+
+    def test_claim_leases_entries(self, outbox):
+        outbox.enqueue("r1", PAYLOAD)
+        (item,) = outbox.claim_due()
+        assert item["payload"] == PAYLOAD
+        assert outbox.claim_due() == []
+
+    def test_stats_report_depth_and_lag(self, outbox):
+        outbox.enqueue("r1", PAYLOAD)
+        outbox.enqueue("r2", PAYLOAD)
+        outbox.mark_delivered("r1")
+        stats = outbox.stats()
+        assert stats["depth"] == 1
+        assert stats["delivered"] == 1
+        assert stats["last_delivery_lag_s"] >= 0
+        assert stats["oldest_pending_age_s"] >= 0
+
+
+class TestOutboxWorker:
+    def test_delivers_due_entries(self, outbox):
+        deliver = MagicMock(return_value={"ok": True})
+        outbox.enqueue("r1", PAYLOAD)
+        assert OutboxWorker(outbox, deliver).run_once() == 1
+        deliver.assert_called_once_with(PAYLOAD, 0)
+        assert outbox.stats()["delivered"] == 1
+
+    def test_failure_is_retried_later(self, outbox):
+        deliver = MagicMock(return_value={"ok": False, "error": "502"})
+        outbox.enqueue("r1", PAYLOAD)
+        OutboxWorker(outbox, deliver).run_once()
+        assert outbox.stats()["depth"] == 1
+        assert outbox.next_due_in() > 0
+        assert outbox.claim_due() == []
+
+    def test_exception_counts_as_failure(self, outbox):
+        outbox.enqueue("r1", PAYLOAD)
+        OutboxWorker(outbox, MagicMock(side_effect=RuntimeError("down"))).run_once()
+        assert outbox.stats()["depth"] == 1
+
+    @patch("agents.idea_refiner.outbox.worker.backoff", return_value=0.0)
+    def test_gives_up_after_max_attempts(self, _, outbox):
+        deliver = MagicMock(return_value={"ok": False, "error": "gone"})
+        outbox.enqueue("r1", PAYLOAD)
+        w = OutboxWorker(outbox, deliver)
+        for _ in range(MAX_ATTEMPTS + 2):
+            w.run_once()
+        assert deliver.call_count == MAX_ATTEMPTS
+        assert outbox.stats()["dead"] == 1
+
+    @patch("agents.idea_refiner.outbox.worker.backoff", return_value=0.0)
+    def test_retry_resumes_after_the_last_sent_message(self, _, outbox, telegram_api):
+        payload = {"chat_id": "12345", "messages": ["<b>one</b>", "<b>two</b>", "<b>three</b>"]}
+        outbox.enqueue("r1", payload)
+        telegram_api.fail_next(400, after=1)
+        w = OutboxWorker(outbox, deliver_payload)
+        assert w.run_once() == 0
+        assert [m["text"] for m in telegram_api.sent] == ["<b>one</b>"]
+        assert w.run_once() == 1
+        assert [m["text"] for m in telegram_api.sent] == payload["messages"]
+        assert outbox.stats()["delivered"] == 1
+
+    def test_old_outbox_gains_sent_column(self, tmp_path):
+        path = tmp_path / "old.db"
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE outbox (run_id TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+            "status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0, "
+            "next_attempt REAL NOT NULL, created_at REAL NOT NULL, delivered_at REAL, "
+            "last_error TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO outbox (run_id, payload, next_attempt, created_at) VALUES (?, ?, 0, 0)",
+            ("r1", json.dumps(PAYLOAD)),
+        )
+        conn.commit()
+        conn.close()
+        box = Outbox(path)
+        try:
+            (item,) = box.claim_due()
+        finally:
+            box.close()
+        assert item["sent"] == 0
+
+    def test_backoff_grows_exponentially(self):
+        assert backoff(3) > backoff(2) > backoff(1)
+        assert backoff(50) <= worker.MAX_BACKOFF_S * 1.1
+
+
+class TestQueuedDelivery:
+    @pytest.fixture()
+    def queued(self, telegram_api, tmp_path, monkeypatch):
+        monkeypatch.setenv("OUTPUT_SINKS", "telegram")
+        monkeypatch.setenv("TELEGRAM_OUTBOX", str(tmp_path / "outbox.db"))
+        monkeypatch.setattr(store, "_outbox", None)
+        monkeypatch.setattr(worker, "_worker", None)
+        yield telegram_api
+        if worker._worker:
+            worker._worker.stop()
+        if store._outbox:
+            store._outbox.close()
+
+    def test_display_enqueues_instead_of_sending_inline(self, queued):
+        display_and_save("cooking", _state())
+        assert store._outbox.stats()["depth"] + store._outbox.stats()["delivered"] == 1
+        assert worker._worker.drain(timeout=5)
+        (sent,) = queued.sent
+        assert "Queued" in sent["text"]
+        assert store._outbox.stats()["delivered"] == 1
+
+    def test_same_run_is_delivered_once(self, queued):
+        display_and_save("cooking", _state())
+        display_and_save("cooking", _state())
+        assert worker._worker.drain(timeout=5)
+        assert len(queued.sent) == 1
@@ -1,25 +1,44 @@
-from unittest.mock import AsyncMock, patch, MagicMock
+import json
+import sqlite3
+import threading
+import time
+from unittest.mock import patch
 
-from agents.idea_refiner.output.telegram import _md_to_html, _build_messages, send_telegram_summary
+import pytest
+
+from agents.idea_refiner.output.console import console_sink
+from agents.idea_refiner.output.render import md_to_html, render_result
+from agents.idea_refiner.output.sinks import (
+    SINKS,
+    deliver_to_sinks,
+    enabled_sinks,
+    register_sink,
+)
+from agents.idea_refiner.output.telegram import build_messages, split_html, telegram_sink
+from agents.idea_refiner.output.telegram_client import get_telegram_client
+from tests.fake_telegram import html_error
 
 
 class TestMdToHtml:
     def test_bold_conversion(self):
-        assert _md_to_html("**hello**") == "<b>hello</b>"
+        assert md_to_html("**hello**") == "<b>hello</b>"
 
     def test_italic_conversion(self):
-        assert _md_to_html("_world_") == "<i>world</i>"
+        assert md_to_html("_world_") == "<i>world</i>"
 
     def test_bold_and_italic_together(self):
-        result = _md_to_html("**bold** and _italic_")
+        result = md_to_html("**bold** and _italic_")
         assert "<b>bold</b>" in result
         assert "<i>italic</i>" in result
 
     def test_no_conversion_for_plain_text(self):
-        assert _md_to_html("plain text") == "plain text"
+        assert md_to_html("plain text") == "plain text"
 
     def test_underscore_inside_word_not_converted(self):
-        assert _md_to_html("snake_case_var") == "snake_case_var"
+        assert md_to_html("snake_case_var") == "snake_case_var"
+
+    def test_escapes_html_special_characters(self):
+        assert md_to_html("**<Tool> & co**") == "<b>&lt;Tool&gt; &amp; co</b>"
 
 
 class TestBuildMessages:
@@ -36,95 +55,152 @@ class TestBuildMessages:
             "winner_ev": {"idea_label": "A", "explanation": "Great idea."},
         }
 
+    def _messages(self, theme, state, total_elapsed):
+        return build_messages(render_result(theme, state, total_elapsed, "2026-02-22"))
+
     def test_single_message_for_short_content(self):
-        msgs = _build_messages("cooking", self._make_state(), 42.0, "2026-02-22")
+        msgs = self._messages("cooking", self._make_state(), 42.0)
         assert len(msgs) == 1
         assert "Daily Idea Run" in msgs[0]
         assert "cooking" in msgs[0]
 
     def test_contains_scoreboard(self):
-        msgs = _build_messages(None, self._make_state(), 10.0, "2026-02-22")
+        msgs = self._messages(None, self._make_state(), 10.0)
         assert "Scoreboard" in msgs[0]
 
     def test_contains_winner_trophy(self):
-        msgs = _build_messages(None, self._make_state(), 10.0, "2026-02-22")
+        msgs = self._messages(None, self._make_state(), 10.0)
         full = "".join(msgs)
         assert "🏆" in full
 
     def test_long_idea_splits_into_multiple_messages(self):
         long_idea = "x" * 5000
-        msgs = _build_messages("theme", self._make_state(long_idea), 10.0, "2026-02-22")
+        msgs = self._messages("theme", self._make_state(long_idea), 10.0)
         assert len(msgs) > 1
 
     def test_no_theme_shows_open(self):
-        msgs = _build_messages(None, self._make_state(), 5.0, "2026-02-22")
+        msgs = self._messages(None, self._make_state(), 5.0)
         assert "Open (no theme)" in msgs[0]
 
     def test_html_formatting_applied(self):
         state = self._make_state("**Bold Product**")
-        msgs = _build_messages("t", state, 5.0, "2026-02-22")
+        msgs = self._messages("t", state, 5.0)
         full = "".join(msgs)
         assert "<b>Bold Product</b>" in full
 
 
-class TestSendTelegram:
-    def _make_state(self):
-        return {
+class TestSplitHtml:
+    def test_short_text_is_one_message(self):
+        assert split_html("<b>hi</b>", limit=100) == ["<b>hi</b>"]
+
+    def test_prefers_paragraph_boundaries(self):
+        text = "para one\n\npara two is here\n\npara three"
+        chunks = split_html(text, limit=30)
+        assert chunks == ["para one\n\npara two is here", "para three"]
+
+    def test_never_splits_inside_a_tag(self):
+        text = "x" * 70 + "<b>bold</b>" + "y" * 70
+        for chunk in split_html(text, limit=80):
+            assert html_error(chunk) is None
+
+    def test_reopens_tags_across_messages(self):
+        text = "<b>" + " ".join(["word"] * 60) + "</b>"
+        chunks = split_html(text, limit=100)
+        assert len(chunks) > 1
+        assert all(c.startswith("<b>") and c.endswith("</b>") for c in chunks)
+        assert all(len(c) <= 100 for c in chunks)
+
+    def test_never_splits_an_entity(self):
+        text = "a" * 60 + "&amp;" + "b" * 60
+        for chunk in split_html(text, limit=90):
+            assert html_error(chunk) is None
+
+
+class TestTelegramClient:
+    def _messages(self, winning_idea="**Product Name:** TestProd"):
+        state = {
             "winner_label": "A",
-            "winning_idea": "**Product Name:** TestProd",
+            "winning_idea": winning_idea,
             "all_evals": [
                 {"idea_label": "A", "acquisition_score": 9, "demand_score": 9,
                  "build_score": 9, "explanation": "Great."},
             ],
             "winner_ev": {"idea_label": "A", "explanation": "Great."},
         }
+        return build_messages(render_result("cooking", state, 10.0, "2026-02-22"))
+
+    def test_sends_messages(self, telegram_api):
+        report = get_telegram_client("test-token").send("12345", self._messages())
+
+        assert report["ok"] is True
+        assert report["latency_s"] >= 0
+        (sent,) = telegram_api.sent
+        assert sent["chat_id"] == "12345"
+        assert sent["parse_mode"] == "HTML"
+        assert "Daily Idea Run" in sent["text"]
+
+    def test_long_idea_is_split_into_valid_messages(self, telegram_api):
+        messages = split_html("\n\n".join(
+            f"<b>Section {i}:</b> " + "lorem ipsum &lt;dolor&gt; &amp; sit " * 40 for i in range(8)
+        ))
+        report = get_telegram_client("test-token").send("12345", messages)
 
-    @patch("agents.idea_refiner.output.telegram.os.getenv", return_value=None)
-    def test_skips_when_no_token(self, mock_getenv):
-        send_telegram_summary("theme", {"winner_label": "A"}, 10.0, "2026-02-22")
-        mock_getenv.assert_called()
+        assert report["ok"] is True
+        assert len(telegram_api.sent) == report["messages"] > 1
+        assert all(html_error(m["text"]) is None for m in telegram_api.sent)
 
-    @patch("agents.idea_refiner.output.telegram.Bot")
-    @patch("agents.idea_refiner.output.telegram.os.getenv", side_effect=["fake-token", "12345"])
-    def test_sends_message_when_configured(self, mock_getenv, mock_bot_cls):
-        mock_bot = MagicMock()
-        mock_bot.send_message = AsyncMock()
-        mock_bot_cls.return_value = mock_bot
+    def test_waits_out_retry_after(self, telegram_api):
+        telegram_api.fail_next(429, retry_after=1)
+        report = get_telegram_client("test-token").send("12345", self._messages())
 
-        send_telegram_summary("cooking", self._make_state(), 10.0, "2026-02-22")
+        assert report["ok"] is True
+        assert report["attempts"] == 2
+        assert report["latency_s"] >= 1
+        assert len(telegram_api.sent) == 1
 
-        mock_bot_cls.assert_called_once_with(token="fake-token")
-        mock_bot.send_message.assert_called_once()
-        call_kwargs = mock_bot.send_message.call_args.kwargs
-        assert call_kwargs["chat_id"] == "12345"
-        assert "Daily Idea Run" in call_kwargs["text"]
+    def test_retries_server_errors(self, telegram_api, monkeypatch):
+        monkeypatch.setattr("agents.idea_refiner.output.telegram_client.BACKOFF_S", 0.01)
+        telegram_api.fail_next(502, times=2)
+        report = get_telegram_client("test-token").send("12345", self._messages())
+        assert report["ok"] is True
+        assert report["attempts"] == 3
 
-    @patch("agents.idea_refiner.output.telegram.Bot")
-    @patch("agents.idea_refiner.output.telegram.os.getenv", side_effect=["fake-token", "12345"])
-    def test_sends_multiple_messages_for_long_idea(self, mock_getenv, mock_bot_cls):
-        mock_bot = MagicMock()
-        mock_bot.send_message = AsyncMock()
-        mock_bot_cls.return_value = mock_bot
+    def test_handles_send_failure_gracefully(self, telegram_api):
+        telegram_api.fail_next(400)
+        report = get_telegram_client("test-token").send("12345", self._messages())
+        assert report["ok"] is False
+        assert telegram_api.requests == 1
 
-        state = self._make_state()
-        state["winning_idea"] = "x" * 5000
-        send_telegram_summary("theme", state, 5.0, "2026-02-22")
+    def test_reuses_one_client(self, telegram_api):
+        client = get_telegram_client("test-token")
+        client.send("12345", self._messages())
+        again = get_telegram_client("test-token")
+        again.send("12345", self._messages())
+        assert again is client
+        assert len(telegram_api.sent) == 2
 
-        assert mock_bot.send_message.call_count > 1
 
-    @patch("agents.idea_refiner.output.telegram.Bot")
-    @patch("agents.idea_refiner.output.telegram.os.getenv", side_effect=["fake-token", "12345"])
-    def test_handles_send_failure_gracefully(self, mock_getenv, mock_bot_cls):
-        mock_bot = MagicMock()
-        mock_bot.send_message = AsyncMock(side_effect=RuntimeError("network error"))
-        mock_bot_cls.return_value = mock_bot
+class TestTelegramSink:
+    def test_skips_when_no_token(self, telegram_api, monkeypatch):
+        monkeypatch.delenv("TELEGRAM_BOT_TOKEN")
+        telegram_sink(_rendered())
+        assert telegram_api.requests == 0
 
-        send_telegram_summary("theme", self._make_state(), 5.0, "2026-02-22")
+    def test_sends_inline_without_outbox(self, telegram_api, monkeypatch):
+        monkeypatch.delenv("TELEGRAM_OUTBOX", raising=False)
+        telegram_sink(_rendered())
+        (sent,) = telegram_api.sent
+        assert "SinkMate" in sent["text"]
+
+    def test_failed_delivery_raises(self, telegram_api, monkeypatch):
+        monkeypatch.delenv("TELEGRAM_OUTBOX", raising=False)
+        telegram_api.fail_next(400)
+        with pytest.raises(RuntimeError):
+            telegram_sink(_rendered())
 
 
 class TestConsole:
-    def test_print_results_does_not_crash(self, capsys):
-        from agents.idea_refiner.output.console import print_results
+    def test_prints_scoreboard_and_idea(self, capsys):
         state = {
             "winner_label": "A",
             "winning_idea": "A great product idea.",
@@ -136,20 +212,111 @@ class TestConsole:
             ],
             "winner_ev": {"idea_label": "A", "explanation": "Nice."},
         }
-        print_results("cooking", state, 12.5, "2026-02-22")
+        console_sink(render_result("cooking", state, 12.5, "2026-02-22"))
         output = capsys.readouterr().out
         assert "DAILY BUSINESS IDEA" in output
         assert "GPT-5.2" in output
         assert "A great product idea." in output
 
-    def test_print_results_no_evals(self, capsys):
-        from agents.idea_refiner.output.console import print_results
+    def test_no_evals(self, capsys):
         state = {
             "winner_label": "A",
             "winning_idea": "Fallback idea.",
             "all_evals": [],
             "winner_ev": None,
         }
-        print_results(None, state, 5.0, "2026-02-22")
+        console_sink(render_result(None, state, 5.0, "2026-02-22"))
         output = capsys.readouterr().out
         assert "Fallback idea." in output
+
+
+def _rendered(**overrides):
+    state = {
+        "run_id": "run-7",
+        "winner_label": "A",
+        "winning_idea": "**Product Name:** SinkMate\n\nPipes ideas everywhere.",
+        "all_evals": [
+            {"idea_label": "B", "acquisition_score": 6, "demand_score": 7,
+             "build_score": 8, "explanation": "Okay."},
+            {"idea_label": "A", "acquisition_score": 9, "demand_score": 9,
+             "build_score": 9, "explanation": "Great."},
+        ],
+        "start": time.time(),
+    }
+    state.update(overrides)
+    return render_result("pets", state, 3.0, "2026-02-22")
+
+
+class TestRenderResult:
+    def test_ranks_and_names_once(self):
+        rendered = _rendered()
+        assert [e["idea_label"] for e in rendered["ranked"]] == ["A", "B"]
+        assert rendered["ranked"][0]["total"] == 27
+        assert rendered["winner_ev"]["explanation"] == "Great."
+        assert rendered["title"] == "SinkMate"
+        assert "<b>Product Name:</b>" in rendered["idea_html"]
+        assert rendered["result"]["run_id"] == "run-7"
+
+
+class TestSinks:
+    def test_enabled_sinks_from_env(self, monkeypatch):
+        monkeypatch.setenv("OUTPUT_SINKS", "console, jsonl,nope")
+        assert enabled_sinks() == ["console", "jsonl"]
+
+    def test_runs_sinks_concurrently_and_reports_each(self):
+        def slow(_):
+            time.sleep(0.3)
+
+        register_sink("slow_a", slow)
+        register_sink("slow_b", slow)
+        try:
+            start = time.monotonic()
+            report = deliver_to_sinks(_rendered(), ["slow_a", "slow_b"])
+            assert time.monotonic() - start < 0.55
+        finally:
+            SINKS.pop("slow_a")
+            SINKS.pop("slow_b")
+        assert all(r["ok"] and r["latency_s"] >= 0.3 for r in report.values())
+
+    def test_slow_sink_times_out_without_holding_others(self):
+        release = threading.Event()
+        register_sink("stuck", lambda _: release.wait(5))
+        try:
+            start = time.monotonic()
+            report = deliver_to_sinks(_rendered(), ["stuck", "console"], timeout=0.2)
+            assert time.monotonic() - start < 1
+        finally:
+            release.set()
+            SINKS.pop("stuck")
+        assert report["stuck"] == {"ok": False, "latency_s": 0.2, "error": "timed out"}
+        assert report["console"]["ok"] is True
+
+    def test_failing_sink_is_reported(self, monkeypatch):
+        monkeypatch.delenv("RESULTS_JSONL", raising=False)
+        report = deliver_to_sinks(_rendered(), ["jsonl"])
+        assert report["jsonl"]["ok"] is False
+        assert "RESULTS_JSONL" in report["jsonl"]["error"]
+
+    def test_local_sinks_write_results(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RESULTS_JSONL", str(tmp_path / "r.jsonl"))
+        monkeypatch.setenv("RESULTS_DB", str(tmp_path / "r.db"))
+        monkeypatch.setenv("DIGEST_MARKDOWN", str(tmp_path / "digest.md"))
+        report = deliver_to_sinks(_rendered(), ["jsonl", "sqlite", "markdown"])
+        assert all(r["ok"] for r in report.values()), report
+
+        (line,) = (tmp_path / "r.jsonl").read_text().splitlines()
+        assert json.loads(line)["run_id"] == "run-7"
+        conn = sqlite3.connect(tmp_path / "r.db")
+        assert conn.execute("SELECT title, total FROM results").fetchone() == ("SinkMate", 27)
+        digest = (tmp_path / "digest.md").read_text()
+        assert "## 2026-02-22 — SinkMate" in digest
+        assert "(27/30)" in digest
+
+    @patch("httpx.post")
+    def test_webhook_posts_result(self, mock_post, monkeypatch):
+        monkeypatch.setenv("WEBHOOK_URL", "http://hooks.test/idea")
+        report = deliver_to_sinks(_rendered(), ["webhook"])
+        assert report["webhook"]["ok"] is True
+        url = mock_post.call_args.args[0]
+        assert url == "http://hooks.test/idea"
+        assert mock_post.call_args.kwargs["json"]["winning_idea"].startswith("**Product")
@@ -6,7 +6,9 @@ from agents.idea_refiner.pipeline.retry import prepare_retries
 from agents.idea_refiner.pipeline.verdict import apply_verdict
 from agents.idea_refiner.pipeline.generate_step import generate_needed
 from agents.idea_refiner.pipeline.run_round import run_round
+from agents.idea_refiner.pipeline.speculate import settle_drafts, start_drafts
 from agents.idea_refiner.config import MAX_RETRIES
+from agents.idea_refiner.idea import idea_of
 
 
 class TestInitState:
@@ -14,7 +16,7 @@ class TestInitState:
     def test_returns_all_required_keys(self, mock_get_client):
         state = init_state("cooking")
         required = {"attempts", "messages", "ideas", "needs_gen", "winner_label",
-                     "winning_idea", "winner_ev", "all_evals", "start"}
+                     "winning_idea", "winner_ev", "all_evals", "start", "run_id", "history"}
         assert required.issubset(state.keys())
 
     @patch("agents.idea_refiner.pipeline.state.get_client")
@@ -28,6 +30,13 @@ class TestInitState:
         state = init_state("fitness")
         assert all(state["needs_gen"].values())
 
+    @patch("agents.idea_refiner.pipeline.state.get_client")
+    def test_custom_lanes(self, mock_get_client):
+        gpt = {"name": "GPT", "generate": None}
+        state = init_state(None, {"A": gpt, "B": gpt, "C": gpt})
+        assert set(state["attempts"]) == {"A", "B", "C"}
+        assert state["lanes"]["C"] is gpt
+
 
 class TestAccept:
     def test_accept_sets_winner(self, pipeline_state, fake_verdict_accept):
@@ -54,6 +63,15 @@ class TestAccept:
         accept(verdict, pipeline_state)
         assert pipeline_state["winning_idea"] == "my raw idea"
 
+    def test_canonical_judge_keeps_generated_markdown(
+        self, populated_state, fake_verdict_accept, monkeypatch,
+    ):
+        monkeypatch.setenv("JUDGE_IDEA_FORMAT", "canonical")
+        fake_verdict_accept["winning_idea"] = "Name: IdeaA\nPitch: A is great."
+        accept(fake_verdict_accept, populated_state)
+        assert populated_state["winning_idea"] == populated_state["ideas"]["A"]
+        assert idea_of(populated_state["winning_idea"]).name == "IdeaA"
+
 
 class TestPrepareRetries:
     def test_retries_set_needs_gen_and_append_feedback(self, populated_state, fake_verdict_reject):
@@ -100,6 +118,81 @@ class TestPrepareRetries:
         assert populated_state["winner_label"] == "B"
 
 
+def _judged(state, verdict, rounds=2):
+    state["history"] = [{
+        "round": rnd, "lanes": {label: {"ok": True, "kept": False} for label in ("A", "B")},
+        "evaluations": verdict["evaluations"],
+    } for rnd in range(1, rounds + 1)]
+    state["attempts"] = {"A": rounds, "B": rounds}
+    return state
+
+
+class TestLaneRetirement:
+    def test_off_keeps_current_behaviour(self, populated_state, fake_verdict_reject):
+        prepare_retries(fake_verdict_reject, _judged(populated_state, fake_verdict_reject))
+        assert populated_state["needs_gen"] == {"A": True, "B": True}
+        assert "retirement" not in populated_state
+
+    def test_hopeless_lanes_retire_and_end_the_run(
+        self, populated_state, fake_verdict_reject, monkeypatch,
+    ):
+        monkeypatch.setenv("LANE_RETIREMENT", "probability")
+        state = _judged(populated_state, fake_verdict_reject)
+        done = prepare_retries(fake_verdict_reject, state)
+        assert done is True
+        assert state["needs_gen"] == {"A": False, "B": False}
+        decisions = state["retirement"]["decisions"]
+        assert [d["decision"] for d in decisions] == ["retire", "retire"]
+        assert decisions[0]["p_pass"] < 0.1
+        assert state["winner_label"] == "A"
+
+    def test_first_round_is_never_retired(
+        self, populated_state, fake_verdict_reject, monkeypatch,
+    ):
+        monkeypatch.setenv("LANE_RETIREMENT", "probability")
+        state = _judged(populated_state, fake_verdict_reject, rounds=1)
+        assert prepare_retries(fake_verdict_reject, state) is False
+        assert state["needs_gen"] == {"A": True, "B": True}
+        assert {d["decision"] for d in state["retirement"]["decisions"]} == {"continue"}
+
+    def test_promising_lane_continues(self, populated_state, fake_verdict_reject, monkeypatch):
+        monkeypatch.setenv("LANE_RETIREMENT", "probability")
+        fake_verdict_reject["evaluations"][1].update(
+            acquisition_score=9, demand_score=8, build_score=9,
+        )
+        state = _judged(populated_state, fake_verdict_reject)
+        prepare_retries(fake_verdict_reject, state)
+        assert state["needs_gen"] == {"A": False, "B": True}
+        assert state["messages"]["B"][-1]["role"] == "user"
+
+    def test_restart_starts_a_fresh_conversation(
+        self, populated_state, fake_verdict_reject, monkeypatch,
+    ):
+        monkeypatch.setenv("LANE_RETIREMENT", "probability")
+        monkeypatch.setenv("LANE_REASSIGN", "restart")
+        state = _judged(populated_state, fake_verdict_reject)
+        assert prepare_retries(fake_verdict_reject, state) is False
+        assert state["needs_gen"] == {"A": True, "B": True}
+        assert state["messages"]["A"] == []
+
+    def test_promote_hands_the_lane_to_the_best_model(
+        self, populated_state, fake_verdict_reject, monkeypatch,
+    ):
+        monkeypatch.setenv("LANE_RETIREMENT", "probability")
+        monkeypatch.setenv("LANE_REASSIGN", "promote")
+        strong, weak = {"name": "Strong"}, {"name": "Weak"}
+        populated_state["lanes"] = {"A": weak, "B": strong}
+        fake_verdict_reject["evaluations"][1].update(
+            acquisition_score=9, demand_score=8, build_score=9,
+        )
+        state = _judged(populated_state, fake_verdict_reject)
+        prepare_retries(fake_verdict_reject, state)
+        assert state["lanes"]["A"] is strong
+        (decision,) = [d for d in state["retirement"]["decisions"] if d["label"] == "A"]
+        assert decision["decision"] == "promote"
+        assert decision["next_model"] == "Strong"
+
+
 class TestApplyVerdict:
     def test_none_verdict_falls_back_to_A(self, populated_state):
         done = apply_verdict(None, populated_state)
@@ -152,6 +245,88 @@ class TestGenerateNeeded:
         assert pipeline_state["messages"]["A"][1]["content"] == "user!"
 
 
+    @patch("agents.idea_refiner.pipeline.generate_step.generate_parallel")
+    def test_generates_one_task_per_allocated_lane(self, mock_parallel, pipeline_state):
+        gpt = {"name": "GPT", "generate": None}
+        pipeline_state["lanes"] = {"A": gpt, "B": gpt, "C": gpt}
+        for key in ("attempts", "messages", "needs_gen"):
+            pipeline_state[key]["C"] = pipeline_state[key]["A"]
+        mock_parallel.return_value = [("A", "a", 1.0), ("B", "b", 1.0), ("C", "c", 1.0)]
+        generate_needed(pipeline_state, "sys", "usr")
+        (tasks,), _ = mock_parallel.call_args
+        assert [t[0] for t in tasks] == ["A", "B", "C"]
+        assert all(t[1] is gpt for t in tasks)
+        assert pipeline_state["history"][-1]["lanes"]["C"]["model"] == "GPT"
+
+
+class TestRoundHistory:
+    @patch("agents.idea_refiner.pipeline.generate_step.generate_parallel")
+    def test_generation_records_lanes(self, mock_parallel, pipeline_state):
+        mock_parallel.return_value = [("A", "idea A", 1.25), ("B", None, 2.0)]
+        generate_needed(pipeline_state, "sys", "usr")
+        lanes = pipeline_state["history"][-1]["lanes"]
+        assert lanes["A"]["latency_s"] == 1.25
+        assert lanes["A"]["idea"] == "idea A"
+        assert lanes["B"]["ok"] is False
+
+    @patch("agents.idea_refiner.pipeline.judge_step.judge_ideas")
+    def test_judging_records_verdict_and_gate_override(self, mock_judge, populated_state):
+        from agents.idea_refiner.pipeline.judge_step import judge_and_log
+
+        mock_judge.return_value = {
+            "evaluations": [
+                {"idea_label": "A", "acquisition_score": 8, "demand_score": 9,
+                 "build_score": 9, "explanation": "close"},
+            ],
+            "verdict": "accept",
+            "winner": "A",
+            "winning_idea": "x",
+            "rejection_feedback": {},
+        }
+        judge_and_log(populated_state)
+        record = populated_state["history"][-1]
+        assert record["verdict"] == "reject_all"
+        assert record["gate_override"] is True
+        assert record["evaluations"][0]["idea_label"] == "A"
+
+
+class TestProgressEvents:
+    @patch("agents.idea_refiner.pipeline.generate_step.generate_parallel")
+    def test_lane_generated_carries_latency(self, mock_parallel, pipeline_state, progress_events):
+        mock_parallel.return_value = [("A", "idea A", 1.25), ("B", None, 2.0)]
+        generate_needed(pipeline_state, "sys", "usr")
+        lanes = {d["label"]: d for e, d in progress_events if e == "lane_generated"}
+        assert lanes["A"]["latency_s"] == 1.25 and lanes["A"]["ok"] is True
+        assert lanes["B"]["ok"] is False
+
+    @patch("agents.idea_refiner.pipeline.judge_step.judge_ideas")
+    def test_judge_verdict_carries_scores(
+        self, mock_judge, populated_state, fake_verdict_accept, progress_events
+    ):
+        from agents.idea_refiner.pipeline.judge_step import judge_and_log
+
+        mock_judge.return_value = fake_verdict_accept
+        judge_and_log(populated_state)
+        (event, data), = progress_events
+        assert event == "judge_verdict"
+        assert data["verdict"] == "accept"
+        assert {row["label"] for row in data["scores"]} == {"A", "B"}
+
+    def test_retry_and_winner_events(self, populated_state, fake_verdict_reject, progress_events):
+        prepare_retries(fake_verdict_reject, populated_state)
+        assert [e for e, _ in progress_events] == ["retry_queued", "retry_queued"]
+        progress_events.clear()
+        populated_state["attempts"] = {"A": MAX_RETRIES + 1, "B": MAX_RETRIES + 1}
+        prepare_retries(fake_verdict_reject, populated_state)
+        (event, data), = progress_events
+        assert event == "winner" and data["fallback"] is True
+
+    def test_no_listener_is_a_no_op(self, pipeline_state, fake_verdict_accept):
+        pipeline_state["ideas"] = {"A": "a", "B": "b"}
+        accept(fake_verdict_accept, pipeline_state)
+        assert pipeline_state["winner_label"] == "A"
+
+
 class TestRunRound:
     @patch("agents.idea_refiner.pipeline.run_round.apply_verdict")
     @patch("agents.idea_refiner.pipeline.run_round.judge_and_log")
@@ -167,3 +342,84 @@ class TestRunRound:
         mock_judge.assert_called_once_with(state)
         mock_verdict.assert_called_once()
         assert result is True
+
+
+def _drafting_lanes(state, ideas):
+    """Lanes whose model returns the next idea from ``ideas`` and reports token usage."""
+    from agents.idea_refiner.generation.metering import record_call
+
+    def generate(messages):
+        record_call({"total_tokens": 100})
+        return ideas.pop(0)
+
+    model = {"name": "GPT", "generate": generate}
+    state["lanes"] = {"A": model, "B": model}
+    state["needs_gen"] = {"A": True, "B": True}
+    state["meter"] = {"total_tokens": 0}
+    state["history"] = [{"round": 1, "lanes": {}, "verdict": "reject_all",
+                         "feedback": {"A": "Weak demand.", "B": "Too niche."}}]
+    return state
+
+
+class TestSpeculation:
+    def test_off_by_default(self, populated_state):
+        start_drafts(populated_state)
+        assert "drafts" not in populated_state
+
+    def test_direct_draft_replaces_generation(self, populated_state, monkeypatch):
+        monkeypatch.setenv("SPECULATE", "direct")
+        state = _drafting_lanes(populated_state, ["draft", "draft"])
+        start_drafts(state)
+        state["needs_gen"] = {"A": True, "B": False}
+        settle_drafts(state, done=False)
+        with patch("agents.idea_refiner.pipeline.generate_step.generate_parallel") as gen:
+            generate_needed(state, "sys", "usr")
+        gen.assert_not_called()
+        assert state["ideas"]["A"] == "draft"
+        assert state["history"][-1]["lanes"]["A"]["speculative"] is True
+        assert state["messages"]["A"][-2]["content"].startswith("Assume a demanding judge")
+        stats = state["speculation"]
+        assert stats["started"] == 2 and stats["used"] == 1 and stats["hit_rate"] == 0.5
+
+    def test_refine_continues_from_draft_with_feedback(self, populated_state, monkeypatch):
+        monkeypatch.setenv("SPECULATE", "refine")
+        state = _drafting_lanes(populated_state, ["draft A", "draft B"])
+        start_drafts(state)
+        state["needs_gen"] = {"A": True, "B": False}
+        settle_drafts(state, done=False)
+        with patch("agents.idea_refiner.pipeline.generate_step.generate_parallel") as gen:
+            gen.return_value = [("A", "refined", 1.0)]
+            generate_needed(state, "sys", "usr")
+        (tasks,), _ = gen.call_args
+        draft, refine, answer = tasks[0][2][-3:]
+        assert draft["role"] == "assistant"
+        assert "Weak demand." in refine["content"]
+        assert answer == {"role": "assistant", "content": "refined"}
+
+    def test_accept_wastes_drafts_and_books_tokens(self, populated_state, monkeypatch):
+        monkeypatch.setenv("SPECULATE", "direct")
+        state = _drafting_lanes(populated_state, ["draft", "draft"])
+        start_drafts(state)
+        for future in state["drafts"].values():
+            future.result()
+        settle_drafts(state, done=True)
+        stats = state["speculation"]
+        assert state["drafts"] == {}
+        assert stats["wasted"] == 2 and stats["used"] == 0
+        assert stats["wasted_tokens"] == 200
+        assert state["meter"]["total_tokens"] == 200
+
+    def test_skips_lanes_out_of_retries(self, populated_state, monkeypatch):
+        monkeypatch.setenv("SPECULATE", "direct")
+        state = _drafting_lanes(populated_state, ["draft"])
+        state["attempts"]["B"] = 3
+        start_drafts(state)
+        assert list(state["drafts"]) == ["A"]
+
+    def test_skips_lanes_that_kept_their_idea(self, populated_state, monkeypatch):
+        monkeypatch.setenv("SPECULATE", "direct")
+        state = _drafting_lanes(populated_state, ["draft"])
+        state["needs_gen"]["B"] = False
+        start_drafts(state)
+        assert list(state["drafts"]) == ["A"]
+        assert state["speculation"]["started"] == 1
@@ -0,0 +1,165 @@
+import time
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from agents.idea_refiner.pool import filler
+from agents.idea_refiner.pool.filler import fill_pool
+from agents.idea_refiner.pool.store import IdeaPool
+from agents.idea_refiner.server import run
+
+TODAY = date(2026, 3, 10)
+
+
+@pytest.fixture()
+def pool(tmp_path):
+    p = IdeaPool(tmp_path / "pool.db", max_size=3)
+    yield p
+    p.close()
+
+
+def _rendered(title="Pooled"):
+    return {"title": title, "result": {"theme": "dentists", "title": title}}
+
+
+def _accepted_state(fake_verdict_accept, populated_state):
+    populated_state.update(
+        run_id="run-1",
+        winner_label="A",
+        winning_idea=populated_state["ideas"]["A"],
+        all_evals=fake_verdict_accept["evaluations"],
+        history=[{"round": 1, "verdict": "accept"}],
+    )
+    return populated_state
+
+
+class TestIdeaPool:
+    def test_take_claims_the_days_entry_once(self, pool):
+        day = date.today()
+        assert pool.put(day, "dentists", _rendered(), 25)
+        entry = pool.take(day)
+        assert entry["rendered"]["title"] == "Pooled"
+        assert entry["theme"] == "dentists"
+        assert pool.take(day) is None
+
+    def test_theme_request_takes_best_entry_with_that_theme(self, pool):
+        day = date.today()
+        pool.put(day, "dentists", _rendered("Low"), 20)
+        pool.put(day, "dentists", _rendered("High"), 28)
+        pool.put(day, "gardeners", _rendered("Other"), 30)
+        assert pool.take(day, "dentists")["rendered"]["title"] == "High"
+
+    def test_theme_request_never_takes_a_later_days_entry(self, pool):
+        day = date.today()
+        pool.put(day + timedelta(days=1), "dentists", _rendered("Tomorrow"), 28)
+        assert pool.take(day, "dentists") is None
+        assert pool.ready_days() == [(day + timedelta(days=1)).isoformat()]
+
+    def test_put_refuses_when_full(self, pool):
+        day = date.today()
+        for offset in range(3):
+            assert pool.put(day + timedelta(days=offset), None, _rendered(), 20)
+        assert pool.put(day + timedelta(days=3), None, _rendered(), 20) is False
+
+    def test_expired_entries_are_not_served(self, pool):
+        yesterday = date.today() - timedelta(days=1)
+        pool.put(yesterday, None, _rendered(), 20)
+        assert pool.size() == 0
+        assert pool.take(yesterday) is None
+        assert pool.evict() == 1
+
+    def test_stats_track_hit_rate_and_age(self, pool):
+        day = date.today()
+        pool.put(day, None, _rendered(), 20)
+        pool.take(day)
+        pool.take(day)
+        stats = pool.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["avg_served_age_s"] >= 0
+        assert stats["size"] == 0
+
+
+class TestFillPool:
+    def test_fills_each_upcoming_day(self, pool, fake_verdict_accept, populated_state):
+        state = _accepted_state(fake_verdict_accept, populated_state)
+        with patch.object(filler, "run_pipeline", return_value=state) as pipeline:
+            report = fill_pool(pool, days=2)
+        assert pipeline.call_count == 2
+        assert len(report["filled"]) == 2
+        assert pool.take(date.today())["rendered"]["title"] == "IdeaA"
+
+    def test_skips_ready_days_and_rejects_fallbacks(self, pool, populated_state):
+        today = date.today()
+        pool.put(today, None, _rendered(), 20)
+        populated_state["history"] = [{"round": 3, "verdict": "reject"}]
+        with patch.object(filler, "run_pipeline", return_value=populated_state) as pipeline:
+            report = fill_pool(pool, days=2, today=today)
+        assert pipeline.call_count == 1
+        assert report["skipped"] == [today.isoformat()]
+        assert report["rejected"] == [(today + timedelta(days=1)).isoformat()]
+        assert pool.size() == 1
+
+    def test_stops_when_full(self, pool, fake_verdict_accept, populated_state):
+        state = _accepted_state(fake_verdict_accept, populated_state)
+        with patch.object(filler, "run_pipeline", return_value=state):
+            report = fill_pool(pool, days=5, today=date.today())
+        assert len(report["filled"]) == 3
+        assert report["full"] is True
+
+    def test_prompts_for_each_days_theme(self, pool, fake_verdict_accept, populated_state):
+        state = _accepted_state(fake_verdict_accept, populated_state)
+        prompt = ("dentists", "sys", "usr")
+        with patch.object(filler, "get_idea_prompt", return_value=prompt) as get_prompt, \
+                patch.object(filler, "run_pipeline", return_value=state) as pipeline:
+            fill_pool(pool, days=2, today=TODAY)
+        assert [c.args[0] for c in get_prompt.call_args_list] == [TODAY, TODAY + timedelta(days=1)]
+        pipeline.assert_called_with("dentists", "sys", "usr")
+
+
+class TestPoolServing:
+    def test_hit_delivers_without_running(self, pool):
+        pool.put(date.today(), "dentists", _rendered(), 25)
+        with patch.object(run, "get_pool", return_value=pool), \
+                patch.object(run, "deliver_to_sinks", return_value={"console": "ok"}) as deliver, \
+                patch.object(run, "run_pipeline") as pipeline:
+            result = run.run_request()
+        pipeline.assert_not_called()
+        deliver.assert_called_once_with(_rendered())
+        assert result["title"] == "Pooled"
+        assert result["sinks"] == {"console": "ok"}
+        assert result["pool"]["for_date"] == date.today().isoformat()
+
+    def test_miss_runs_live(self, pool):
+        pool.put(date.today() + timedelta(days=1), "dentists", _rendered("Tomorrow"), 25)
+        with patch.object(run, "get_pool", return_value=pool), \
+                patch.object(run, "get_idea_prompt") as get_prompt, \
+                patch.object(run, "run_pipeline", return_value={"start": time.time()}) as live, \
+                patch.object(run, "display_and_save", return_value={}), \
+                patch.object(run, "build_result", return_value={"title": "Live"}):
+            result = run.run_request("dentists")
+        assert result["title"] == "Live"
+        assert pool.stats()["misses"] == 1
+        get_prompt.assert_not_called()
+        assert live.call_args.args[0] == "dentists"
+        assert pool.size() == 1
+
+    def test_miss_without_theme_runs_todays_prompt(self, pool):
+        prompt = ("gardeners", "sys", "usr")
+        with patch.object(run, "get_pool", return_value=pool), \
+                patch.object(run, "get_idea_prompt", return_value=prompt) as get_prompt, \
+                patch.object(run, "run_pipeline", return_value={"start": time.time()}) as live, \
+                patch.object(run, "display_and_save", return_value={}), \
+                patch.object(run, "build_result", return_value={"title": "Live"}):
+            run.run_request()
+        get_prompt.assert_called_once_with(date.today())
+        live.assert_called_once_with("gardeners", "sys", "usr")
+
+    def test_hit_emits_progress_event(self, pool, progress_events):
+        pool.put(date.today(), None, _rendered(), 25)
+        with patch.object(run, "get_pool", return_value=pool), \
+                patch.object(run, "deliver_to_sinks", return_value={}):
+            run.run_request()
+        assert [e for e, _ in progress_events] == ["pool_hit"]
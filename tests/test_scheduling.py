@@ -0,0 +1,340 @@
+import random
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from agents.idea_refiner.config import MAX_RETRIES, RANDOM_THEMES
+from agents.idea_refiner.generation.models import MODELS, default_lanes
+from agents.idea_refiner.scheduling import allocator, scheduler
+from agents.idea_refiner.scheduling.allocator import (
+    allocate_lanes,
+    bandit_allocation,
+    record_model_outcomes,
+    run_outcomes,
+)
+from agents.idea_refiner.scheduling.model_stats import ModelStats
+from agents.idea_refiner.scheduling.policy import (
+    POLICIES,
+    random_policy,
+    register_policy,
+    thompson_policy,
+)
+from agents.idea_refiner.scheduling.retirement import (
+    lane_scores,
+    pass_probability,
+    probability_policy,
+    should_retire,
+    stalled_policy,
+)
+from agents.idea_refiner.scheduling.scheduler import outcome_reward, pick_theme, record_outcome
+from agents.idea_refiner.scheduling.stats import ThemeStats
+
+TODAY = date(2026, 3, 10)
+
+
+@pytest.fixture()
+def stats(tmp_path):
+    store = ThemeStats(tmp_path / "themes.db")
+    yield store
+    store.close()
+
+
+@pytest.fixture()
+def learning(tmp_path, monkeypatch):
+    monkeypatch.setenv("THEME_POLICY", "thompson")
+    monkeypatch.setenv("THEME_STATS", str(tmp_path / "themes.db"))
+    monkeypatch.setattr(scheduler, "_stats", None)
+    yield
+    if scheduler._stats:
+        scheduler._stats.close()
+    monkeypatch.setattr(scheduler, "_stats", None)
+
+
+class TestThemeStats:
+    def test_record_accumulates(self, stats):
+        stats.record("sleep", accepted=True, rounds=1, reward=1.0, best_total=28, latency_s=10)
+        stats.record("sleep", accepted=False, rounds=3, reward=0.0, best_total=24, latency_s=30)
+        row = stats.all()["sleep"]
+        assert (row["runs"], row["accepted"], row["rounds"]) == (2, 1, 4)
+        assert row["reward"] == 1.0
+        assert row["best_total"] == 28
+        assert row["latency_s"] == 40
+
+    def test_mark_picked_keeps_outcomes(self, stats):
+        stats.record("sleep", accepted=True, rounds=1, reward=1.0, best_total=28, latency_s=1)
+        stats.mark_picked("sleep", TODAY)
+        row = stats.all()["sleep"]
+        assert row["last_picked"] == "2026-03-10"
+        assert row["runs"] == 1
+
+
+class TestThompsonPolicy:
+    def test_prefers_themes_that_accept_fast(self):
+        random.seed(1)
+        stats = {
+            "fast": {"runs": 20, "reward": 18.0},
+            "slow": {"runs": 20, "reward": 1.0},
+        }
+        picks = [thompson_policy(["fast", "slow"], stats, TODAY, exploration=0) for _ in range(50)]
+        assert picks.count("fast") > 45
+
+    def test_no_repeat_window(self):
+        stats = {
+            "fast": {"runs": 20, "reward": 20.0, "last_picked": "2026-03-09"},
+            "slow": {"runs": 20, "reward": 0.0},
+        }
+        assert thompson_policy(["fast", "slow"], stats, TODAY, exploration=0) == "slow"
+
+    def test_window_ignored_when_everything_is_recent(self):
+        stats = {"only": {"runs": 1, "reward": 1.0, "last_picked": "2026-03-09"}}
+        assert thompson_policy(["only"], stats, TODAY) == "only"
+
+    @patch("agents.idea_refiner.scheduling.policy.random.random", return_value=0.0)
+    def test_exploration_floor_picks_uniformly(self, _):
+        with patch("agents.idea_refiner.scheduling.policy.random.choice") as choice:
+            choice.return_value = "slow"
+            stats = {"fast": {"runs": 20, "reward": 20.0}}
+            assert thompson_policy(["fast", "slow"], stats, TODAY) == "slow"
+
+    def test_unseen_themes_are_eligible(self):
+        assert thompson_policy(["new"], {}, TODAY) == "new"
+
+
+class TestPickTheme:
+    def test_default_policy_is_random_without_store(self, monkeypatch):
+        monkeypatch.delenv("THEME_POLICY", raising=False)
+        monkeypatch.delenv("THEME_STATS", raising=False)
+        assert scheduler.get_stats() is None
+        assert pick_theme(TODAY) in RANDOM_THEMES
+
+    def test_learning_policy_marks_pick(self, learning):
+        theme = pick_theme(TODAY)
+        assert theme in RANDOM_THEMES
+        assert scheduler.get_stats().all()[theme]["last_picked"] == "2026-03-10"
+
+    def test_registered_policy_is_used(self, learning, monkeypatch):
+        register_policy("first", lambda themes, stats, today: themes[0])
+        try:
+            monkeypatch.setenv("THEME_POLICY", "first")
+            assert pick_theme(TODAY) == RANDOM_THEMES[0]
+        finally:
+            POLICIES.pop("first")
+
+    def test_unknown_policy_falls_back(self, learning, monkeypatch):
+        monkeypatch.setenv("THEME_POLICY", "nope")
+        assert pick_theme(TODAY) in RANDOM_THEMES
+        assert random_policy(["x"], {}, TODAY) == "x"
+
+
+class TestRecordOutcome:
+    def test_reward_decays_with_rounds(self):
+        assert outcome_reward(True, 1) == 1.0
+        assert outcome_reward(True, MAX_RETRIES + 1) == pytest.approx(1 / (MAX_RETRIES + 1))
+        assert outcome_reward(False, 1) == 0.0
+
+    def test_updates_store_after_run(self, learning):
+        state = {
+            "rounds": 2,
+            "history": [
+                {"verdict": "reject_all", "evaluations": [
+                    {"acquisition_score": 9, "demand_score": 9, "build_score": 10}]},
+                {"verdict": "accept", "evaluations": [
+                    {"acquisition_score": 9, "demand_score": 9, "build_score": 9}]},
+            ],
+        }
+        record_outcome("sleep", state, 12.5)
+        row = scheduler.get_stats().all()["sleep"]
+        assert row["accepted"] == 1
+        assert row["best_total"] == 28
+        assert row["reward"] == pytest.approx(outcome_reward(True, 2))
+
+    def test_missing_scores_count_as_zero(self, learning):
+        state = {"rounds": 1, "history": [
+            {"verdict": "reject_all", "evaluations": [{"acquisition_score": 7, "demand_score": 6}]},
+        ]}
+        record_outcome("sleep", state, 3.0)
+        assert scheduler.get_stats().all()["sleep"]["best_total"] == 13
+
+    def test_themeless_runs_are_not_recorded(self, learning):
+        record_outcome(None, {"rounds": 1, "history": []}, 1.0)
+        assert scheduler.get_stats().all() == {}
+
+
+GPT = {"name": "GPT", "generate": None}
+GEMINI = {"name": "Gemini", "generate": None}
+
+
+@pytest.fixture()
+def bandit(tmp_path, monkeypatch):
+    monkeypatch.setenv("MODEL_ALLOCATOR", "bandit")
+    monkeypatch.setenv("MODEL_STATS", str(tmp_path / "models.db"))
+    monkeypatch.setattr(allocator, "_stats", None)
+    yield
+    if allocator._stats:
+        allocator._stats.close()
+    monkeypatch.setattr(allocator, "_stats", None)
+
+
+def _lane(model, ok=True, latency=10.0, kept=False):
+    return {"model": model, "ok": ok, "latency_s": latency if ok else None, "kept": kept}
+
+
+def _eval(label, total):
+    return {"idea_label": label, "acquisition_score": total - 18, "demand_score": 9,
+            "build_score": 9}
+
+
+class TestModelStats:
+    def test_discounts_before_adding(self, tmp_path):
+        store = ModelStats(tmp_path / "m.db")
+        store.record_run({"GPT": {"samples": 2, "score": 1.5}}, discount=0.5)
+        store.record_run({"Gemini": {"samples": 1}}, discount=0.5)
+        rows = store.all()
+        assert rows["GPT"]["samples"] == 1.0
+        assert rows["GPT"]["score"] == 0.75
+        assert rows["Gemini"]["samples"] == 1.0
+        store.close()
+
+
+class TestRunOutcomes:
+    def test_counts_samples_scores_and_wins(self):
+        state = {
+            "winner_label": "B",
+            "history": [
+                {"verdict": "reject_all",
+                 "lanes": {"A": _lane("GPT"), "B": _lane("Gemini", ok=False)},
+                 "evaluations": [_eval("A", 24), _eval("B", 18)]},
+                {"verdict": "accept",
+                 "lanes": {"A": _lane("GPT", kept=True), "B": _lane("Gemini", latency=30)},
+                 "evaluations": [_eval("A", 24), _eval("B", 27)]},
+            ],
+        }
+        out = run_outcomes(state)
+        assert out["GPT"] == {"samples": 1, "ok": 1, "latency_s": 10.0, "judged": 1,
+                              "score": pytest.approx(0.8)}
+        assert out["Gemini"]["samples"] == 2
+        assert out["Gemini"]["failures"] == 1
+        assert out["Gemini"]["judged"] == 1
+        assert out["Gemini"]["wins"] == 1
+
+
+class TestBanditAllocation:
+    def test_favours_the_model_that_scores_higher(self):
+        random.seed(3)
+        stats = {
+            "GPT": {"samples": 30, "score": 27.0, "ok": 30, "latency_s": 300},
+            "Gemini": {"samples": 30, "score": 15.0, "ok": 30, "latency_s": 300},
+        }
+        picks = bandit_allocation([GPT, GEMINI], stats, budget=40)
+        assert picks.count(GPT) > 32
+
+    def test_latency_breaks_ties(self):
+        random.seed(4)
+        stats = {
+            "GPT": {"samples": 50, "score": 40.0, "ok": 50, "latency_s": 500},
+            "Gemini": {"samples": 50, "score": 40.0, "ok": 50, "latency_s": 5000},
+        }
+        picks = bandit_allocation([GPT, GEMINI], stats, budget=40)
+        assert picks.count(GPT) > picks.count(GEMINI)
+
+    def test_unseen_models_are_tried(self):
+        assert len(bandit_allocation([GPT, GEMINI], {}, budget=3)) == 3
+
+
+class TestAllocateLanes:
+    def test_fixed_default_matches_models(self, monkeypatch):
+        monkeypatch.delenv("MODEL_ALLOCATOR", raising=False)
+        monkeypatch.delenv("MODEL_STATS", raising=False)
+        lanes, allocation = allocate_lanes()
+        assert lanes == default_lanes()
+        assert allocation["allocator"] == "fixed"
+        assert set(allocation["lanes"].values()) == {1}
+
+    def test_pinned_model_fills_every_lane(self, monkeypatch):
+        monkeypatch.delenv("MODEL_ALLOCATOR", raising=False)
+        monkeypatch.delenv("MODEL_STATS", raising=False)
+        lanes, allocation = allocate_lanes([MODELS[1]])
+        assert list(lanes.values()) == [MODELS[1]] * len(MODELS)
+        assert allocation["lanes"] == {MODELS[1]["name"]: len(MODELS)}
+
+    def test_bandit_uses_budget_and_explains(self, bandit, monkeypatch):
+        monkeypatch.setenv("LANE_BUDGET", "3")
+        allocator.get_stats().record_run(
+            {MODELS[0]["name"]: {"samples": 4, "score": 3.0, "judged": 4, "ok": 4,
+                                 "latency_s": 40}},
+            discount=1.0,
+        )
+        lanes, allocation = allocate_lanes()
+        assert list(lanes) == ["A", "B", "C"]
+        assert sum(allocation["lanes"].values()) == 3
+        why = allocation["models"][MODELS[0]["name"]]
+        assert why["mean_score"] == 0.75
+        assert why["mean_latency_s"] == 10.0
+
+    def test_record_model_outcomes_updates_store(self, bandit):
+        state = {"history": [{"verdict": "reject_all", "lanes": {"A": _lane("GPT")},
+                              "evaluations": [_eval("A", 27)]}]}
+        record_model_outcomes(state)
+        assert allocator.get_stats().all()["GPT"]["score"] == pytest.approx(0.9)
+
+
+def _scores(*triples):
+    return [
+        {"acquisition_score": a, "demand_score": d, "build_score": b} for a, d, b in triples
+    ]
+
+
+class TestRetirement:
+    def test_flat_lane_has_little_chance(self):
+        assert pass_probability(_scores((6, 5, 7), (6, 5, 6)), 1) < 0.01
+
+    def test_near_miss_lane_keeps_a_chance(self):
+        assert pass_probability(_scores((8, 8, 9)), 2) > 0.1
+
+    def test_more_attempts_mean_better_odds(self):
+        scores = _scores((8, 7, 8))
+        assert pass_probability(scores, 2) > pass_probability(scores, 1)
+
+    def test_improving_trend_beats_flat(self):
+        rising = pass_probability(_scores((5, 5, 5), (7, 7, 7)), 1)
+        flat = pass_probability(_scores((7, 7, 7), (7, 7, 7)), 1)
+        assert rising > flat
+
+    def test_no_budget_or_no_history(self):
+        assert pass_probability(_scores((9, 9, 9)), 0) == 0.0
+        assert pass_probability([], 2) == 1.0
+
+    def test_stalled_policy(self):
+        assert stalled_policy(_scores((6, 5, 7), (6, 5, 6)), 1)[0] is True
+        assert stalled_policy(_scores((6, 5, 7), (7, 6, 7)), 1)[0] is False
+        assert stalled_policy(_scores((6, 5, 7)), 2)[0] is False
+
+    def test_probability_policy_threshold(self, monkeypatch):
+        scores = _scores((8, 8, 8))
+        p = pass_probability(scores, 1)
+        monkeypatch.setenv("RETIRE_BELOW", str(p + 0.01))
+        assert probability_policy(scores, 1)[0] is True
+        monkeypatch.setenv("RETIRE_BELOW", str(p - 0.01))
+        assert probability_policy(scores, 1)[0] is False
+
+    def test_single_score_is_never_retired(self, monkeypatch):
+        monkeypatch.setenv("LANE_RETIREMENT", "probability")
+        assert should_retire(_scores((7, 7, 7)), 2)[0] is False
+        assert should_retire(_scores((7, 7, 7), (7, 7, 7)), 2)[0] is True
+
+    def test_unknown_policy_never_retires(self, monkeypatch):
+        monkeypatch.setenv("LANE_RETIREMENT", "nope")
+        assert should_retire(_scores((1, 1, 1)), 1) == (False, None, "off")
+
+    def test_lane_scores_skip_kept_and_failed_ideas(self):
+        state = {"history": [
+            {"lanes": {"A": {"ok": True, "kept": False}},
+             "evaluations": [{"idea_label": "A", "acquisition_score": 6, "demand_score": 5,
+                              "build_score": 7}]},
+            {"lanes": {"A": {"ok": True, "kept": True}},
+             "evaluations": [{"idea_label": "A", "acquisition_score": 6, "demand_score": 5,
+                              "build_score": 7}]},
+            {"lanes": {"A": {"ok": False, "kept": False}}, "evaluations": []},
+        ]}
+        assert lane_scores(state, "A") == _scores((6, 5, 7))
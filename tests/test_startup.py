@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Cumulative import time of the Cloud Run entry point, with functions_framework and
+# flask already loaded (as they are when the framework imports main.py). Measured at
+# ~70ms; the budget leaves room for slower CI machines.
+IMPORT_BUDGET_MS = 250
+DEFERRED = ("openai", "telegram", "httpx")
+
+
+def _profile_import(module: str, preload: str = "") -> tuple[float, set[str]]:
+    code = f"{preload}import {module}"
+    env = {**os.environ, "PYTHONPATH": str(ROOT / "src")}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    cumulative, loaded = 0.0, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = (part.strip() for part in line.split("|"))
+        if not cum.isdigit():
+            continue
+        loaded.add(name.split(".")[0])
+        if name == module:
+            cumulative = int(cum) / 1000
+    return cumulative, loaded
+
+
+class TestColdStart:
+    def test_entry_point_defers_provider_and_telegram_sdks(self):
+        _, loaded = _profile_import("main", "import functions_framework, flask; ")
+        assert not loaded & set(DEFERRED)
+
+    def test_entry_point_import_time_budget(self):
+        _profile_import("main", "import functions_framework, flask; ")  # warm .pyc caches
+        best = min(
+            _profile_import("main", "import functions_framework, flask; ")[0] for _ in range(3)
+        )
+        assert best < IMPORT_BUDGET_MS, f"main imports in {best:.0f}ms, budget {IMPORT_BUDGET_MS}"
+
+    def test_package_import_is_lazy(self):
+        _, loaded = _profile_import("agents.idea_refiner.config")
+        assert not loaded & {"openai", "telegram", "httpx", "dotenv", "asyncio"}
@@ -0,0 +1,104 @@
+import json
+import threading
+from unittest.mock import patch
+
+from agents.idea_refiner.pipeline.events import emit
+from agents.idea_refiner.server.stream import format_event, run_with_events, stream_format
+
+
+def fake_run():
+    emit("round_started", round=1, lanes=["A", "B"])
+    emit("lane_generated", round=1, label="A", latency_s=1.5)
+    emit("winner", label="A", fallback=False)
+    return {"winner_label": "A", "winning_idea": "idea"}
+
+
+def fake_idempotent(theme=None, key=None):
+    return fake_run(), False
+
+
+class TestStreamFormat:
+    def test_query_arg(self):
+        assert stream_format("sse", None) == "sse"
+        assert stream_format("ndjson", None) == "ndjson"
+        assert stream_format("1", None) == "sse"
+        assert stream_format("xml", None) is None
+
+    def test_accept_header(self):
+        assert stream_format(None, "text/event-stream") == "sse"
+        assert stream_format(None, "application/x-ndjson") == "ndjson"
+        assert stream_format(None, "application/json") is None
+
+    def test_format_event(self):
+        assert format_event("sse", "winner", {"label": "A"}) == (
+            'event: winner\ndata: {"label": "A"}\n\n'
+        )
+        assert json.loads(format_event("ndjson", "winner", {"label": "A"})) == {
+            "event": "winner", "data": {"label": "A"},
+        }
+
+
+class TestRunWithEvents:
+    def test_events_in_order_then_result(self):
+        lines = [json.loads(line) for line in run_with_events(fake_run, "ndjson")]
+        assert [line["event"] for line in lines] == [
+            "round_started", "lane_generated", "winner", "result",
+        ]
+        assert lines[-1]["data"] == {"winner_label": "A", "winning_idea": "idea"}
+
+    def test_events_flow_before_run_finishes(self):
+        release = threading.Event()
+
+        def slow_run():
+            emit("round_started", round=1)
+            release.wait(5)
+            return {}
+
+        stream = run_with_events(slow_run, "ndjson")
+        assert json.loads(next(stream))["event"] == "round_started"
+        release.set()
+        assert json.loads(next(stream))["event"] == "result"
+
+    def test_heartbeat_while_idle(self):
+        release = threading.Event()
+
+        def slow_run():
+            release.wait(5)
+            return {}
+
+        stream = run_with_events(slow_run, "sse", heartbeat_s=0.01)
+        assert next(stream) == ": keep-alive\n\n"
+        release.set()
+        assert list(stream)[-1].startswith("event: result")
+
+    def test_failure_ends_with_error_event(self):
+        def broken():
+            raise RuntimeError("judge down")
+
+        lines = [json.loads(line) for line in run_with_events(broken, "ndjson")]
+        assert lines == [{"event": "error", "data": {"error": "RuntimeError: judge down"}}]
+
+
+class TestHandler:
+    def test_streams_sse(self, handler_module):
+        from flask import Flask
+
+        with patch.object(handler_module, "run_idempotent", fake_idempotent), \
+                Flask(__name__).test_request_context("/?stream=sse"):
+            from flask import request
+
+            response = handler_module.idea_refiner(request)
+            body = "".join(response.response)
+        assert response.mimetype == "text/event-stream"
+        assert response.headers["Cache-Control"] == "no-cache"
+        assert body.index("event: round_started") < body.index("event: result")
+
+    def test_plain_json_by_default(self, handler_module):
+        from flask import Flask
+
+        with patch.object(handler_module, "run_idempotent", fake_idempotent), \
+                Flask(__name__).test_request_context("/"):
+            from flask import request
+
+            response = handler_module.idea_refiner(request)
+        assert response.get_json() == {"winner_label": "A", "winning_idea": "idea"}
@@ -0,0 +1,119 @@
+import time
+from datetime import date
+from unittest.mock import patch
+
+from agents.idea_refiner.output.telegram import broadcast_summary
+from agents.idea_refiner.subscribers.registry import SubscriberRegistry
+from agents.idea_refiner.subscribers.schedule import (
+    deliver_to_subscribers,
+    group_by_theme,
+    resolve_theme,
+)
+
+SCHEDULE = "agents.idea_refiner.subscribers.schedule"
+
+
+def _state():
+    return {
+        "winner_label": "A",
+        "winning_idea": "**Product Name:** TestProd",
+        "all_evals": [
+            {"idea_label": "A", "acquisition_score": 9, "demand_score": 9,
+             "build_score": 9, "explanation": "Great."},
+        ],
+        "winner_ev": {"idea_label": "A", "explanation": "Great."},
+        "start": time.time(),
+    }
+
+
+class TestRegistry:
+    def test_add_list_remove(self, tmp_path):
+        reg = SubscriberRegistry(tmp_path / "subs.db")
+        reg.add("111", ["pet owners"], name="Ann")
+        reg.add("222")
+
+        subs = reg.active()
+        assert [s["chat_id"] for s in subs] == ["111", "222"]
+        assert subs[0]["themes"] == ["pet owners"]
+
+        assert reg.remove("111") is True
+        assert reg.remove("111") is False
+        assert [s["chat_id"] for s in reg.active()] == ["222"]
+
+    def test_re_add_updates_and_reactivates(self, tmp_path):
+        reg = SubscriberRegistry(tmp_path / "subs.db")
+        reg.add("111", ["taxes"])
+        reg.remove("111")
+        reg.add("111", ["sleep"])
+        assert reg.active() == [{"chat_id": "111", "name": None, "themes": ["sleep"]}]
+
+
+class TestGrouping:
+    def test_no_preferences_uses_default_theme(self):
+        assert resolve_theme({"themes": []}, date(2026, 1, 1), "sleep") == "sleep"
+
+    def test_preferences_rotate_daily(self):
+        sub = {"themes": ["a", "b"]}
+        day = date(2026, 1, 1)
+        next_day = date.fromordinal(day.toordinal() + 1)
+        picked = {resolve_theme(sub, day, None), resolve_theme(sub, next_day, None)}
+        assert picked == {"a", "b"}
+
+    def test_groups_share_theme(self):
+        subs = [
+            {"chat_id": "1", "themes": []},
+            {"chat_id": "2", "themes": ["taxes"]},
+            {"chat_id": "3", "themes": []},
+        ]
+        groups = group_by_theme(subs, date(2026, 1, 1), None)
+        assert groups == {None: ["1", "3"], "taxes": ["2"]}
+
+
+class TestDeliverToSubscribers:
+    @patch(f"{SCHEDULE}.broadcast_summary")
+    @patch(f"{SCHEDULE}.get_idea_prompt", return_value=("sleep", "", ""))
+    @patch(f"{SCHEDULE}.run_pipeline")
+    def test_one_run_per_distinct_theme(self, mock_run, mock_prompt, mock_broadcast, tmp_path):
+        mock_run.side_effect = lambda theme, *_: _state()
+        mock_broadcast.side_effect = lambda chat_ids, *_: {"delivered": len(chat_ids), "failed": 0}
+        reg = SubscriberRegistry(tmp_path / "subs.db")
+        for chat_id in ("1", "2", "3", "4"):
+            reg.add(chat_id)
+        reg.add("5", ["taxes"])
+
+        summary = deliver_to_subscribers(reg)
+
+        assert mock_run.call_count == 2
+        assert {c.args[0] for c in mock_run.call_args_list} == {"sleep", "taxes"}
+        assert summary["delivered"] == 5
+        assert summary["themes"] == 2
+
+    @patch(f"{SCHEDULE}.broadcast_summary")
+    @patch(f"{SCHEDULE}.get_idea_prompt", return_value=(None, "", ""))
+    @patch(f"{SCHEDULE}.run_pipeline", side_effect=RuntimeError("x"))
+    def test_failed_run_counts_group_as_failed(
+        self, mock_run, mock_prompt, mock_broadcast, tmp_path,
+    ):
+        reg = SubscriberRegistry(tmp_path / "subs.db")
+        reg.add("1")
+        reg.add("2")
+        summary = deliver_to_subscribers(reg)
+        assert summary["failed"] == 2
+        mock_broadcast.assert_not_called()
+
+
+class TestBroadcast:
+    def test_sends_to_every_chat(self, telegram_api):
+        report = broadcast_summary(["1", "2", "3"], "cooking", _state(), 1.0, "2026-02-22")
+
+        assert report["delivered"] == 3
+        assert report["failed"] == 0
+        assert {m["chat_id"] for m in telegram_api.sent} == {"1", "2", "3"}
+
+    def test_one_failing_chat_does_not_stop_others(self, telegram_api):
+        report = broadcast_summary(["1", "blocked"], None, _state(), 1.0, "2026-02-22")
+        assert (report["delivered"], report["failed"]) == (1, 1)
+
+    @patch("agents.idea_refiner.output.telegram.os.getenv", return_value=None)
+    def test_no_token_delivers_nothing(self, mock_getenv):
+        assert broadcast_summary(["1"], None, _state(), 1.0, "x") == {"delivered": 0, "failed": 1}
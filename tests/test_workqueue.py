@@ -0,0 +1,182 @@
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from agents.idea_refiner.workqueue import cli, worker
+from agents.idea_refiner.workqueue.store import SqliteWorkQueue, open_queue
+from agents.idea_refiner.workqueue.worker import QueueWorker, run_item, run_workers
+
+
+def fake_run(item):
+    time.sleep(0.01)
+    return {"theme": item["theme"], "winning_idea": f"idea for {item['theme']}", "rounds": 1}
+
+
+def novel_run(item):
+    from agents.idea_refiner.novelty.store import get_index, save_index
+
+    get_index().add(f"**Product Name:** {item['theme']}\n\nA product for {item['theme']} owners.")
+    save_index()
+    return fake_run(item)
+
+
+@pytest.fixture()
+def queue(tmp_path):
+    q = SqliteWorkQueue(tmp_path / "queue.db")
+    yield q
+    q.close()
+
+
+def _items(*themes, model=None):
+    return [{"theme": t, "model": model} for t in themes]
+
+
+class TestSqliteWorkQueue:
+    def test_enqueue_ignores_duplicates(self, queue):
+        assert queue.enqueue(_items("pets", "taxes")) == 2
+        assert queue.enqueue(_items("pets", "sleep")) == 1
+        assert queue.enqueue(_items("pets", model="Gemini 3.1 Pro")) == 1
+        assert queue.stats()["pending"] == 4
+
+    def test_claim_complete(self, queue):
+        queue.enqueue(_items("pets"))
+        item = queue.claim("w1", 60, 3)
+        assert (item["theme"], item["attempts"]) == ("pets", 1)
+        assert queue.claim("w2", 60, 3) is None
+        assert queue.complete(item["id"], "w1", {"theme": "pets", "winning_idea": "x"})
+        assert queue.outstanding() == 0
+        assert queue.results() == [
+            {"theme": "pets", "winning_idea": "x", "model": None, "attempts": 1},
+        ]
+
+    def test_expired_lease_is_requeued(self, queue):
+        queue.enqueue(_items("pets"))
+        first = queue.claim("dead-worker", 0.01, 3)
+        time.sleep(0.02)
+        second = queue.claim("w2", 60, 3)
+        assert second["id"] == first["id"]
+        assert second["attempts"] == 2
+        # The crashed worker's late answer no longer counts.
+        assert not queue.heartbeat(first["id"], "dead-worker", 60)
+        assert not queue.complete(first["id"], "dead-worker", {})
+        assert queue.complete(second["id"], "w2", {"theme": "pets"})
+        stats = queue.stats()
+        assert (stats["done"], stats["retries"], stats["expired_leases"]) == (1, 1, 1)
+
+    def test_heartbeat_keeps_the_lease(self, queue):
+        queue.enqueue(_items("pets"))
+        item = queue.claim("w1", 0.05, 3)
+        time.sleep(0.03)
+        assert queue.heartbeat(item["id"], "w1", 60)
+        time.sleep(0.03)
+        assert queue.claim("w2", 60, 3) is None
+
+    def test_failures_retry_then_die(self, queue):
+        queue.enqueue(_items("pets"))
+        for attempt, expected in ((1, "pending"), (2, "dead")):
+            item = queue.claim("w1", 60, 2)
+            assert item["attempts"] == attempt
+            assert queue.fail(item["id"], "w1", "RuntimeError: boom", 2) == expected
+        stats = queue.stats()
+        assert (stats["dead"], stats["retries"]) == (1, 1)
+        assert stats["retried"][0]["last_error"] == "RuntimeError: boom"
+        assert queue.results()[0]["error"] == "RuntimeError: boom"
+
+    def test_unknown_backend(self, tmp_path):
+        with pytest.raises(ValueError):
+            open_queue(str(tmp_path / "q.db"), "redis")
+
+
+class TestQueueWorker:
+    def test_concurrent_workers_run_each_item_once(self, tmp_path):
+        path = tmp_path / "queue.db"
+        SqliteWorkQueue(path).enqueue(_items(*(f"theme {i}" for i in range(20))))
+        seen, lock = [], threading.Lock()
+
+        def run(item):
+            with lock:
+                seen.append(item["theme"])
+            return fake_run(item)
+
+        def work(i):
+            QueueWorker(SqliteWorkQueue(path), run, poll_s=0.01, name=f"w{i}").work()
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sorted(seen) == sorted(f"theme {i}" for i in range(20))
+        stats = SqliteWorkQueue(path).stats()
+        assert (stats["done"], stats["workers_seen"]) == (20, 4)
+
+    def test_failed_item_is_retried(self, queue):
+        queue.enqueue(_items("pets"))
+        calls = []
+
+        def flaky(item):
+            calls.append(item["attempts"])
+            if len(calls) == 1:
+                raise RuntimeError("judge down")
+            return fake_run(item)
+
+        assert QueueWorker(queue, flaky, poll_s=0.01).work() == {"pending": 1, "done": 1}
+        assert calls == [1, 2]
+
+    def test_heartbeat_outlives_short_lease(self, queue):
+        queue.enqueue(_items("pets"))
+        slow = QueueWorker(queue, lambda item: time.sleep(0.15) or {}, lease_s=0.06)
+        assert slow.work() == {"done": 1}
+        assert queue.stats()["expired_leases"] == 0
+
+    def test_run_item_pins_model(self):
+        with patch.object(worker, "run_theme", return_value={}) as run_theme:
+            run_item({"theme": "pets", "model": "Gemini 3.1 Pro"})
+            run_item({"theme": "pets", "model": None})
+        assert run_theme.call_args_list[0].args[1][0]["name"] == "Gemini 3.1 Pro"
+        assert run_theme.call_args_list[1].args == ("pets", None)
+        with pytest.raises(ValueError):
+            run_item({"theme": "pets", "model": "no such model"})
+
+
+class TestRunWorkers:
+    def test_worker_processes_drain_the_queue(self, tmp_path):
+        path = str(tmp_path / "queue.db")
+        open_queue(path).enqueue(_items("pets", "taxes", "sleep"))
+        stats = run_workers(2, path, run=fake_run)
+        assert stats["done"] == 3
+        assert stats["session"]["workers"] == 2
+        assert stats["session"]["crashed_workers"] == 0
+        assert stats["session"]["done"] == 3
+
+    def test_workers_share_the_novelty_index(self, tmp_path, monkeypatch):
+        from agents.idea_refiner.novelty.index import NoveltyIndex
+
+        index = tmp_path / "novelty.idx"
+        monkeypatch.setenv("NOVELTY_INDEX", str(index))
+        path = str(tmp_path / "queue.db")
+        open_queue(path).enqueue(_items(*(f"theme {i}" for i in range(6))))
+        assert run_workers(3, path, run=novel_run)["done"] == 6
+        assert len(NoveltyIndex.load(index)) == 6
+
+
+class TestCli:
+    def test_enqueue_theme_by_model(self, tmp_path, capsys):
+        path = str(tmp_path / "queue.db")
+        stats = cli.main(["--queue", path, "enqueue", "--themes", "pets", "taxes",
+                          "--models", "gpt", "gemini"])
+        assert (stats["added"], stats["pending"]) == (4, 4)
+        with pytest.raises(SystemExit):
+            cli.main(["--queue", path, "enqueue", "--models", "llama"])
+
+    def test_export_writes_results(self, tmp_path, capsys):
+        path = str(tmp_path / "queue.db")
+        q = open_queue(path)
+        q.enqueue(_items("pets"))
+        QueueWorker(q, fake_run).work()
+        out = tmp_path / "ideas.jsonl"
+        assert cli.main(["--queue", path, "export", "--out", str(out)])["exported"] == 1
+        assert json.loads(out.read_text())["winning_idea"] == "idea for pets"